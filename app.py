@@ -6,11 +6,20 @@ from datetime import datetime, timedelta
 
 # Import backend logic (reusing existing modules)
 from features.transactions.transactions import (
-    load_transactions, save_transaction, EXPENSE_CATEGORIES, INCOME_CATEGORIES
+    save_transaction, totals_between, EXPENSE_CATEGORIES, INCOME_CATEGORIES
 )
-from features.budgets.budgets import load_budgets, save_all_budgets
-from features.smart_assistant.assistant import load_goals, save_goals
-from features.data_management import manager
+from features.transactions.rollups import month_totals, month_category_totals, range_rollup
+from features.financial_analytics.engine import monthly_history, health_scores
+from features.financial_analytics.series import spending_pace, spending_trend
+from features.budgets.budgets import upsert_budget
+from features.smart_assistant.assistant import get_goal, save_goal
+from features.smart_assistant.alerts import pending_alerts, dismiss_alerts, alert_message, BUDGET
+from features.transactions.store import date_code
+from features.transactions.search import search
+from features.transactions.recent import recent_transactions
+from features.storage.cache import cached, get_transactions, get_transactions_frame, get_budgets, get_goals, TRANSACTIONS
+from features.data_management import manager, columnar
+from features.profiling import profiler
 
 # --- Page Configuration ---
 st.set_page_config(page_title="FinTrack Pro", page_icon="💰", layout="wide")
@@ -34,6 +43,7 @@ page = st.sidebar.radio("Navigation", [
     "Smart Assistant", 
     "Data Management"
 ])
+page_span = profiler.start(f"app.page.{page}")
 
 # ==========================================
 # PAGE: DASHBOARD
@@ -41,16 +51,12 @@ page = st.sidebar.radio("Navigation", [
 if page == "Dashboard":
     st.title("📊 Financial Dashboard")
     
-    transactions = load_transactions()
-    budgets = load_budgets()
-    current_month = datetime.now().strftime("%Y-%m")
+    transactions = get_transactions()
+    budgets = get_budgets()
+    now = datetime.now()
     
     # -- Summary Metrics --
-    income_txns = [t for t in transactions if t['type'] == 'Income' and t['date'].startswith(current_month)]
-    expense_txns = [t for t in transactions if t['type'] == 'Expense' and t['date'].startswith(current_month)]
-
-    total_income = sum(t['amount_paisa'] for t in income_txns)
-    total_expense = sum(t['amount_paisa'] for t in expense_txns)
+    total_income, total_expense = month_totals(now.year, now.month)
     balance = total_income - total_expense
     
     col1, col2, col3 = st.columns(3)
@@ -58,14 +64,17 @@ if page == "Dashboard":
     col2.metric("Monthly Income", f"Rs {total_income/100:,.2f}")
     col3.metric("Monthly Expenses", f"Rs {total_expense/100:,.2f}", delta=-total_expense/100, delta_color="inverse")
 
+    # -- Spending Pace --
+    pace = spending_pace()
+    col4, col5, col6 = st.columns(3)
+    col4.metric("7-Day Avg Spend", f"Rs {pace['avg_7']/100:,.2f} / day")
+    col5.metric("30-Day Avg Spend", f"Rs {pace['avg_30']/100:,.2f} / day")
+    col6.metric("Projected Month-End Spend", f"Rs {pace['projected']/100:,.2f}", help=f"Spent so far plus the recent daily trend for the {pace['days_left']} days left")
+
     # -- Recent Activity --
     st.subheader("Recent Activity")
     if transactions:
-        df = pd.DataFrame(transactions)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date', ascending=False).head(5)
-        
-        for index, row in df.iterrows():
+        for row in recent_transactions(5):
             amt = row['amount_paisa'] / 100
             color = "green" if row['type'] == "Income" else "red"
             icon = "↗️" if row['type'] == "Income" else "↘️"
@@ -74,7 +83,7 @@ if page == "Dashboard":
             <div style="padding: 10px; border-bottom: 1px solid #eee; display: flex; justify-content: space-between; align-items: center;">
                 <div>
                     <span style="font-size: 1.1em;">{icon} <b>{row['category']}</b></span><br>
-                    <span style="color: gray; font-size: 0.9em;">{row['description']} • {row['date'].strftime('%Y-%m-%d')}</span>
+                    <span style="color: gray; font-size: 0.9em;">{row['description']} • {row['date']}</span>
                 </div>
                 <div style="color: {color}; font-weight: bold;">
                     Rs {amt:,.2f}
@@ -95,11 +104,26 @@ elif page == "Transactions":
     
     # -- Tab 1: View --
     with tab1:
-        transactions = load_transactions()
+        transactions = get_transactions()
         if not transactions:
             st.info("No transactions found.")
         else:
-            df = pd.DataFrame(transactions)
+            df = get_transactions_frame()
+            
+            col_s1, col_s2, col_s3 = st.columns([3, 2, 1])
+            query = col_s1.text_input("Search", placeholder="Description or category, e.g. biryani, groc")
+            date_range = col_s2.date_input("Date range", value=())
+            fuzzy = col_s3.checkbox("Allow typos")
+            
+            # Frame rows are in store order, so row indices from the date index and search apply directly
+            rows = None
+            if len(date_range) == 2:
+                rows = transactions.rows_between(date_code(date_range[0].isoformat()), date_code(date_range[1].isoformat()))
+            if query.strip():
+                matches = search(query, transactions, fuzzy)
+                rows = matches if rows is None else sorted(set(rows).intersection(matches))
+            if rows is not None:
+                df = df.iloc[rows]
             
             # Filters
             col_f1, col_f2 = st.columns(2)
@@ -111,10 +135,19 @@ elif page == "Transactions":
             if filter_cat:
                 df = df[df['category'].isin(filter_cat)]
                 
-            # Display
-            df['Amount (Rs)'] = df['amount_paisa'] / 100
+            # Display one page, newest first (latest entry first within a day).
+            # nlargest only selects the rows up to the end of the page instead
+            # of sorting the whole frame.
+            col_p1, col_p2, col_p3 = st.columns([1, 1, 3])
+            page_size = col_p1.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+            pages = max((len(df) + page_size - 1) // page_size, 1)
+            page = col_p2.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+            col_p3.caption(f"{len(df):,} transactions, page {page} of {pages}")
+            end = page * page_size
+            page_df = df.iloc[::-1].nlargest(end, 'date_dt', keep='first').iloc[end - page_size:end]
+            page_df = page_df[['date', 'type', 'category', 'description', 'amount_rs']].rename(columns={'amount_rs': 'Amount (Rs)'})
             st.dataframe(
-                df[['date', 'type', 'category', 'description', 'Amount (Rs)']].sort_values('date', ascending=False),
+                page_df,
                 use_container_width=True,
                 hide_index=True
             )
@@ -157,22 +190,18 @@ elif page == "Budgets":
     
     tab1, tab2 = st.tabs(["Overview", "Set Budgets"])
     
-    current_month = datetime.now().strftime("%Y-%m")
-    budgets = load_budgets()
+    now = datetime.now()
+    current_month = now.strftime("%Y-%m")
+    budgets = get_budgets()
     month_budgets = [b for b in budgets if b['month_year'] == current_month]
     
-    transactions = load_transactions()
-    
     # -- Tab 1: Overview --
     with tab1:
         if not month_budgets:
             st.warning("No budgets set for this month.")
         else:
             # Calculate spending
-            spending = {}
-            for t in transactions:
-                if t['type'] == 'Expense' and t['date'].startswith(current_month):
-                    spending[t['category']] = spending.get(t['category'], 0) + t['amount_paisa']
+            spending = month_category_totals('Expense', now.year, now.month)
 
             for b in month_budgets:
                 cat = b['category']
@@ -202,16 +231,7 @@ elif page == "Budgets":
             submitted = st.form_submit_button("Set Budget")
             
             if submitted:
-                # Logic to update/append (simplified for streamlit re-run)
-                new_budget = {
-                    "category": b_cat,
-                    "limit_paisa": int(b_amt * 100),
-                    "month_year": current_month
-                }
-                # Remove existing for same cat/month
-                budgets = [b for b in budgets if not (b['category'] == b_cat and b['month_year'] == current_month)]
-                budgets.append(new_budget)
-                save_all_budgets(budgets)
+                upsert_budget(b_cat, int(b_amt * 100), current_month)
                 st.success(f"Budget set for {b_cat}!")
                 st.rerun()
 
@@ -222,30 +242,64 @@ elif page == "Budgets":
 elif page == "Analytics":
     st.title("📈 Financial Analytics")
     
-    transactions = load_transactions()
+    transactions = get_transactions()
     if not transactions:
         st.info("Need more data for analytics.")
     else:
-        df = pd.DataFrame(transactions)
-        df['amount'] = df['amount_paisa'] / 100
+        # All-time totals come from the monthly rollup index
+        totals = range_rollup()
+        by_type, by_category = {}, {}
+        for (t_type, t_cat), amount in totals.items():
+            by_type[t_type] = by_type.get(t_type, 0) + amount / 100
+            if t_type == 'Expense':
+                by_category[t_cat] = by_category.get(t_cat, 0) + amount / 100
         
         # Income vs Expense Pie Chart
         st.subheader("Income vs Expenses")
-        total_by_type = df.groupby('type')['amount'].sum()
+        total_by_type = pd.Series(by_type, name='amount').sort_index()
         st.bar_chart(total_by_type, horizontal=True) # Simple bar chart
         
         # Category Breakdown
         st.subheader("Spending by Category")
-        expenses = df[df['type'] == 'Expense']
-        if not expenses.empty:
-            cat_breakdown = expenses.groupby('category')['amount'].sum()
+        if by_category:
+            cat_breakdown = pd.Series(by_category, name='amount').sort_index()
             st.bar_chart(cat_breakdown)
         
-        # Daily Trend
+        # Daily Trend, from the maintained daily series
         st.subheader("Daily Spending Trend")
-        if not expenses.empty:
-            daily = expenses.groupby('date')['amount'].sum()
-            st.line_chart(daily)
+        col_t1, col_t2 = st.columns(2)
+        trend_days = col_t1.selectbox("Window", [30, 90, 180, 365], index=1, format_func=lambda d: f"Last {d} days")
+        trend_cat = col_t2.selectbox("Category", ["All"] + EXPENSE_CATEGORIES)
+        trend = spending_trend(trend_days, None if trend_cat == "All" else trend_cat)
+        st.line_chart(pd.DataFrame({
+            'Spent': trend['spent'],
+            '7-day avg': trend['avg_7'],
+            '30-day avg': trend['avg_30'],
+            'EWMA': trend['ewma'],
+        }, index=pd.to_datetime(trend['days'])) / 100)
+
+        # Month-by-month history
+        st.subheader("Monthly History")
+        history = monthly_history()
+        if history['months']:
+            months = history['months']
+            col_h1, col_h2 = st.columns(2)
+            start_month = col_h1.selectbox("From", months, index=max(len(months) - 12, 0))
+            end_month = col_h2.selectbox("To", months, index=len(months) - 1)
+            history = monthly_history(start_month, end_month)
+            scores = health_scores(history, get_budgets())
+
+            df_h = pd.DataFrame({
+                'Income': history['income'] / 100,
+                'Expenses': history['expense'] / 100,
+                'Savings': history['savings'] / 100,
+            }, index=history['months'])
+            st.line_chart(df_h)
+            st.bar_chart(pd.DataFrame(history['by_category'] / 100, index=history['months'], columns=history['categories']))
+
+            df_h['Savings Rate (%)'] = history['savings_rate'].round(1)
+            df_h['Health Score'] = [score for score, _ in scores]
+            st.dataframe(df_h, use_container_width=True)
 
 
 # ==========================================
@@ -254,14 +308,14 @@ elif page == "Analytics":
 elif page == "Smart Assistant":
     st.title("🤖 Smart Assistant")
     
-    goals = load_goals()
-    transactions = load_transactions()
-    budgets = load_budgets()
+    goals = get_goals()
+    now = datetime.now()
+    budgets = get_budgets()
     
     # -- Daily Check --
     st.subheader("Daily Snapshot")
-    today_str = datetime.now().strftime("%Y-%m-%d")
-    today_spent = sum(t['amount_paisa'] for t in transactions if t['date'] == today_str and t['type'] == 'Expense')
+    today_str = now.strftime("%Y-%m-%d")
+    _, today_spent = totals_between(today_str, today_str)
     
     col1, col2 = st.columns(2)
     col1.metric("Today's Spending", f"Rs {today_spent/100:,.2f}")
@@ -273,6 +327,20 @@ elif page == "Smart Assistant":
     else:
         col2.info("💡 Tip: You're on track.")
 
+    # -- Alerts --
+    alerts = pending_alerts()
+    if alerts:
+        st.subheader("🔔 Alerts")
+        for a in alerts:
+            msg = f"{alert_message(a)} · {a['created']}"
+            if a['kind'] == BUDGET and a['threshold'] >= 100:
+                st.error(msg)
+            else:
+                st.warning(msg)
+        if st.button("Dismiss all alerts"):
+            dismiss_alerts()
+            st.rerun()
+
     st.divider()
 
     # -- Goals Management --
@@ -300,13 +368,12 @@ elif page == "Smart Assistant":
             
             sub_g = st.form_submit_button("Create Goal")
             if sub_g:
-                goals.append({
+                save_goal({
                     "name": g_name,
                     "target_paisa": int(g_target * 100),
                     "saved_paisa": 0,
                     "deadline": g_deadline.strftime("%Y-%m-%d")
                 })
-                save_goals(goals)
                 st.success("Goal Created!")
                 st.rerun()
                 
@@ -319,10 +386,9 @@ elif page == "Smart Assistant":
                 
                 sub_u = st.form_submit_button("Update Progress")
                 if sub_u:
-                    for g in goals:
-                        if g['name'] == g_select:
-                            g['saved_paisa'] = int(g_added * 100)
-                    save_goals(goals)
+                    goal = get_goal(g_select)
+                    goal['saved_paisa'] = int(g_added * 100)
+                    save_goal(goal)
                     st.success("Updated!")
                     st.rerun()
 
@@ -333,16 +399,15 @@ elif page == "Smart Assistant":
 elif page == "Data Management":
     st.title("💾 Data Management")
     
-    transactions = load_transactions()
-    budgets = load_budgets()
+    transactions = get_transactions()
+    budgets = get_budgets()
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Export Transactions")
         if transactions:
-            df_t = pd.DataFrame(transactions)
-            df_t['amount_rs'] = df_t['amount_paisa'] / 100
+            df_t = get_transactions_frame().drop(columns=['date_dt'])
             csv_t = df_t.to_csv(index=False).encode('utf-8')
             
             st.download_button(
@@ -361,6 +426,16 @@ elif page == "Data Management":
                 "application/json",
                 key='download-json'
             )
+
+            if columnar.available():
+                parquet_t = cached(TRANSACTIONS, "parquet", lambda: columnar.to_bytes("parquet", transactions))
+                st.download_button(
+                    "📥 Download Parquet",
+                    parquet_t,
+                    "transactions.parquet",
+                    "application/vnd.apache.parquet",
+                    key='download-parquet'
+                )
     
     with col2:
         st.subheader("Export Budgets")
@@ -377,3 +452,8 @@ elif page == "Data Management":
                 key='download-budgets'
             )
 
+# --- Profiling (PFT_PROFILE=1) ---
+page_span.stop()
+if profiler.ENABLED:
+    with st.sidebar.expander("⏱️ Profile"):
+        st.dataframe(pd.DataFrame(profiler.summary()), hide_index=True)
@@ -0,0 +1,167 @@
+"""
+Synthetic ledgers for benchmarking.
+
+Writes database/transactions.txt, budgets.txt and goals.txt under a target
+directory, with dates spread over the last few years up to today (so the
+current-month views have data), expense categories weighted the way real
+spending is, log-normal amounts per category, a monthly salary and budgets
+for every month.
+
+    python -m benchmarks.generate --rows 1M --out /tmp/pft-1m
+"""
+import argparse
+import itertools
+import math
+import os
+import random
+from datetime import date, timedelta
+
+# category: (share of expense rows, median amount in Rs, descriptions)
+EXPENSE_PROFILE = {
+    "Food": (0.34, 650, ["Groceries", "Lunch", "Dinner out", "Biryani", "Tea and snacks", "Bakery"]),
+    "Transport": (0.20, 350, ["Fuel", "Ride hailing", "Bus fare", "Parking", "Rickshaw"]),
+    "Shopping": (0.14, 2800, ["Clothes", "Shoes", "Electronics", "Household items", "Gifts"]),
+    "Bills": (0.08, 4500, ["Electricity bill", "Gas bill", "Internet", "Mobile package", "Water bill"]),
+    "Entertainment": (0.11, 1500, ["Cinema", "Streaming subscription", "Games", "Concert", "Day out"]),
+    "Health": (0.05, 2200, ["Pharmacy", "Doctor visit", "Lab test", "Gym"]),
+    "Other": (0.08, 900, ["Miscellaneous", "Donation", "Repairs", "Stationery"]),
+}
+# category: (share of non-salary income rows, median amount in Rs)
+EXTRA_INCOME_PROFILE = {
+    "Freelance": (0.45, 18000),
+    "Business": (0.15, 35000),
+    "Investment": (0.25, 6000),
+    "Gift": (0.10, 4000),
+    "Other": (0.05, 2500),
+}
+EXTRA_INCOME_SHARE = 0.02
+AMOUNT_SIGMA = 0.7
+SALARY_SIGMA = 0.05
+WRITE_CHUNK_ROWS = 100_000
+
+def parse_rows(text):
+    """'100k' / '1M' / '250000' -> int."""
+    text = text.strip()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:].lower())
+    if multiplier:
+        return int(float(text[:-1]) * multiplier)
+    return int(text)
+
+def _months(start, end):
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def _amount_paisa(rng, median_rs, sigma=AMOUNT_SIGMA):
+    return max(100, int(rng.lognormvariate(math.log(median_rs), sigma) * 100))
+
+def iter_transactions(rows, years=5, seed=0, end=None):
+    """
+    Yields `rows` transaction dicts in date order, spread evenly over `years`
+    years ending on `end` (default: today). Each month starts with a salary
+    sized so income runs a little ahead of spending.
+    """
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = end - timedelta(days=int(365.25 * years) - 1)
+    days = (end - start).days + 1
+
+    categories = list(EXPENSE_PROFILE)
+    cum_weights = list(itertools.accumulate(EXPENSE_PROFILE[c][0] for c in categories))
+    income_categories = list(EXTRA_INCOME_PROFILE)
+    income_cum_weights = list(itertools.accumulate(EXTRA_INCOME_PROFILE[c][0] for c in income_categories))
+
+    mean_expense_rs = sum(
+        share * median * math.exp(AMOUNT_SIGMA ** 2 / 2) for share, median, _ in EXPENSE_PROFILE.values()
+    )
+    rows_per_month = rows * 30.44 / days
+    salary_rs = max(25_000, mean_expense_rs * rows_per_month * 1.1)
+
+    day_index = None
+    last_month = None
+    for i in range(rows):
+        id = f"{i + 1:08x}"
+        if i * days // rows != day_index:
+            day_index = i * days // rows
+            day = start + timedelta(days=day_index)
+            date_str = day.isoformat()
+            if day.month != last_month:
+                # First row of each month is the salary
+                last_month = day.month
+                yield {"id": id, "date": date_str, "type": "Income", "category": "Salary",
+                       "amount_paisa": _amount_paisa(rng, salary_rs, SALARY_SIGMA), "description": "Monthly salary"}
+                continue
+
+        if rng.random() < EXTRA_INCOME_SHARE:
+            category = rng.choices(income_categories, cum_weights=income_cum_weights)[0]
+            yield {"id": id, "date": date_str, "type": "Income", "category": category,
+                   "amount_paisa": _amount_paisa(rng, EXTRA_INCOME_PROFILE[category][1]),
+                   "description": f"{category} income"}
+        else:
+            category = rng.choices(categories, cum_weights=cum_weights)[0]
+            _, median, descriptions = EXPENSE_PROFILE[category]
+            yield {"id": id, "date": date_str, "type": "Expense", "category": category,
+                   "amount_paisa": _amount_paisa(rng, median), "description": rng.choice(descriptions)}
+
+def generate(out_dir, rows, years=5, seed=0, end=None):
+    """
+    Writes a synthetic database/ (transactions, budgets, goals) under out_dir.
+    Returns the number of transaction lines written.
+    """
+    from features.transactions.transactions import format_transaction_line
+
+    rng = random.Random(seed + 1)
+    end = end or date.today()
+    database = os.path.join(out_dir, "database")
+    os.makedirs(database, exist_ok=True)
+
+    count = 0
+    first = None
+    with open(os.path.join(database, "transactions.txt"), "w", encoding="utf-8") as f:
+        chunk = []
+        for t in iter_transactions(rows, years, seed, end):
+            first = first or t['date']
+            chunk.append(format_transaction_line(t))
+            if len(chunk) >= WRITE_CHUNK_ROWS:
+                f.writelines(chunk)
+                count += len(chunk)
+                chunk = []
+        f.writelines(chunk)
+        count += len(chunk)
+
+    # A budget per expense category per month, around the typical monthly spend
+    months = list(_months(date.fromisoformat(first), end)) if first else []
+    rows_per_month = count / max(len(months), 1)
+    with open(os.path.join(database, "budgets.txt"), "w", encoding="utf-8") as f:
+        for year, month in months:
+            for category, (share, median, _) in EXPENSE_PROFILE.items():
+                typical = share * rows_per_month * median * math.exp(AMOUNT_SIGMA ** 2 / 2)
+                limit = max(1000, round(typical * rng.uniform(0.85, 1.3), -2))
+                f.write(f"{category}|{int(limit * 100)}|{year}-{month:02d}\n")
+
+    goals = [("Emergency Fund", 500_000), ("New Laptop", 250_000), ("Hajj Savings", 1_500_000), ("Car", 3_000_000)]
+    with open(os.path.join(database, "goals.txt"), "w", encoding="utf-8") as f:
+        for name, target in goals:
+            saved = int(target * rng.uniform(0.1, 0.9))
+            deadline = (end + timedelta(days=rng.randint(90, 900))).isoformat()
+            f.write(f"{name}|{target * 100}|{saved * 100}|{deadline}\n")
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.generate",
+        description="Write a synthetic ledger (plus budgets and goals) for benchmarking."
+    )
+    parser.add_argument("--rows", default="100k", help="number of transactions, e.g. 10k, 100k, 1M, 10M")
+    parser.add_argument("--years", type=float, default=5, help="history length ending today (default 5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="directory to create database/ in")
+    args = parser.parse_args(argv)
+
+    count = generate(args.out, parse_rows(args.rows), args.years, args.seed)
+    print(f"Wrote {count:,} transactions to {os.path.join(args.out, 'database')}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,260 @@
+"""
+Benchmark harness.
+
+Generates a synthetic ledger per size in a scratch directory (see
+generate.py), runs the tracker's hot paths against it and writes the
+timings to JSON. With --compare, the run is checked against a stored
+baseline and any case slower by more than --threshold is flagged (exit 1).
+
+    python -m benchmarks.run --sizes 10k,100k --output bench.json
+    python -m benchmarks.run --sizes 100k --compare bench.json
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.generate import generate, parse_rows
+
+console = Console()
+
+DEFAULT_SIZES = "10k,100k"
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25
+# Differences below this are noise, whatever the ratio
+NOISE_FLOOR_SECONDS = 0.005
+
+def reset_caches(on_disk=False):
+    """Forgets every in-memory parse/index (and with on_disk, the persisted checkpoints and rollups too)."""
+    from features.storage import cache
+
+    cache.reset_all()
+    if on_disk:
+        for path in glob.glob(os.path.join("database", "**", ".*"), recursive=True):
+            if os.path.isfile(path):
+                os.remove(path)
+
+def _quiet(fn):
+    # Views print through rich consoles that write to sys.stdout
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+    return run
+
+def _cases():
+    """(name, setup, fn) for every benchmarked operation; setup runs untimed before each run."""
+    from features.transactions.transactions import load_transactions
+    from features.transactions.rollups import month_category_totals, month_totals
+    from features.transactions import search as search_module
+    from features.transactions.search import search
+    from features.transactions.recent import recent_transactions
+    from features.budgets.budgets import load_budgets, upsert_budget, view_budget
+    from features.financial_analytics.analytics import show_analytics
+    from features.financial_analytics.engine import monthly_history
+    from features.financial_analytics.series import spending_pace, spending_trend
+    from features.smart_assistant.assistant import daily_check, smart_recommendations
+    from features.data_management import manager, columnar
+
+    now = datetime.now()
+    last_month = (now.year - 1, 12) if now.month == 1 else (now.year, now.month - 1)
+
+    def cold():
+        reset_caches(on_disk=True)
+
+    def warm():
+        # Checkpoints and rollups on disk, nothing in memory
+        load_transactions()
+        month_totals(now.year, now.month)
+        reset_caches()
+
+    def hot():
+        load_transactions()
+        month_totals(now.year, now.month)
+
+    def hot_unindexed():
+        hot()
+        search_module.reset()
+
+    def clear_exports():
+        shutil.rmtree(manager.EXPORT_DIR, ignore_errors=True)
+
+    def analytics_computations():
+        month_totals(now.year, now.month)
+        month_category_totals('Expense', now.year, now.month)
+        month_totals(*last_month)
+
+    cases = [
+        ("load_transactions.cold", cold, load_transactions),
+        ("load_transactions.warm", warm, load_transactions),
+        ("load_transactions.hot", hot, load_transactions),
+        ("load_budgets", hot, load_budgets),
+        ("upsert_budget", hot, lambda: upsert_budget("Food", 1_500_000, f"{now.year}-{now.month:02d}")),
+        ("recent_transactions.cold", cold, lambda: recent_transactions(10)),
+        ("recent_transactions", hot, lambda: recent_transactions(10)),
+        ("search.cold", hot_unindexed, lambda: search("biryani")),
+        ("search", hot, lambda: search("biryani")),
+        ("search.fuzzy", hot, lambda: search("grocerys", fuzzy=True)),
+        ("view_budget.aggregation.cold", cold, lambda: month_category_totals('Expense', now.year, now.month)),
+        ("view_budget.aggregation", hot, lambda: month_category_totals('Expense', now.year, now.month)),
+        ("view_budget", hot, _quiet(view_budget)),
+        ("show_analytics.computations", hot, analytics_computations),
+        ("show_analytics", hot, _quiet(show_analytics)),
+        ("monthly_history", hot, monthly_history),
+        ("spending_trend", hot, spending_trend),
+        ("spending_pace", hot, spending_pace),
+        ("daily_check", hot, _quiet(daily_check)),
+        ("smart_recommendations", hot, _quiet(smart_recommendations)),
+        ("export.transactions_csv", clear_exports, _quiet(manager.export_transactions_csv)),
+        ("export.transactions_json", clear_exports, _quiet(manager.export_transactions_json)),
+        ("export.transactions_ndjson", clear_exports, _quiet(manager.export_transactions_ndjson)),
+        ("export.transactions_ndjson_gzip", clear_exports, _quiet(lambda: manager.export_transactions_ndjson(compress=True))),
+        ("export.budgets_csv", clear_exports, _quiet(manager.export_budgets_csv)),
+    ]
+    if columnar.available():
+        cases += [
+            ("export.transactions_parquet", clear_exports, _quiet(manager.export_transactions_columnar)),
+            ("export.transactions_feather", clear_exports, _quiet(lambda: manager.export_transactions_columnar("feather"))),
+        ]
+    return cases
+
+def time_case(setup, fn, repeat):
+    # One untimed run first, so lazy imports and first-call costs don't count
+    setup()
+    fn()
+    runs = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {"min": min(runs), "median": statistics.median(runs), "runs": runs}
+
+def run_size(rows, repeat, years, keep=False):
+    """Generates a ledger of `rows` transactions in a scratch dir and times every case in it."""
+    workdir = tempfile.mkdtemp(prefix=f"pft-bench-{rows}-")
+    previous = os.getcwd()
+    try:
+        start = time.perf_counter()
+        generate(workdir, rows, years)
+        console.print(f"[dim]Generated {rows:,} rows in {time.perf_counter() - start:.1f}s ({workdir})[/dim]")
+
+        os.chdir(workdir)
+        from features.storage.backend import use_sqlite
+        if use_sqlite():
+            from features.storage import sqlite_backend
+            sqlite_backend.reset()
+            sqlite_backend.import_text()
+
+        results = {}
+        for name, setup, fn in _cases():
+            results[name] = time_case(setup, fn, repeat)
+            console.print(f"  {name:<36} {results[name]['median'] * 1000:>10.1f} ms")
+        reset_caches()
+        return results
+    finally:
+        os.chdir(previous)
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Rows of (size, case, baseline_s, current_s, ratio, regressed) for every
+    case present in both runs, comparing medians.
+    """
+    rows = []
+    for size, cases in current["results"].items():
+        for name, result in cases.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            ratio = result["median"] / base["median"] if base["median"] else float("inf")
+            regressed = ratio > 1 + threshold and result["median"] - base["median"] > NOISE_FLOOR_SECONDS
+            rows.append((size, name, base["median"], result["median"], ratio, regressed))
+    return rows
+
+def print_comparison(rows, threshold):
+    table = Table(title=f"Against baseline (regression: > {threshold:.0%} slower)")
+    table.add_column("Size")
+    table.add_column("Case")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right")
+    for size, name, base, current, ratio, regressed in rows:
+        color = "red" if regressed else "green" if ratio < 1 else "white"
+        table.add_row(size, name, f"{base * 1000:.1f} ms", f"{current * 1000:.1f} ms",
+                      f"[{color}]{(ratio - 1) * 100:+.1f}%[/{color}]")
+    console.print(table)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Time the tracker's hot paths on synthetic ledgers."
+    )
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated ledger sizes (default {DEFAULT_SIZES}; e.g. 10k,100k,1M,10M)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per case; the median is reported")
+    parser.add_argument("--years", type=float, default=5, help="history length of the synthetic ledgers")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against a previous results file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown ratio (default 0.25)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated ledgers")
+    args = parser.parse_args(argv)
+
+    # The features package is imported relative to the repo, the data relative to the scratch dirs
+    sys.path.insert(0, os.getcwd())
+
+    current = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage": os.environ.get("PFT_STORAGE", "text"),
+            "repeat": args.repeat,
+        },
+        "results": {}
+    }
+    for size in args.sizes.split(","):
+        size = size.strip()
+        console.print(f"[bold]{size}[/bold]")
+        current["results"][size] = run_size(parse_rows(size), args.repeat, args.years, args.keep)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        console.print(f"[green]Results written to {args.output}[/green]")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(current, baseline, args.threshold)
+        print_comparison(rows, args.threshold)
+        regressions = [row for row in rows if row[5]]
+        if regressions:
+            console.print(f"[bold red]{len(regressions)} regression(s).[/bold red]")
+            return 1
+        console.print("[green]No regressions.[/green]")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+"""
+Startup-time budget check.
+
+Imports each CLI entry point in a fresh interpreter under
+`python -X importtime`, takes the best cumulative import time over a few
+runs and fails (exit 1) if it exceeds the budget or pulls in a module that
+entry point must not load at startup (e.g. questionary before the first
+prompt, numpy/pandas in the plain CLI).
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --scale 2      # slower machine / CI runner
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+DEFAULT_RUNS = 5
+
+# module: (budget in ms, modules it must not import)
+BUDGETS = {
+    "main": (150, ("questionary", "prompt_toolkit", "numpy", "pandas", "features.transactions.transactions",
+                   "features.budgets.budgets", "features.financial_analytics.analytics",
+                   "features.smart_assistant.assistant", "features.data_management.manager")),
+    "cli": (100, ("questionary", "prompt_toolkit", "rich", "numpy", "pandas", "features")),
+    "features.transactions.transactions": (250, ("questionary", "prompt_toolkit", "numpy", "pandas", "rich.table")),
+    "features.transactions.rollups": (120, ("questionary", "rich", "numpy", "pandas")),
+    "features.data_management.exporter": (300, ("questionary", "prompt_toolkit", "numpy", "pandas")),
+    "features.data_management.manager": (350, ("questionary", "prompt_toolkit", "numpy", "pandas")),
+    "features.financial_analytics.engine": (600, ("questionary", "prompt_toolkit", "pandas")),
+}
+
+def measure(module, runs=DEFAULT_RUNS):
+    """(best cumulative import time in seconds, set of every module imported) for `module` in a fresh interpreter."""
+    best = None
+    imported = set()
+    env = dict(os.environ, PFT_PROFILE="")
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, env=env
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            name = name.strip()
+            imported.add(name)
+            if name == module and cumulative.strip().isdigit():
+                seconds = int(cumulative) / 1_000_000
+                best = seconds if best is None else min(best, seconds)
+    return best, imported
+
+def check(budgets=BUDGETS, runs=DEFAULT_RUNS, scale=1.0):
+    """Rows of (module, seconds, budget_seconds, unwanted modules imported, ok)."""
+    rows = []
+    for module, (budget_ms, forbidden) in budgets.items():
+        seconds, imported = measure(module, runs)
+        unwanted = [
+            f for f in forbidden
+            if any(name == f or name.startswith(f + ".") for name in imported)
+        ]
+        budget = budget_ms * scale / 1000
+        rows.append((module, seconds, budget, unwanted, seconds <= budget and not unwanted))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.startup",
+        description="Fail if the CLI entry points import too slowly or load heavy modules at startup."
+    )
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="fresh interpreters per module; the best time counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (for slower machines)")
+    parser.add_argument("modules", nargs="*", help=f"default: {', '.join(BUDGETS)}")
+    args = parser.parse_args(argv)
+
+    budgets = BUDGETS
+    if args.modules:
+        unknown = [m for m in args.modules if m not in BUDGETS]
+        if unknown:
+            parser.error(f"no budget for: {', '.join(unknown)}")
+        budgets = {m: BUDGETS[m] for m in args.modules}
+
+    try:
+        rows = check(budgets, args.runs, args.scale)
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
+        return 2
+
+    table = Table(title="Import time (python -X importtime)")
+    table.add_column("Module", style="cyan")
+    table.add_column("Import", justify="right")
+    table.add_column("Budget", justify="right")
+    table.add_column("Unwanted imports")
+    for module, seconds, budget, unwanted, ok in rows:
+        color = "green" if ok else "red"
+        table.add_row(module, f"[{color}]{seconds * 1000:.1f} ms[/{color}]", f"{budget * 1000:.0f} ms",
+                      f"[red]{', '.join(unwanted)}[/red]" if unwanted else "")
+    console.print(table)
+
+    failures = [row for row in rows if not row[4]]
+    if failures:
+        console.print(f"[bold red]{len(failures)} module(s) over budget.[/bold red]")
+        return 1
+    console.print("[green]All entry points within budget.[/green]")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,338 @@
+"""
+Non-interactive command line for scripts, cron jobs and pipelines.
+
+Every command prints JSON on stdout (errors too, as {"error": ...}) and
+exits non-zero on failure. `batch` runs many commands in one process, one
+per line, printing one JSON result per line.
+
+    uv run cli.py add --type Expense --amount 450 --category Food --description Lunch
+    uv run cli.py add --from-file statement.csv
+    uv run cli.py balance --month 2025-01
+    uv run cli.py budget set Food 15000 --month 2025-01
+    uv run cli.py budget show
+    uv run cli.py report --from 2024-01 --to 2024-12
+    uv run cli.py transactions --from 2025-01-01 --to 2025-03-31
+    uv run cli.py search "biryani" --limit 10
+    uv run cli.py ledgers balance --ledger asha=../asha --ledger ravi=../ravi
+    uv run cli.py export exports/transactions.ndjson.gz
+    uv run cli.py batch commands.txt        # or: ... | uv run cli.py batch -
+"""
+import argparse
+import contextlib
+import json
+import shlex
+import sys
+from datetime import datetime
+
+COLUMNAR_EXTENSIONS = (".parquet", ".feather", ".arrow", ".ipc")
+
+class CommandError(Exception):
+    pass
+
+def _month(text):
+    try:
+        datetime.strptime(text, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {text!r}") from None
+    return text
+
+def _date(text):
+    try:
+        datetime.strptime(text, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {text!r}") from None
+    return text
+
+def _current_month():
+    return datetime.now().strftime("%Y-%m")
+
+# --- Commands: each takes the parsed args and returns a JSON-serializable result ---
+def cmd_add(args):
+    if args.from_file:
+        from features.data_management.importer import import_file
+
+        report = import_file(args.from_file, args.format, args.dry_run)
+        report["errors"] = [{"line": line, "message": message} for line, message in report["errors"]]
+        report["dry_run"] = args.dry_run
+        return report
+
+    from features.data_management.importer import to_transaction
+    from features.transactions.transactions import save_transaction
+
+    missing = [name for name in ("type", "amount", "category") if getattr(args, name) is None]
+    if missing:
+        raise CommandError(f"missing --{', --'.join(missing)} (or use --from-file)")
+    record = {
+        "id": args.id,
+        "date": args.date or datetime.now().strftime("%Y-%m-%d"),
+        "type": args.type,
+        "category": args.category,
+        "amount": args.amount,
+        "description": args.description,
+    }
+    try:
+        t = to_transaction(record)
+    except ValueError as e:
+        raise CommandError(str(e)) from None
+    if not args.dry_run:
+        save_transaction(t)
+    return {"added": 0 if args.dry_run else 1, "transaction": t, "dry_run": args.dry_run}
+
+def cmd_balance(args):
+    from features.transactions.rollups import month_category_totals, month_totals
+
+    month_year = args.month or _current_month()
+    year, month = int(month_year[:4]), int(month_year[5:7])
+    income, expense = month_totals(year, month)
+    return {
+        "month": month_year,
+        "income_paisa": income,
+        "expense_paisa": expense,
+        "balance_paisa": income - expense,
+        "expense_by_category": month_category_totals("Expense", year, month),
+        "income_by_category": month_category_totals("Income", year, month),
+    }
+
+def cmd_budget_set(args):
+    from features.budgets.budgets import upsert_budget
+    from features.transactions.transactions import EXPENSE_CATEGORIES, validate_amount
+
+    if args.category not in EXPENSE_CATEGORIES:
+        raise CommandError(f"category {args.category!r} is not an expense category ({', '.join(EXPENSE_CATEGORIES)})")
+    valid = validate_amount(args.amount)
+    if valid is not True:
+        raise CommandError(f"amount {args.amount!r}: {valid}")
+    month_year = args.month or _current_month()
+    limit_paisa = int(round(float(args.amount) * 100))
+    replaced = upsert_budget(args.category, limit_paisa, month_year)
+    return {"category": args.category, "limit_paisa": limit_paisa, "month": month_year, "replaced": replaced}
+
+def cmd_budget_show(args):
+    from features.budgets.budgets import budget_status
+
+    month_year = args.month or _current_month()
+    rows = budget_status(month_year)
+    for row in rows:
+        row["utilization"] = round(row["utilization"], 2)
+    return {
+        "month": month_year,
+        "budgets": rows,
+        "total_limit_paisa": sum(r["limit_paisa"] for r in rows),
+        "total_spent_paisa": sum(r["spent_paisa"] for r in rows),
+    }
+
+def cmd_report(args):
+    from features.financial_analytics.engine import health_scores, monthly_history
+
+    history = monthly_history(args.start, args.end)
+    scores = health_scores(history)
+    months = []
+    for i, month_year in enumerate(history["months"]):
+        row = history["by_category"][i]
+        months.append({
+            "month": month_year,
+            "income_paisa": int(history["income"][i]),
+            "expense_paisa": int(history["expense"][i]),
+            "savings_paisa": int(history["savings"][i]),
+            "savings_rate": round(float(history["savings_rate"][i]), 2),
+            "by_category": {c: int(a) for c, a in zip(history["categories"], row) if a},
+            "health_score": scores[i][0],
+        })
+    return {"from": args.start, "to": args.end, "months": months}
+
+def cmd_transactions(args):
+    from features.transactions.transactions import transactions_between
+
+    start = args.start or "0001-01-01"
+    end = args.end or datetime.now().strftime("%Y-%m-%d")
+    rows = transactions_between(start, end)
+    selected = range(len(rows)) if args.limit is None else range(max(len(rows) - args.limit, 0), len(rows))
+    return {"from": start, "to": end, "count": len(rows), "transactions": [rows[i].copy() for i in reversed(selected)]}
+
+def _ledgers(args):
+    from features.transactions.ledgers import configured_ledgers, parse_ledgers, LEDGERS_ENV
+
+    ledgers = parse_ledgers(args.ledger) if args.ledger else configured_ledgers()
+    if not ledgers:
+        raise CommandError(f"no ledgers: pass --ledger NAME=DIR or set {LEDGERS_ENV}")
+    return ledgers
+
+def cmd_ledgers_balance(args):
+    from features.transactions.ledgers import consolidated_balance
+    return consolidated_balance(_ledgers(args), args.month)
+
+def cmd_ledgers_budgets(args):
+    from features.transactions.ledgers import consolidated_budgets
+    result = consolidated_budgets(_ledgers(args), args.month or _current_month())
+    for rows in list(result["ledgers"].values()) + [result["total"]]:
+        for row in rows:
+            row["utilization"] = round(row["utilization"], 2)
+    return result
+
+def cmd_ledgers_history(args):
+    from features.transactions.ledgers import consolidated_history
+    return {"from": args.start, "to": args.end, "months": consolidated_history(_ledgers(args), args.start, args.end)}
+
+def cmd_search(args):
+    from features.transactions.search import search_transactions
+
+    matches = search_transactions(args.query, args.limit, args.fuzzy)
+    return {"query": args.query, "count": len(matches), "transactions": matches}
+
+def cmd_export(args):
+    from features.data_management import columnar, exporter
+
+    if args.format in columnar.FORMATS or (args.format is None and args.path.endswith(COLUMNAR_EXTENSIONS)):
+        try:
+            return columnar.export_transactions(args.path, args.format)
+        except RuntimeError as e:
+            raise CommandError(str(e)) from None
+    return exporter.export_transactions(args.path, args.format, args.gzip or None)
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="pft",
+        description="Personal Finance Tracker, non-interactive. Prints JSON."
+    )
+    parser.add_argument("--indent", type=int, help="pretty-print the JSON output")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add one transaction, or bulk-import a CSV/JSON file")
+    add.add_argument("--type", choices=["Expense", "Income"])
+    add.add_argument("--amount", help="in Rs, e.g. 450 or 99.50")
+    add.add_argument("--category")
+    add.add_argument("--description", default="")
+    add.add_argument("--date", help="YYYY-MM-DD (default: today)")
+    add.add_argument("--id", help="default: a random 8-character id")
+    add.add_argument("--from-file", metavar="PATH", help="import every row of a CSV/JSON/NDJSON statement")
+    add.add_argument("--format", choices=["csv", "json"], help="with --from-file; default: guessed from the extension")
+    add.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    add.set_defaults(handler=cmd_add)
+
+    balance = commands.add_parser("balance", help="income, expenses and balance for a month")
+    balance.add_argument("--month", type=_month, help="YYYY-MM (default: this month)")
+    balance.set_defaults(handler=cmd_balance)
+
+    budget = commands.add_parser("budget", help="set or show monthly budgets")
+    budget_commands = budget.add_subparsers(dest="budget_command", required=True)
+    budget_set = budget_commands.add_parser("set", help="set (or replace) a category's budget")
+    budget_set.add_argument("category")
+    budget_set.add_argument("amount", help="in Rs")
+    budget_set.add_argument("--month", type=_month, help="YYYY-MM (default: this month)")
+    budget_set.set_defaults(handler=cmd_budget_set)
+    budget_show = budget_commands.add_parser("show", help="spending against each budget")
+    budget_show.add_argument("--month", type=_month, help="YYYY-MM (default: this month)")
+    budget_show.set_defaults(handler=cmd_budget_show)
+
+    report = commands.add_parser("report", help="month-by-month history with health scores")
+    report.add_argument("--from", dest="start", type=_month, help="first month, YYYY-MM")
+    report.add_argument("--to", dest="end", type=_month, help="last month, YYYY-MM")
+    report.set_defaults(handler=cmd_report)
+
+    listing = commands.add_parser("transactions", help="transactions dated within a range, newest first")
+    listing.add_argument("--from", dest="start", type=_date, help="first date, YYYY-MM-DD (default: the beginning)")
+    listing.add_argument("--to", dest="end", type=_date, help="last date, YYYY-MM-DD (default: today)")
+    listing.add_argument("--limit", type=int, help="only the newest N")
+    listing.set_defaults(handler=cmd_transactions)
+
+    ledgers = commands.add_parser("ledgers", help="balance, budgets or history across several ledgers, merged by date")
+    ledger_commands = ledgers.add_subparsers(dest="ledgers_command", required=True)
+    for name, help_text, handler in (
+        ("balance", "income, expenses and balance per ledger and in total", cmd_ledgers_balance),
+        ("budgets", "each ledger's budgets and the combined ones", cmd_ledgers_budgets),
+        ("history", "month-by-month income and expenses per ledger", cmd_ledgers_history),
+    ):
+        sub = ledger_commands.add_parser(name, help=help_text)
+        sub.add_argument("--ledger", action="append", default=[], metavar="NAME=DIR",
+                         help="repeatable; default: the comma-separated PFT_LEDGERS")
+        if name == "history":
+            sub.add_argument("--from", dest="start", type=_month, help="first month, YYYY-MM")
+            sub.add_argument("--to", dest="end", type=_month, help="last month, YYYY-MM")
+        else:
+            sub.add_argument("--month", type=_month, help="YYYY-MM (default: all time for balance, this month for budgets)")
+        sub.set_defaults(handler=handler)
+
+    search = commands.add_parser("search", help="transactions whose description or category match, newest first")
+    search.add_argument("query", help="words to match; the last may be a prefix")
+    search.add_argument("--fuzzy", action="store_true", help="allow one typo per word")
+    search.add_argument("--limit", type=int, default=50, help="default: 50")
+    search.set_defaults(handler=cmd_search)
+
+    export = commands.add_parser("export", help="export all transactions (CSV, JSON, NDJSON, Parquet, Feather)")
+    export.add_argument("path")
+    export.add_argument("--format", choices=["csv", "json", "ndjson", "parquet", "feather"],
+                        help="default: guessed from the extension")
+    export.add_argument("--gzip", action="store_true", help="compress even if the path doesn't end in .gz")
+    export.set_defaults(handler=cmd_export)
+
+    batch = commands.add_parser("batch", help="run one command per line of a file (- for stdin)")
+    batch.add_argument("file")
+    batch.add_argument("--stop-on-error", action="store_true")
+    batch.set_defaults(handler=None)
+    return parser
+
+def execute(args):
+    """Runs a parsed command; returns (exit code, result or error dict)."""
+    try:
+        return 0, args.handler(args)
+    except (CommandError, OSError, ValueError, OverflowError) as e:
+        return 1, {"error": str(e)}
+
+def run(parser, argv):
+    """Parses and runs one batch line."""
+    try:
+        # stdout carries the JSON results, so --help goes to stderr like usage errors
+        with contextlib.redirect_stdout(sys.stderr):
+            args = parser.parse_args(argv)
+    except SystemExit as e:
+        if not e.code:
+            return 1, {"error": "--help is not supported in batch; the help text went to stderr"}
+        return e.code, {"error": "invalid arguments"}
+    if args.handler is None:
+        return 2, {"error": "batch can't be nested"}
+    return execute(args)
+
+def run_batch(parser, path, stop_on_error=False):
+    """Runs each non-empty, non-comment line of `path` as a command, printing one JSON result per line."""
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    failures = 0
+    try:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                argv = shlex.split(line)
+            except ValueError as e:
+                code, result = 2, {"error": f"unparseable command: {e}"}
+            else:
+                code, result = run(parser, argv)
+            _emit({"line": line_number, "command": line, "ok": code == 0, "result": result})
+            if code:
+                failures += 1
+                if stop_on_error:
+                    break
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return 1 if failures else 0
+
+def _emit(result, indent=None):
+    sys.stdout.write(json.dumps(result, indent=indent, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        try:
+            return run_batch(parser, args.file, args.stop_on_error)
+        except OSError as e:
+            _emit({"error": str(e)}, args.indent)
+            return 1
+    code, result = execute(args)
+    _emit(result, args.indent)
+    return code
+
+if __name__ == "__main__":
+    raise SystemExit(main())
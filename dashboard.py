@@ -1,8 +1,12 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from features.transactions.transactions import load_transactions
-from features.budgets.budgets import load_budgets, EXPENSE_CATEGORIES
+from features.transactions.rollups import month_totals, month_category_totals
+from features.financial_analytics.series import spending_pace
+from features.budgets.budgets import EXPENSE_CATEGORIES
+from features.transactions.recent import recent_transactions
+from features.storage.cache import get_transactions, get_budgets
+from features.profiling import profiler
 
 # --- Page Config ---
 st.set_page_config(page_title="Personal Finance Tracker", page_icon="💰", layout="wide")
@@ -33,18 +37,16 @@ st.title("💰 Personal Finance Dashboard")
 st.markdown("---")
 
 # --- Data Loading ---
-transactions = load_transactions()
-budgets = load_budgets()
-current_month = datetime.now().strftime("%Y-%m")
+page_span = profiler.start("dashboard.page")
+transactions = get_transactions()
+budgets = get_budgets()
+now = datetime.now()
+current_month = now.strftime("%Y-%m")
 
 # --- Section 1: Balance & Overview ---
 st.subheader("📊 Financial Overview")
 
-income_txns = [t for t in transactions if t['type'] == 'Income' and t['date'].startswith(current_month)]
-expense_txns = [t for t in transactions if t['type'] == 'Expense' and t['date'].startswith(current_month)]
-
-total_income = sum(t['amount_paisa'] for t in income_txns)
-total_expense = sum(t['amount_paisa'] for t in expense_txns)
+total_income, total_expense = month_totals(now.year, now.month)
 current_balance = total_income - total_expense
 
 col1, col2, col3 = st.columns(3)
@@ -58,6 +60,13 @@ with col2:
 with col3:
     st.metric(label="Total Expenses (This Month)", value=f"Rs {total_expense/100:,.2f}", delta="-", delta_color="inverse")
 
+# Spending pace from the daily series
+pace = spending_pace()
+col4, col5, col6 = st.columns(3)
+col4.metric(label="7-Day Avg Spend", value=f"Rs {pace['avg_7']/100:,.2f} / day")
+col5.metric(label="30-Day Avg Spend", value=f"Rs {pace['avg_30']/100:,.2f} / day")
+col6.metric(label="Projected Month-End Spend", value=f"Rs {pace['projected']/100:,.2f}")
+
 st.markdown("---")
 
 # --- Section 2: Budget Status ---
@@ -69,10 +78,7 @@ if not month_budgets:
     st.info("No budgets set for this month. Go to the CLI to set your budgets!")
 else:
     # Calculate spending per category
-    category_spending = {}
-    for t in expense_txns:
-        cat = t['category']
-        category_spending[cat] = category_spending.get(cat, 0) + t['amount_paisa']
+    category_spending = month_category_totals('Expense', now.year, now.month)
 
     cols = st.columns(3) # Display in a grid
     for i, budget in enumerate(month_budgets):
@@ -112,12 +118,8 @@ st.subheader("📝 Recent Transactions")
 if not transactions:
     st.info("No transactions found.")
 else:
-    # Prepare DataFrame
-    df = pd.DataFrame(transactions)
-    
-    # Sort by date descending
-    df['date_dt'] = pd.to_datetime(df['date'])
-    df = df.sort_values(by='date_dt', ascending=False).head(10)
+    # Read back from the end of the ledger, not sorted from the whole frame
+    df = pd.DataFrame(recent_transactions(10))
     
     # Format for display
     display_df = pd.DataFrame()
@@ -137,3 +139,9 @@ else:
         use_container_width=True,
         hide_index=True
     )
+
+# --- Profiling (PFT_PROFILE=1) ---
+page_span.stop()
+if profiler.ENABLED:
+    with st.sidebar.expander("⏱️ Profile"):
+        st.dataframe(pd.DataFrame(profiler.summary()), hide_index=True)
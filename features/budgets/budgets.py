@@ -1,44 +1,88 @@
 import os
-import questionary
 from datetime import datetime
-from rich.console import Console
 from rich.table import Table
-from rich.progress import BarColumn, Progress, TextColumn
 from rich.panel import Panel
 
 # Import shared resources
-from features.transactions.transactions import load_transactions, EXPENSE_CATEGORIES, validate_amount
+from features.transactions.transactions import EXPENSE_CATEGORIES, validate_amount
+from features.transactions.rollups import month_category_totals
+from features.storage.backend import use_sqlite
+from features.storage import cache
+from features.storage.keyed import KeyedLog
+from features.smart_assistant import alerts
+from features.profiling.profiler import profiled
+from features.console import console
 
-console = Console()
 DB_PATH = os.path.join("database", "budgets.txt")
+STATUS_COLORS = {"OK": "green", "WARNING": "yellow", "OVER": "red"}
 
+@profiled("storage.load_budgets")
 def load_budgets():
     """
     Returns a list of budget dicts:
     [{'category': 'Food', 'limit_paisa': 500000, 'month_year': '2023-10'}]
     """
-    budgets = []
-    if not os.path.exists(DB_PATH):
-        return budgets
-
-    with open(DB_PATH, "r") as f:
-        for line in f:
-            if line.strip():
-                parts = line.strip().split("|")
-                if len(parts) == 3:
-                    budgets.append({
-                        "category": parts[0],
-                        "limit_paisa": int(parts[1]),
-                        "month_year": parts[2]
-                    })
-    return budgets
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.load_budgets()
+    return load_text_budgets()
+
+def parse_budget_line(line):
+    parts = line.split("|")
+    if len(parts) != 3:
+        return None
+    return {
+        "category": parts[0],
+        "limit_paisa": int(parts[1]),
+        "month_year": parts[2]
+    }
+
+def format_budget_line(b):
+    return f"{b['category']}|{b['limit_paisa']}|{b['month_year']}"
+
+def budget_key(b):
+    return (b['category'], b['month_year'])
+
+# budgets.txt as an upsert log keyed on (category, month_year)
+_log = KeyedLog(DB_PATH, budget_key, parse_budget_line, format_budget_line)
+cache.on_reset(_log.forget)
+
+def load_text_budgets():
+    return _log.records()
 
+@profiled("storage.save_budgets")
 def save_all_budgets(budgets):
-    with open(DB_PATH, "w") as f:
-        for b in budgets:
-            f.write(f"{b['category']}|{b['limit_paisa']}|{b['month_year']}\n")
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        sqlite_backend.save_all_budgets(budgets)
+    else:
+        _log.replace_all(budgets)
+    cache.invalidate(cache.BUDGETS)
+    alerts.on_budgets()
+
+def get_budget(category, month_year):
+    """The budget for a category in a month, or None."""
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.get_budget(category, month_year)
+    return _log.get((category, month_year))
+
+@profiled("storage.upsert_budget")
+def upsert_budget(category, limit_paisa, month_year):
+    """Sets the budget for a category in a month, replacing any existing one. Returns True if one was replaced."""
+    budget = {"category": category, "limit_paisa": limit_paisa, "month_year": month_year}
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        replaced = sqlite_backend.upsert_budget(budget)
+    else:
+        replaced = _log.upsert(budget)
+    cache.invalidate(cache.BUDGETS)
+    alerts.on_budgets([(category, month_year)])
+    return replaced
 
 def set_budget():
+    import questionary
+
     category = questionary.select(
         "Select Category to Budget:",
         choices=EXPENSE_CATEGORIES + ["Back"]
@@ -58,38 +102,50 @@ def set_budget():
     amount_paisa = int(round(float(amount_str) * 100))
     current_month = datetime.now().strftime("%Y-%m")
 
-    # Load existing budgets to check for update
-    budgets = load_budgets()
-    
-    # Check if budget already exists for this category/month
-    existing_index = -1
-    for i, b in enumerate(budgets):
-        if b['category'] == category and b['month_year'] == current_month:
-            existing_index = i
-            break
-    
-    new_budget = {
-        "category": category,
-        "limit_paisa": amount_paisa,
-        "month_year": current_month
-    }
-
-    if existing_index >= 0:
-        # Update existing
-        if questionary.confirm(f"Budget for {category} already exists. Overwrite?", default=True).ask():
-            budgets[existing_index] = new_budget
-        else:
+    if get_budget(category, current_month) is not None:
+        if not questionary.confirm(f"Budget for {category} already exists. Overwrite?", default=True).ask():
             return
-    else:
-        # Add new
-        budgets.append(new_budget)
 
-    save_all_budgets(budgets)
+    upsert_budget(category, amount_paisa, current_month)
     console.print(f"[bold green]Budget set for {category}: Rs {amount_paisa/100:.2f}[/bold green]")
 
+def budget_status(month_year, budgets=None, spending=None):
+    """
+    Spending against each budget of a month ('YYYY-MM'):
+    [{'category', 'limit_paisa', 'spent_paisa', 'remaining_paisa', 'utilization', 'status'}]
+    where status is OK, WARNING (70% used) or OVER. `spending` ({category:
+    paisa}) defaults to this ledger's expenses for the month.
+    """
+    if budgets is None:
+        budgets = [b for b in load_budgets() if b['month_year'] == month_year]
+    if spending is None:
+        spending = month_category_totals("Expense", int(month_year[:4]), int(month_year[5:7]))
+
+    rows = []
+    for b in budgets:
+        limit = b['limit_paisa']
+        spent = spending.get(b['category'], 0)
+        utilization = (spent / limit) * 100 if limit > 0 else 0
+        if utilization > 100:
+            status = "OVER"
+        elif utilization >= 70:
+            status = "WARNING"
+        else:
+            status = "OK"
+        rows.append({
+            "category": b['category'],
+            "limit_paisa": limit,
+            "spent_paisa": spent,
+            "remaining_paisa": limit - spent,
+            "utilization": utilization,
+            "status": status
+        })
+    return rows
+
+@profiled("view.budget")
 def view_budget():
-    current_month = datetime.now().strftime("%Y-%m")
-    transactions = load_transactions()
+    now = datetime.now()
+    current_month = now.strftime("%Y-%m")
     budgets = load_budgets()
 
     # Filter budgets for current month
@@ -99,16 +155,6 @@ def view_budget():
         console.print(f"[yellow]No budgets set for {datetime.now().strftime('%B %Y')}.[/yellow]")
         return
 
-    # Calculate spending per category for current month
-    spending = {cat: 0 for cat in EXPENSE_CATEGORIES}
-    for t in transactions:
-        if t['type'] == "Expense" and t['date'].startswith(current_month):
-            if t['category'] in spending:
-                spending[t['category']] += t['amount_paisa']
-            else:
-                # Handle categories that might not be in the default list or changed
-                spending[t['category']] = spending.get(t['category'], 0) + t['amount_paisa']
-
     # Build Table
     table = Table(title=f"Budget Status - {datetime.now().strftime('%B %Y')}")
     table.add_column("Category", style="cyan")
@@ -121,28 +167,18 @@ def view_budget():
     total_budget = 0
     total_spent = 0
 
-    for b in month_budgets:
-        cat = b['category']
-        limit = b['limit_paisa']
-        spent = spending.get(cat, 0)
-        remaining = limit - spent
-        
-        utilization = (spent / limit) * 100 if limit > 0 else 0
-        
+    for row in budget_status(current_month, month_budgets):
+        cat = row['category']
+        limit = row['limit_paisa']
+        spent = row['spent_paisa']
+        remaining = row['remaining_paisa']
+        utilization = row['utilization']
+        status = row['status']
+        color = STATUS_COLORS[status]
+
         total_budget += limit
         total_spent += spent
 
-        # Determine Color/Status
-        if utilization > 100:
-            color = "red"
-            status = "OVER"
-        elif utilization >= 70:
-            color = "yellow"
-            status = "WARNING"
-        else:
-            color = "green"
-            status = "OK"
-
         # Progress Bar visual
         # Simple text representation of progress bar since Rich Table cells expect strings or renderables
         # Using a simple ascii or block char logic for "Utilization" column if simple string
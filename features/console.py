@@ -0,0 +1,4 @@
+"""The rich console shared by every CLI view (one instance, created once)."""
+from rich.console import Console
+
+console = Console()
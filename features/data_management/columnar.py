@@ -0,0 +1,165 @@
+"""
+Typed columnar exports (Parquet, Arrow IPC / Feather) and the matching loader.
+
+The Arrow table is built straight from the TransactionStore columns: int64
+paisa, date32 dates and dictionary-encoded type/category reusing the
+store's interned codes, so neither export nor DataFrame construction goes
+through per-row Python.
+
+Needs pyarrow (installed with streamlit); everything else in the tracker
+works without it.
+
+    python -m features.data_management.columnar exports/transactions.parquet
+    python -m features.data_management.columnar exports/transactions.arrow
+"""
+import argparse
+import importlib.util
+import os
+import time
+
+import numpy as np
+
+from features.data_management.exporter import format_report
+from features.profiling.profiler import profiled
+
+FORMATS = ("parquet", "feather")
+
+def available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("Parquet/Arrow support needs pyarrow: uv add pyarrow") from None
+    return pyarrow
+
+def _date32_days(dates):
+    # YYYYMMDD codes -> int32 days since 1970-01-01, vectorized
+    codes = np.frombuffer(dates, dtype=np.dtype(dates.typecode)).astype(np.int64)
+    years = (codes // 10000 - 1970).astype("datetime64[Y]")
+    months = years.astype("datetime64[M]") + (codes // 100 % 100 - 1)
+    days = months.astype("datetime64[D]") + (codes % 100 - 1)
+    return days.view(np.int64).astype(np.int32)
+
+@profiled("export.arrow_table")
+def transactions_table(transactions=None):
+    """pyarrow.Table of a TransactionStore (default: all transactions)."""
+    pa = _pyarrow()
+    if transactions is None:
+        from features.transactions.transactions import load_transactions
+        transactions = load_transactions()
+
+    return pa.table({
+        "id": pa.array(transactions.ids, pa.string()),
+        "date": pa.array(_date32_days(transactions.dates)).view(pa.date32()),
+        "type": pa.DictionaryArray.from_arrays(
+            pa.array(np.frombuffer(transactions.type_codes, dtype=np.uint8).astype(np.int32)),
+            pa.array(transactions.types, pa.string())
+        ),
+        "category": pa.DictionaryArray.from_arrays(
+            pa.array(np.frombuffer(transactions.category_codes, dtype=np.uint16).astype(np.int32)),
+            pa.array(transactions.categories, pa.string())
+        ),
+        "amount_paisa": pa.array(np.frombuffer(transactions.amounts, dtype=np.int64), pa.int64()),
+        "description": pa.array(transactions.descriptions, pa.string()),
+    })
+
+def write_table(table, sink, format="parquet"):
+    """Writes an Arrow table to a path or file-like sink as Parquet or Feather (Arrow IPC)."""
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, sink, compression="zstd")
+    elif format == "feather":
+        import pyarrow.feather as feather
+        feather.write_feather(table, sink, compression="zstd")
+    else:
+        raise ValueError(f"Unknown columnar format: {format!r} (expected one of {', '.join(FORMATS)})")
+
+def to_bytes(format="parquet", transactions=None):
+    """All transactions as an in-memory Parquet/Feather file (for download buttons)."""
+    pa = _pyarrow()
+    sink = pa.BufferOutputStream()
+    write_table(transactions_table(transactions), sink, format)
+    return sink.getvalue().to_pybytes()
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    return "feather" if ext in (".feather", ".arrow", ".ipc") else "parquet"
+
+@profiled("export.columnar")
+def export_transactions(path, format=None, transactions=None):
+    """Writes transactions to `path`; returns a report dict like the streaming exporter's."""
+    format = format or detect_format(path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    start = time.perf_counter()
+    table = transactions_table(transactions)
+    write_table(table, path, format)
+    seconds = time.perf_counter() - start
+    size = os.path.getsize(path)
+    return {
+        "path": path,
+        "format": format,
+        "rows": table.num_rows,
+        "bytes": size,
+        "seconds": seconds,
+        "rows_per_second": table.num_rows / (seconds or 1e-9),
+        "mb_per_second": size / (seconds or 1e-9) / (1024 * 1024)
+    }
+
+@profiled("aggregate.arrow_frame")
+def frame_from_table(table):
+    """
+    DataFrame in the shape the Streamlit apps use (see storage/cache.py):
+    the ledger columns with 'date' as 'YYYY-MM-DD' text, plus 'date_dt' and
+    'amount_rs'. Type and category come out as pandas categoricals.
+    """
+    import pyarrow.compute as pc
+    pa = _pyarrow()
+
+    dates = table.column("date").combine_chunks()
+    date_dt = dates.cast(pa.timestamp("s"))
+    # Format each distinct date once, then gather
+    distinct = pc.dictionary_encode(dates)
+    labels = pc.strftime(distinct.dictionary.cast(pa.timestamp("s")), format="%Y-%m-%d")
+    table = table.set_column(table.schema.get_field_index("date"), "date", labels.take(distinct.indices))
+    table = table.append_column("date_dt", date_dt)
+    table = table.append_column("amount_rs", pc.divide(table.column("amount_paisa").cast(pa.float64()), 100.0))
+    return table.to_pandas()
+
+def transactions_frame(transactions=None):
+    return frame_from_table(transactions_table(transactions))
+
+def read_frame(path):
+    """Loads a Parquet or Feather export straight into the apps' DataFrame shape."""
+    _pyarrow()
+    if detect_format(path) == "feather":
+        import pyarrow.feather as feather
+        table = feather.read_table(path)
+    else:
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+    return frame_from_table(table)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m features.data_management.columnar",
+        description="Export all transactions as Parquet or Feather (Arrow IPC) with typed columns."
+    )
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="default: guessed from the extension (.parquet, .feather/.arrow)")
+    args = parser.parse_args(argv)
+
+    try:
+        report = export_transactions(args.path, args.format)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Export failed: {e}")
+        return 2
+    print(format_report(report))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
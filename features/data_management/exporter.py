@@ -0,0 +1,134 @@
+"""
+Streaming transaction exports (CSV, JSON, NDJSON, optionally gzipped).
+
+Rows go from iter_transactions() through a generator pipeline straight into
+a bounded write buffer, so nothing is held in memory beyond that buffer and
+exporting a multi-gigabyte ledger uses the same memory as a tiny one.
+
+    python -m features.data_management.exporter exports/transactions.csv
+    python -m features.data_management.exporter exports/transactions.ndjson.gz
+"""
+import argparse
+import csv
+import gzip
+import io
+import os
+import time
+from json.encoder import encode_basestring
+
+from features.transactions.transactions import iter_transactions
+from features.profiling.profiler import profiled, record_scan
+
+FORMATS = ("csv", "json", "ndjson")
+EXPORT_BUFFER_BYTES = 1024 * 1024
+CSV_HEADER = ["ID", "Date", "Type", "Category", "Amount (Rs)", "Description"]
+
+def detect_format(path):
+    name = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(name)[1].lower().lstrip(".")
+    if ext in ("ndjson", "jsonl"):
+        return "ndjson"
+    return ext if ext in FORMATS else "csv"
+
+def _open_output(path, compress):
+    if compress:
+        raw = io.BufferedWriter(gzip.GzipFile(path, "wb", compresslevel=6), EXPORT_BUFFER_BYTES)
+    else:
+        raw = open(path, "wb", buffering=EXPORT_BUFFER_BYTES)
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+def _json_line(t, quote=encode_basestring):
+    # Same output as json.dumps(record, ensure_ascii=False), without building the dict
+    return (
+        f'{{"id": {quote(t["id"])}, "date": {quote(t["date"])}, "type": {quote(t["type"])}, '
+        f'"category": {quote(t["category"])}, "amount_paisa": {t["amount_paisa"]}, '
+        f'"description": {quote(t["description"])}, "amount_rs": {t["amount_paisa"] / 100!r}}}'
+    )
+
+def _write_csv(f, rows, counter):
+    writer = csv.writer(f)
+    writer.writerow(CSV_HEADER)
+    writer.writerows(
+        [t['id'], t['date'], t['type'], t['category'], f"{t['amount_paisa']/100:.2f}", t['description']]
+        for t in counter(rows)
+    )
+
+def _write_ndjson(f, rows, counter):
+    f.writelines(_json_line(t) + "\n" for t in counter(rows))
+
+def _write_json(f, rows, counter):
+    # A JSON array written one element at a time
+    f.write("[")
+    separator = "\n"
+    for t in counter(rows):
+        f.write(separator + _json_line(t))
+        separator = ",\n"
+    f.write("\n]\n")
+
+WRITERS = {"csv": _write_csv, "json": _write_json, "ndjson": _write_ndjson}
+
+@profiled("export.stream")
+def export_transactions(path, format=None, compress=None, transactions=None):
+    """
+    Streams transactions (default: the whole ledger) into `path` as CSV, a
+    JSON array or NDJSON. `format` defaults to the file extension and
+    `compress` to whether the path ends in .gz.
+
+    Returns a report dict: path, format, rows, bytes written, elapsed seconds,
+    rows_per_second and mb_per_second.
+    """
+    format = format or detect_format(path)
+    if format not in WRITERS:
+        raise ValueError(f"Unknown export format: {format!r} (expected one of {', '.join(FORMATS)})")
+    if compress is None:
+        compress = path.endswith(".gz")
+    rows = iter_transactions() if transactions is None else transactions
+    report = {"path": path, "format": format, "compressed": compress, "rows": 0}
+
+    def counter(rows):
+        for t in rows:
+            report["rows"] += 1
+            yield t
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    start = time.perf_counter()
+    with _open_output(path, compress) as f:
+        WRITERS[format](f, rows, counter)
+    report["seconds"] = time.perf_counter() - start
+    report["bytes"] = os.path.getsize(path)
+    record_scan(rows=report["rows"])
+    seconds = report["seconds"] or 1e-9
+    report["rows_per_second"] = report["rows"] / seconds
+    report["mb_per_second"] = report["bytes"] / seconds / (1024 * 1024)
+    return report
+
+def format_report(report):
+    return (
+        f"Exported {report['rows']:,} transactions to {report['path']} "
+        f"({report['bytes'] / (1024 * 1024):,.1f} MB) in {report['seconds']:.2f}s "
+        f"({report['rows_per_second']:,.0f} rows/s, {report['mb_per_second']:,.1f} MB/s)."
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m features.data_management.exporter",
+        description="Stream all transactions to a CSV, JSON or NDJSON file (gzipped if it ends in .gz)."
+    )
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="default: guessed from the extension")
+    parser.add_argument("--gzip", action="store_true", help="compress even if the path doesn't end in .gz")
+    args = parser.parse_args(argv)
+
+    try:
+        report = export_transactions(args.path, args.format, args.gzip or None)
+    except (OSError, ValueError) as e:
+        print(f"Export failed: {e}")
+        return 2
+    print(format_report(report))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
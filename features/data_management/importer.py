@@ -0,0 +1,260 @@
+"""
+Bulk import of transactions from bank statement CSV or JSON files.
+
+Files are streamed row by row, checked with the same rules as the
+interactive form (validate_amount / validate_date plus type and category),
+and written through save_transactions() in buffered batches, so memory
+stays flat however large the file is. A bad row, including an NDJSON
+line that isn't valid JSON, is counted as a reject with its line number;
+a JSON array with a syntax error is refused before anything is written.
+
+    python -m features.data_management.importer statement.csv
+    python -m features.data_management.importer export.json --dry-run
+"""
+import argparse
+import csv
+import json
+import os
+import time
+import uuid
+
+from features.profiling.profiler import profiled, record_scan
+from features.transactions.transactions import (
+    save_transactions, validate_amount, validate_date, EXPENSE_CATEGORIES, INCOME_CATEGORIES,
+    MAX_AMOUNT_PAISA
+)
+
+# Only this many error messages are kept; the reject count is always exact
+MAX_REPORTED_ERRORS = 100
+JSON_READ_BYTES = 64 * 1024
+# A JSON array element that doesn't decode within this many bytes is malformed
+MAX_JSON_OBJECT_BYTES = 1024 * 1024
+
+# Accepted column / key names (lower-cased) for each field
+FIELD_ALIASES = {
+    "id": ("id",),
+    "date": ("date",),
+    "type": ("type",),
+    "category": ("category",),
+    "amount": ("amount", "amount (rs)", "amount_rs"),
+    "amount_paisa": ("amount_paisa",),
+    "description": ("description", "details", "narration"),
+}
+
+def _field(record, name):
+    for alias in FIELD_ALIASES[name]:
+        value = record.get(alias)
+        if value not in (None, ""):
+            return str(value).strip()
+    return None
+
+def to_transaction(record, valid_dates=None):
+    """
+    Turns one imported record (keys already lower-cased) into a transaction dict.
+    Raises ValueError with a readable message if the record is invalid.
+
+    `valid_dates` is an optional set of dates already checked, so statements
+    that repeat the same dates only pay for strptime once per date.
+    """
+    date = _field(record, "date")
+    if date is None:
+        raise ValueError("missing date")
+    if valid_dates is None or date not in valid_dates:
+        valid = validate_date(date)
+        if valid is not True:
+            raise ValueError(f"date {date!r}: {valid}")
+        if valid_dates is not None:
+            valid_dates.add(date)
+
+    type = _field(record, "type")
+    if type is not None:
+        type = type.capitalize()
+    if type not in ("Expense", "Income"):
+        raise ValueError(f"type must be Expense or Income, got {type!r}")
+
+    category = _field(record, "category")
+    categories = EXPENSE_CATEGORIES if type == "Expense" else INCOME_CATEGORIES
+    if category not in categories:
+        raise ValueError(f"category {category!r} is not a valid {type} category")
+
+    amount_paisa = _field(record, "amount_paisa")
+    if amount_paisa is not None:
+        if not amount_paisa.isdigit() or not 0 < int(amount_paisa) <= MAX_AMOUNT_PAISA:
+            raise ValueError(f"amount_paisa {amount_paisa!r}: must be a positive whole number")
+        amount_paisa = int(amount_paisa)
+    else:
+        amount = _field(record, "amount")
+        if amount is None:
+            raise ValueError("missing amount")
+        valid = validate_amount(amount)
+        if valid is not True:
+            raise ValueError(f"amount {amount!r}: {valid}")
+        amount_paisa = int(round(float(amount) * 100))
+
+    description = _field(record, "description") or ""
+    if "|" in description or "\n" in description:
+        raise ValueError("description may not contain '|' or line breaks")
+
+    return {
+        "id": _field(record, "id") or str(uuid.uuid4())[:8],
+        "date": date,
+        "type": type,
+        "category": category,
+        "amount_paisa": amount_paisa,
+        "description": description
+    }
+
+# --- Readers: yield (line_number, record) ---
+def iter_csv_records(path):
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames:
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        for record in reader:
+            yield reader.line_num, record
+
+def _first_char(path):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        while True:
+            chunk = f.read(JSON_READ_BYTES)
+            if not chunk or chunk.strip():
+                return chunk.strip()[:1]
+
+def is_json_array(path):
+    return _first_char(path) == "["
+
+def iter_json_records(path):
+    """
+    Streams objects from either a JSON array ([{...}, {...}]) or NDJSON
+    (one object per line). A record that can't be used is yielded as a
+    ValueError, so the importer counts it as a reject and goes on.
+    """
+    if is_json_array(path):
+        yield from _iter_json_array(path)
+        return
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line, text in enumerate(f, 1):
+            if not text.strip():
+                continue
+            try:
+                obj = json.loads(text)
+            except json.JSONDecodeError:
+                yield line, ValueError("malformed JSON")
+                continue
+            yield line, _json_record(obj)
+
+def _json_record(obj):
+    if isinstance(obj, dict):
+        return {str(k).strip().lower(): v for k, v in obj.items()}
+    return ValueError("expected a JSON object")
+
+def _iter_json_array(path):
+    # Decodes one object at a time from a small buffer. A syntax error can't
+    # be stepped over, so it raises ValueError; import_file checks the whole
+    # array this way before writing anything
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        buffer = ""
+        line = 1
+        pos = 0
+        eof = False
+        while True:
+            # Skip separators between objects
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,[]":
+                if buffer[pos] == "\n":
+                    line += 1
+                pos += 1
+            if pos >= len(buffer) and eof:
+                return
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof or len(buffer) - pos > MAX_JSON_OBJECT_BYTES:
+                    raise ValueError(f"line {line}: malformed JSON")
+                chunk = f.read(JSON_READ_BYTES)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield line, _json_record(obj)
+            line += buffer.count("\n", pos, end)
+            pos = end
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    return "json" if ext in (".json", ".ndjson", ".jsonl") else "csv"
+
+@profiled("storage.import_file")
+def import_file(path, format=None, dry_run=False):
+    """
+    Imports every valid row of a CSV or JSON file; a JSON array that doesn't
+    parse raises ValueError with nothing written. Returns a report dict with
+    rows read, imported and rejected counts, the first MAX_REPORTED_ERRORS
+    (line, message) errors, elapsed seconds and rows per second.
+    """
+    format = format or detect_format(path)
+    if format == "json" and not dry_run and is_json_array(path):
+        # A broken array stops the import; find out before any batch is committed
+        for _ in _iter_json_array(path):
+            pass
+    records = iter_json_records(path) if format == "json" else iter_csv_records(path)
+    report = {"path": path, "rows": 0, "imported": 0, "rejected": 0, "errors": []}
+    valid_dates = set()
+
+    def valid_rows():
+        for line, record in records:
+            report["rows"] += 1
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                t = to_transaction(record, valid_dates)
+            except ValueError as e:
+                report["rejected"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append((line, str(e)))
+                continue
+            yield t
+
+    start = time.perf_counter()
+    if dry_run:
+        report["imported"] = sum(1 for _ in valid_rows())
+    else:
+        report["imported"] = save_transactions(valid_rows())
+    report["seconds"] = time.perf_counter() - start
+    record_scan(rows=report["rows"], bytes=os.path.getsize(path))
+    report["rows_per_second"] = report["rows"] / report["seconds"] if report["seconds"] > 0 else 0.0
+    return report
+
+def format_report(report, dry_run=False):
+    verb = "Would import" if dry_run else "Imported"
+    lines = [
+        f"{verb} {report['imported']:,} of {report['rows']:,} rows from {report['path']} "
+        f"in {report['seconds']:.2f}s ({report['rows_per_second']:,.0f} rows/s).",
+        f"Rejected: {report['rejected']:,}"
+    ]
+    for line, message in report["errors"]:
+        lines.append(f"  line {line}: {message}")
+    if report["rejected"] > len(report["errors"]):
+        lines.append(f"  ... and {report['rejected'] - len(report['errors']):,} more")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m features.data_management.importer",
+        description="Bulk import transactions from a bank statement CSV or JSON/NDJSON file."
+    )
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "json"], help="default: guessed from the extension")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    args = parser.parse_args(argv)
+
+    try:
+        report = import_file(args.path, args.format, args.dry_run)
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}")
+        return 2
+    print(format_report(report, args.dry_run))
+    return 1 if report["rejected"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
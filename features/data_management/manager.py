@@ -1,68 +1,59 @@
 import os
 import csv
-import json
-import questionary
 from datetime import datetime
-from rich.console import Console
 from rich.panel import Panel
 
-from features.transactions.transactions import load_transactions
 from features.budgets.budgets import load_budgets
+from features.console import console
 
-console = Console()
 EXPORT_DIR = "exports"
 
 def ensure_export_dir():
     if not os.path.exists(EXPORT_DIR):
         os.makedirs(EXPORT_DIR)
 
-def export_transactions_csv():
+def _export_transactions(extension, format=None, compress=False):
+    from features.data_management.exporter import export_transactions
+
     ensure_export_dir()
-    transactions = load_transactions()
-    
-    filename = f"transactions_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.csv"
+    filename = f"transactions_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.{extension}"
     filepath = os.path.join(EXPORT_DIR, filename)
-    
+
     try:
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(["ID", "Date", "Type", "Category", "Amount (Rs)", "Description"])
-            
-            for t in transactions:
-                writer.writerow([
-                    t['id'],
-                    t['date'],
-                    t['type'],
-                    t['category'],
-                    f"{t['amount_paisa']/100:.2f}",
-                    t['description']
-                ])
-        
+        with console.status("Exporting..."):
+            report = export_transactions(filepath, format, compress)
         console.print(f"[green]Successfully exported transactions to:[/green] {filepath}")
+        console.print(
+            f"[dim]{report['rows']:,} rows, {report['bytes'] / (1024 * 1024):,.1f} MB in {report['seconds']:.2f}s "
+            f"({report['rows_per_second']:,.0f} rows/s)[/dim]"
+        )
     except Exception as e:
-        console.print(f"[red]Error exporting CSV:[/red] {e}")
+        console.print(f"[red]Error exporting {extension.upper()}:[/red] {e}")
+
+def export_transactions_csv():
+    _export_transactions("csv")
 
 def export_transactions_json():
+    _export_transactions("json")
+
+def export_transactions_ndjson(compress=False):
+    _export_transactions("ndjson.gz" if compress else "ndjson", "ndjson", compress)
+
+def export_transactions_columnar(format="parquet"):
+    from features.data_management.columnar import export_transactions
+
     ensure_export_dir()
-    transactions = load_transactions()
-    
-    filename = f"transactions_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json"
+    extension = "parquet" if format == "parquet" else "arrow"
+    filename = f"transactions_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.{extension}"
     filepath = os.path.join(EXPORT_DIR, filename)
-    
-    # Convert paisa to Rs for export or keep raw? Let's keep raw structure but maybe add formatted
-    export_data = []
-    for t in transactions:
-        t_copy = t.copy()
-        t_copy['amount_rs'] = t['amount_paisa'] / 100
-        export_data.append(t_copy)
 
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=4)
-            
+        with console.status("Exporting..."):
+            report = export_transactions(filepath, format)
         console.print(f"[green]Successfully exported transactions to:[/green] {filepath}")
+        console.print(f"[dim]{report['rows']:,} rows, {report['bytes'] / (1024 * 1024):,.1f} MB in {report['seconds']:.2f}s[/dim]")
     except Exception as e:
-        console.print(f"[red]Error exporting JSON:[/red] {e}")
+        console.print(f"[red]Error exporting {format.capitalize()}:[/red] {e}")
 
 def export_budgets_csv():
     ensure_export_dir()
@@ -87,14 +78,60 @@ def export_budgets_csv():
     except Exception as e:
         console.print(f"[red]Error exporting Budgets:[/red] {e}")
 
+def import_transactions():
+    import questionary
+    from features.data_management.importer import import_file, format_report
+
+    path = questionary.path("Path to statement file (.csv, .json, .ndjson):").ask()
+    if not path:
+        return
+    if not os.path.isfile(path):
+        console.print(f"[red]File not found:[/red] {path}")
+        return
+
+    try:
+        with console.status("Importing..."):
+            report = import_file(path)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Error importing file:[/red] {e}")
+        return
+
+    color = "green" if not report['rejected'] else "yellow"
+    console.print(Panel(format_report(report), title="Bulk Import", border_style=color, expand=False))
+
+def rebuild_rollups():
+    from features.transactions import rollups
+    with console.status("Rebuilding monthly rollups..."):
+        rollups.rebuild()
+    console.print("[green]Monthly rollup index rebuilt.[/green]")
+
+def verify_rollups():
+    from features.transactions import rollups
+    with console.status("Verifying monthly rollups against the ledger..."):
+        problems = rollups.verify()
+    if problems:
+        console.print(Panel("\n".join(problems), title="Rollup Mismatches", border_style="red", expand=False))
+        console.print("[yellow]Run 'Rebuild Rollup Index' to fix them.[/yellow]")
+    else:
+        console.print("[green]Monthly rollup index matches the ledger.[/green]")
+
 def menu():
+    import questionary
+
     while True:
         choice = questionary.select(
             "Data Management:",
             choices=[
                 "Export Transactions (CSV)",
                 "Export Transactions (JSON)",
+                "Export Transactions (NDJSON)",
+                "Export Transactions (NDJSON, gzip)",
+                "Export Transactions (Parquet)",
+                "Export Transactions (Arrow/Feather)",
                 "Export Budgets (CSV)",
+                "Import Transactions (CSV/JSON)",
+                "Rebuild Rollup Index",
+                "Verify Rollup Index",
                 "Back"
             ]
         ).ask()
@@ -103,7 +140,21 @@ def menu():
             export_transactions_csv()
         elif choice == "Export Transactions (JSON)":
             export_transactions_json()
+        elif choice == "Export Transactions (NDJSON)":
+            export_transactions_ndjson()
+        elif choice == "Export Transactions (NDJSON, gzip)":
+            export_transactions_ndjson(compress=True)
+        elif choice == "Export Transactions (Parquet)":
+            export_transactions_columnar("parquet")
+        elif choice == "Export Transactions (Arrow/Feather)":
+            export_transactions_columnar("feather")
         elif choice == "Export Budgets (CSV)":
             export_budgets_csv()
+        elif choice == "Import Transactions (CSV/JSON)":
+            import_transactions()
+        elif choice == "Rebuild Rollup Index":
+            rebuild_rollups()
+        elif choice == "Verify Rollup Index":
+            verify_rollups()
         elif choice == "Back" or not choice:
             break
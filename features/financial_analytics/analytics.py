@@ -1,36 +1,26 @@
 from datetime import datetime, timedelta
-from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
-from rich.layout import Layout
-from rich.bar import Bar
-from rich.columns import Columns
-from rich.text import Text
 
 # Import shared resources
 # Note: Adjust imports based on project structure
-from features.transactions.transactions import load_transactions, EXPENSE_CATEGORIES
+from features.transactions.transactions import EXPENSE_CATEGORIES
+from features.transactions.rollups import month_totals, month_category_totals
+from features.financial_analytics.series import spending_pace
 from features.budgets.budgets import load_budgets
+from features.profiling.profiler import profiled
+from features.console import console
 
-console = Console()
 
 def get_month_transactions(transactions, year, month):
-    prefix = f"{year}-{month:02d}"
-    return [t for t in transactions if t['date'].startswith(prefix)]
+    return transactions.month(year, month)
 
 def calculate_totals(transactions):
-    income = sum(t['amount_paisa'] for t in transactions if t['type'] == 'Income')
-    expenses = sum(t['amount_paisa'] for t in transactions if t['type'] == 'Expense')
-    return income, expenses
+    return transactions.totals()
 
 def get_category_breakdown(transactions):
-    breakdown = {}
-    total = 0
-    for t in transactions:
-        if t['type'] == 'Expense':
-            cat = t['category']
-            breakdown[cat] = breakdown.get(cat, 0) + t['amount_paisa']
-            total += t['amount_paisa']
+    breakdown = transactions.category_totals('Expense')
+    total = sum(breakdown.values())
     
     # Sort by amount desc
     sorted_breakdown = sorted(breakdown.items(), key=lambda item: item[1], reverse=True)
@@ -113,8 +103,59 @@ def calculate_health_score(income, expenses, budgets, month_expenses_breakdown):
 
     return score, breakdown
 
+def get_recommendations(income, expenses, budgets):
+    """(icon, color, title, message) for each issue with a month's figures."""
+    recs = []
+    savings_rate = ((income - expenses) / income * 100) if income > 0 else 0
+    if savings_rate < 20:
+        recs.append(("📉", "red", "Low Savings", "Try to save at least 20% of income."))
+    if expenses > income:
+        recs.append(("⚠️", "red", "Deficit", "You are spending more than you earn!"))
+    if not budgets:
+        recs.append(("💡", "yellow", "No Budgets", "Set category budgets to control spending."))
+    return recs
+
+@profiled("aggregate.analytics_report")
+def analytics_report(today=None):
+    """
+    The figures behind show_analytics() for the month of `today` (a date,
+    default today) as a JSON-serializable dict, amounts in paisa.
+    """
+    today = today or datetime.now().date()
+    last_month_date = today.replace(day=1) - timedelta(days=1)
+    month_year = today.strftime("%Y-%m")
+    budgets = [b for b in load_budgets() if b['month_year'] == month_year]
+
+    income, expenses = month_totals(today.year, today.month)
+    last_income, last_expenses = month_totals(last_month_date.year, last_month_date.month)
+    by_category = month_category_totals('Expense', today.year, today.month)
+    breakdown = sorted(by_category.items(), key=lambda item: item[1], reverse=True)
+    score, score_breakdown = calculate_health_score(income, expenses, budgets, breakdown)
+    return {
+        "month": month_year,
+        "income_paisa": income,
+        "expense_paisa": expenses,
+        "savings_paisa": income - expenses,
+        "savings_rate": round((income - expenses) / income * 100, 2) if income > 0 else 0,
+        "last_month": {
+            "month": last_month_date.strftime("%Y-%m"),
+            "income_paisa": last_income,
+            "expense_paisa": last_expenses,
+            "savings_paisa": last_income - last_expenses,
+        },
+        "expense_by_category": dict(breakdown),
+        "budget_paisa": sum(b['limit_paisa'] for b in budgets),
+        "pace": spending_pace(today) if expenses else None,
+        "health_score": score,
+        "health_breakdown": score_breakdown,
+        "recommendations": [
+            {"title": title, "message": message, "severity": "high" if color == "red" else "medium"}
+            for _, color, title, message in get_recommendations(income, expenses, budgets)
+        ],
+    }
+
+@profiled("view.analytics")
 def show_analytics():
-    all_transactions = load_transactions()
     all_budgets = load_budgets()
 
     now = datetime.now()
@@ -123,14 +164,14 @@ def show_analytics():
     last_month_str = last_month_date.strftime("%Y-%m")
 
     # Current Month Data
-    curr_txns = get_month_transactions(all_transactions, now.year, now.month)
-    curr_inc, curr_exp = calculate_totals(curr_txns)
-    curr_breakdown, curr_exp_total = get_category_breakdown(curr_txns)
+    curr_inc, curr_exp = month_totals(now.year, now.month)
+    curr_by_category = month_category_totals('Expense', now.year, now.month)
+    curr_breakdown = sorted(curr_by_category.items(), key=lambda item: item[1], reverse=True)
+    curr_exp_total = sum(curr_by_category.values())
     curr_budgets = [b for b in all_budgets if b['month_year'] == current_month_str]
 
     # Last Month Data
-    last_txns = get_month_transactions(all_transactions, last_month_date.year, last_month_date.month)
-    last_inc, last_exp = calculate_totals(last_txns)
+    last_inc, last_exp = month_totals(last_month_date.year, last_month_date.month)
 
     console.print(Panel.fit(f"[bold blue]Financial Analytics Report: {now.strftime('%B %Y')}[/bold blue]"))
 
@@ -179,10 +220,18 @@ def show_analytics():
     if curr_exp_total > 0:
         console.print(render_ascii_chart("Spending by Category", curr_breakdown, curr_exp_total))
         
-        # Burn Rate
-        days_passed = now.day
-        burn_rate = curr_exp / days_passed
-        console.print(f"[bold]Daily Burn Rate:[/bold] Rs {burn_rate/100:.2f} / day")
+        # Burn Rate and projection, from the daily spending series
+        pace = spending_pace(now.date())
+        console.print(
+            f"[bold]Daily Burn Rate:[/bold] Rs {pace['avg_7']/100:.2f} / day (7-day avg), "
+            f"Rs {pace['avg_30']/100:.2f} / day (30-day avg), Rs {pace['ewma']/100:.2f} / day (trend)"
+        )
+        projection = f"[bold]Projected Month-End Spend:[/bold] Rs {pace['projected']/100:.2f}"
+        budget_total = sum(b['limit_paisa'] for b in curr_budgets)
+        if budget_total:
+            color = "red" if pace['projected'] > budget_total else "green"
+            projection += f" [{color}](budget Rs {budget_total/100:.2f})[/{color}]"
+        console.print(projection)
     else:
         console.print("[yellow]No expenses recorded this month.[/yellow]")
 
@@ -199,14 +248,10 @@ def show_analytics():
     console.print(health_panel)
 
     # Recommendations
-    recs = []
-    savings_rate = ((curr_inc - curr_exp) / curr_inc * 100) if curr_inc > 0 else 0
-    if savings_rate < 20:
-        recs.append("📉 [bold red]Low Savings:[/bold red] Try to save at least 20% of income.")
-    if curr_exp > curr_inc:
-        recs.append("⚠️ [bold red]Deficit:[/bold red] You are spending more than you earn!")
-    if not curr_budgets:
-        recs.append("💡 [bold yellow]No Budgets:[/bold yellow] Set category budgets to control spending.")
+    recs = [
+        f"{icon} [bold {color}]{title}:[/bold {color}] {message}"
+        for icon, color, title, message in get_recommendations(curr_inc, curr_exp, curr_budgets)
+    ]
     
     if recs:
         console.print(Panel("\n".join(recs), title="Recommendations", style="bold white"))
@@ -0,0 +1,238 @@
+"""
+Batch analytics reports for many ledgers in parallel.
+
+For each ledger directory (one with a database/ in it) the report behind
+show_analytics, including the health score and recommendations, is
+written to OUT/<name>.json and/or OUT/<name>.html. SUMMARY_NAME.json and
+.html collect one row per ledger and the aggregate figures.
+
+Ledgers are spread over a ProcessPoolExecutor in chunks of --chunksize,
+so each worker process pays its start-up and imports once and a task is
+a few file reads; ledgers share nothing, so throughput grows with the
+number of workers until the disk is the limit. A worker switches into a
+ledger's directory and drops the previous ledger's in-memory state
+(cache.reset_all()) before each report. The rollup index each report
+reads is kept next to the ledger, so the next night only reads what was
+appended since.
+
+    python -m features.financial_analytics.batch ledgers/* --out reports
+    python -m features.financial_analytics.batch --from-file ledgers.txt --workers 8 --chunksize 32 --format json
+"""
+import argparse
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+FORMATS = ("json", "html")
+SUMMARY_NAME = "summary"
+DEFAULT_CHUNKSIZE = 16
+# Health score bands in the summary
+SCORE_BANDS = (("healthy", 80), ("fair", 50), ("at_risk", 0))
+
+def report_names(directories):
+    """A distinct, file-name-safe report name per ledger directory (its base name, numbered on clashes)."""
+    names, seen = [], {}
+    for directory in directories:
+        base = os.path.basename(os.path.normpath(os.path.abspath(directory))) or "ledger"
+        base = "".join(c if c.isalnum() or c in "-_." else "_" for c in base)
+        seen[base] = seen.get(base, 0) + 1
+        names.append(base if seen[base] == 1 else f"{base}-{seen[base]}")
+    return names
+
+def _money(paisa):
+    return f"Rs {paisa / 100:,.2f}"
+
+def render_html(name, report):
+    rows = "".join(
+        f"<tr><td>{html.escape(c)}</td><td>{_money(a)}</td></tr>" for c, a in report["expense_by_category"].items()
+    )
+    recs = "".join(
+        f"<li><b>{html.escape(r['title'])}:</b> {html.escape(r['message'])}</li>" for r in report["recommendations"]
+    ) or "<li>Great job! Your finances look healthy.</li>"
+    pace = report["pace"]
+    pace_html = (
+        f"<p>Burn rate {_money(pace['avg_7'])} / day (7-day), {_money(pace['avg_30'])} / day (30-day); "
+        f"projected month-end spend {_money(pace['projected'])}</p>" if pace else ""
+    )
+    last = report["last_month"]
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(name)} - {report['month']}</title></head>
+<body>
+<h1>Financial Analytics Report: {html.escape(name)}, {report['month']}</h1>
+<table border="1" cellpadding="4">
+<tr><th>Metric</th><th>{report['month']}</th><th>{last['month']}</th></tr>
+<tr><td>Total Income</td><td>{_money(report['income_paisa'])}</td><td>{_money(last['income_paisa'])}</td></tr>
+<tr><td>Total Expenses</td><td>{_money(report['expense_paisa'])}</td><td>{_money(last['expense_paisa'])}</td></tr>
+<tr><td>Savings</td><td>{_money(report['savings_paisa'])}</td><td>{_money(last['savings_paisa'])}</td></tr>
+</table>
+<h2>Spending by Category</h2>
+<table border="1" cellpadding="4">{rows}</table>
+{pace_html}
+<h2>Financial Health Score: {report['health_score']}/100</h2>
+<ul>{"".join(f"<li>{html.escape(item)}</li>" for item in report['health_breakdown'])}</ul>
+<h2>Recommendations</h2>
+<ul>{recs}</ul>
+</body></html>
+"""
+
+def report_ledger(task):
+    """
+    Worker: writes one ledger's reports. `task` is (name, directory, out_dir,
+    formats, today as ISO date). Returns its summary row; errors are caught
+    and reported in the row, so one bad ledger doesn't stop the batch.
+    """
+    name, directory, out_dir, formats, today = task
+    from features.financial_analytics.analytics import analytics_report
+    from features.storage import cache
+
+    start = time.perf_counter()
+    row = {"ledger": name, "directory": directory}
+    previous = os.getcwd()
+    try:
+        if not os.path.isdir(os.path.join(directory, "database")):
+            raise FileNotFoundError(f"no database/ directory in {directory}")
+        os.chdir(directory)
+        # Every module that keeps data in memory registers a reset() with the cache
+        cache.reset_all()
+        report = analytics_report(date.fromisoformat(today))
+        os.chdir(previous)
+        report["ledger"] = name
+        if "json" in formats:
+            with open(os.path.join(out_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+        if "html" in formats:
+            with open(os.path.join(out_dir, f"{name}.html"), "w", encoding="utf-8") as f:
+                f.write(render_html(name, report))
+        row.update(
+            ok=True,
+            health_score=report["health_score"],
+            income_paisa=report["income_paisa"],
+            expense_paisa=report["expense_paisa"],
+            savings_rate=report["savings_rate"],
+            recommendations=[r["title"] for r in report["recommendations"]],
+        )
+    except Exception as e:
+        row.update(ok=False, error=f"{type(e).__name__}: {e}")
+    finally:
+        os.chdir(previous)
+    row["seconds"] = round(time.perf_counter() - start, 4)
+    return row
+
+def summarize(rows, month, seconds, workers):
+    done = [r for r in rows if r["ok"]]
+    bands = {band: 0 for band, _ in SCORE_BANDS}
+    for r in done:
+        bands[next(band for band, floor in SCORE_BANDS if r["health_score"] >= floor)] += 1
+    recommendation_counts = {}
+    for r in done:
+        for title in r["recommendations"]:
+            recommendation_counts[title] = recommendation_counts.get(title, 0) + 1
+    return {
+        "month": month,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "ledgers": len(rows),
+        "succeeded": len(done),
+        "failed": [{"ledger": r["ledger"], "directory": r["directory"], "error": r["error"]} for r in rows if not r["ok"]],
+        "workers": workers,
+        "seconds": round(seconds, 3),
+        "ledgers_per_second": round(len(rows) / seconds, 1) if seconds else None,
+        "income_paisa": sum(r["income_paisa"] for r in done),
+        "expense_paisa": sum(r["expense_paisa"] for r in done),
+        "average_health_score": round(sum(r["health_score"] for r in done) / len(done), 1) if done else None,
+        "health_bands": bands,
+        "recommendations": recommendation_counts,
+        "rows": rows,
+    }
+
+def render_summary_html(summary):
+    rows = "".join(
+        f"<tr><td>{html.escape(r['ledger'])}</td>"
+        + (f"<td>{r['health_score']}</td><td>{_money(r['income_paisa'])}</td><td>{_money(r['expense_paisa'])}</td>"
+           f"<td>{r['savings_rate']}%</td><td>{html.escape(', '.join(r['recommendations']))}</td>"
+           if r["ok"] else f"<td colspan=\"5\">Failed: {html.escape(r['error'])}</td>")
+        + "</tr>"
+        for r in sorted(summary["rows"], key=lambda r: (r["ok"], r.get("health_score", 0)))
+    )
+    bands = ", ".join(f"{band}: {count}" for band, count in summary["health_bands"].items())
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Batch Report Summary - {summary['month']}</title></head>
+<body>
+<h1>Batch Report Summary: {summary['month']}</h1>
+<p>{summary['succeeded']} of {summary['ledgers']} ledgers in {summary['seconds']} s with {summary['workers']} workers.
+Average health score {summary['average_health_score']} ({bands}).</p>
+<table border="1" cellpadding="4">
+<tr><th>Ledger</th><th>Health Score</th><th>Income</th><th>Expenses</th><th>Savings Rate</th><th>Recommendations</th></tr>
+{rows}
+</table>
+</body></html>
+"""
+
+def run_batch(directories, out_dir, workers=None, chunksize=DEFAULT_CHUNKSIZE, formats=FORMATS, today=None):
+    """
+    Writes every ledger's reports and the summary into `out_dir` and returns
+    the summary. workers=1 runs in this process; None uses every CPU.
+    """
+    today = today or date.today()
+    workers = workers or os.cpu_count() or 1
+    out_dir = os.path.abspath(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [
+        (name, os.path.abspath(directory), out_dir, tuple(formats), today.isoformat())
+        for name, directory in zip(report_names(directories), directories)
+    ]
+
+    start = time.perf_counter()
+    if workers == 1:
+        rows = [report_ledger(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(report_ledger, tasks, chunksize=chunksize))
+    summary = summarize(rows, today.strftime("%Y-%m"), time.perf_counter() - start, workers)
+
+    if "json" in formats:
+        with open(os.path.join(out_dir, f"{SUMMARY_NAME}.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    if "html" in formats:
+        with open(os.path.join(out_dir, f"{SUMMARY_NAME}.html"), "w", encoding="utf-8") as f:
+            f.write(render_summary_html(summary))
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m features.financial_analytics.batch",
+        description="Write analytics reports for many ledger directories in parallel."
+    )
+    parser.add_argument("ledgers", nargs="*", help="ledger directories (each containing database/)")
+    parser.add_argument("--from-file", metavar="PATH", help="read ledger directories from a file, one per line")
+    parser.add_argument("--out", default="reports", help="output directory (default: reports)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU; 1 runs in-process)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help=f"ledgers per task sent to a worker (default: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("--format", default=",".join(FORMATS), help="comma-separated: json, html (default: both)")
+    parser.add_argument("--date", type=date.fromisoformat, help="report as of YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+
+    directories = list(args.ledgers)
+    if args.from_file:
+        with open(args.from_file, "r", encoding="utf-8") as f:
+            directories += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not directories:
+        parser.error("no ledger directories given")
+    formats = [f.strip() for f in args.format.split(",") if f.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown or not formats:
+        parser.error(f"--format: expected some of {', '.join(FORMATS)}")
+
+    summary = run_batch(directories, args.out, args.workers, args.chunksize, formats, args.date)
+    print(
+        f"{summary['succeeded']}/{summary['ledgers']} ledgers reported in {summary['seconds']} s "
+        f"({summary['ledgers_per_second']} ledgers/s, {summary['workers']} workers) -> {os.path.abspath(args.out)}"
+    )
+    for failure in summary["failed"]:
+        print(f"  failed: {failure['directory']}: {failure['error']}")
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
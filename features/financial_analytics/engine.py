@@ -0,0 +1,216 @@
+"""
+Vectorized month-by-month history.
+
+Income, expense, savings and the expense breakdown by category are computed
+for every month in a range with one grouped NumPy pass (np.bincount over a
+month x type x category key), instead of a Python loop per month.
+
+By default the input is the monthly rollup index (one cell per month, type
+and category), so ten years of history costs a few thousand cells whatever
+the ledger size. Pass a TransactionStore to aggregate raw rows instead, e.g.
+a filtered subset.
+
+    python -m features.financial_analytics.engine
+    python -m features.financial_analytics.engine --from 2024-01 --to 2024-12
+"""
+import argparse
+
+import numpy as np
+from rich.table import Table
+
+from features.transactions.rollups import all_months
+from features.budgets.budgets import load_budgets
+from features.financial_analytics.analytics import calculate_health_score
+from features.profiling.profiler import profiled, record_scan
+from features.console import console
+
+
+def _ordinal(month_year):
+    """'2025-12' -> months since year 0."""
+    return int(month_year[:4]) * 12 + int(month_year[5:7]) - 1
+
+def _month_label(ordinal):
+    return f"{ordinal // 12:04d}-{ordinal % 12 + 1:02d}"
+
+def _group(months, type_codes, category_codes, amounts, types, categories, start_month, end_month):
+    """
+    Core grouped pass. `months` holds month ordinals, the other arrays the
+    matching type/category codes and paisa amounts, one entry per row (or cell).
+    """
+    if start_month:
+        first = _ordinal(start_month)
+    elif len(months):
+        first = int(months.min())
+    else:
+        first = None
+    if end_month:
+        last = _ordinal(end_month)
+    elif len(months):
+        last = int(months.max())
+    else:
+        last = None
+
+    history = {"months": [], "income": None, "expense": None, "savings": None,
+               "savings_rate": None, "categories": [], "by_category": None}
+    if first is None or last is None or last < first:
+        empty = np.zeros(0, dtype=np.int64)
+        history.update(income=empty, expense=empty, savings=empty,
+                       savings_rate=np.zeros(0), by_category=np.zeros((0, 0), dtype=np.int64))
+        return history
+
+    n_months = last - first + 1
+    n_types = max(len(types), 1)
+    n_categories = max(len(categories), 1)
+
+    keep = (months >= first) & (months <= last)
+    key = ((months[keep] - first) * n_types + type_codes[keep]) * n_categories + category_codes[keep]
+    # bincount sums in float64, which is exact for totals under 2**53 paisa
+    sums = np.bincount(key, weights=amounts[keep], minlength=n_months * n_types * n_categories)
+    cube = np.rint(sums).astype(np.int64).reshape(n_months, n_types, n_categories)
+
+    def by_type(name):
+        if name in types:
+            return cube[:, types.index(name), :]
+        return np.zeros((n_months, n_categories), dtype=np.int64)
+
+    income = by_type("Income").sum(axis=1)
+    expense_cells = by_type("Expense")
+    expense = expense_cells.sum(axis=1)
+    savings = income - expense
+    savings_rate = np.where(income > 0, savings / np.maximum(income, 1) * 100, 0.0)
+
+    # Only categories that ever had an expense in the range, by name
+    used = expense_cells.any(axis=0)
+    columns = [c for c in sorted(range(len(categories)), key=categories.__getitem__) if used[c]]
+    history.update(
+        months=[_month_label(o) for o in range(first, last + 1)],
+        income=income,
+        expense=expense,
+        savings=savings,
+        savings_rate=savings_rate,
+        categories=[categories[c] for c in columns],
+        by_category=expense_cells[:, columns]
+    )
+    return history
+
+@profiled("aggregate.history_from_store")
+def history_from_store(transactions, start_month=None, end_month=None):
+    """Month-by-month history aggregated from the raw rows of a TransactionStore."""
+    record_scan(rows=len(transactions))
+    dates = np.frombuffer(transactions.dates, dtype=np.dtype(transactions.dates.typecode)).astype(np.int64)
+    yyyymm = dates // 100
+    months = (yyyymm // 100) * 12 + yyyymm % 100 - 1
+    return _group(
+        months,
+        np.frombuffer(transactions.type_codes, dtype=np.uint8).astype(np.int64),
+        np.frombuffer(transactions.category_codes, dtype=np.uint16).astype(np.int64),
+        np.frombuffer(transactions.amounts, dtype=np.int64),
+        transactions.types,
+        transactions.categories,
+        start_month,
+        end_month
+    )
+
+@profiled("aggregate.monthly_history")
+def monthly_history(start_month=None, end_month=None):
+    """
+    Month-by-month history for ['YYYY-MM', 'YYYY-MM'] (both optional, default:
+    the whole ledger), read from the monthly rollup index. Returns a dict of
+    'months' (labels) and aligned NumPy arrays 'income', 'expense', 'savings'
+    (paisa), 'savings_rate' (%) and 'by_category' (months x 'categories').
+    Months without transactions are included as zeros.
+    """
+    types, categories = [], []
+    type_index, category_index = {}, {}
+    months, type_codes, category_codes, amounts = [], [], [], []
+    for month_year, rollup in all_months().items():
+        ordinal = _ordinal(month_year)
+        for (type, category), amount in rollup.items():
+            if type not in type_index:
+                type_index[type] = len(types)
+                types.append(type)
+            if category not in category_index:
+                category_index[category] = len(categories)
+                categories.append(category)
+            months.append(ordinal)
+            type_codes.append(type_index[type])
+            category_codes.append(category_index[category])
+            amounts.append(amount)
+    return _group(
+        np.array(months, dtype=np.int64),
+        np.array(type_codes, dtype=np.int64),
+        np.array(category_codes, dtype=np.int64),
+        np.array(amounts, dtype=np.int64),
+        types,
+        categories,
+        start_month,
+        end_month
+    )
+
+def health_scores(history, budgets=None):
+    """calculate_health_score() for every month of a history; returns [(score, breakdown)]."""
+    if budgets is None:
+        budgets = load_budgets()
+    budgets_by_month = {}
+    for b in budgets:
+        budgets_by_month.setdefault(b['month_year'], []).append(b)
+
+    scores = []
+    for i, month_year in enumerate(history["months"]):
+        row = history["by_category"][i]
+        breakdown = sorted(
+            ((c, int(a)) for c, a in zip(history["categories"], row) if a),
+            key=lambda item: item[1], reverse=True
+        )
+        scores.append(calculate_health_score(
+            int(history["income"][i]), int(history["expense"][i]),
+            budgets_by_month.get(month_year, []), breakdown
+        ))
+    return scores
+
+@profiled("view.monthly_history")
+def show_history(start_month=None, end_month=None):
+    history = monthly_history(start_month, end_month)
+    if not history["months"]:
+        console.print("[yellow]No transactions found.[/yellow]")
+        return
+    scores = health_scores(history)
+
+    table = Table(title="Monthly History")
+    table.add_column("Month")
+    table.add_column("Income", justify="right", style="green")
+    table.add_column("Expenses", justify="right", style="red")
+    table.add_column("Savings", justify="right")
+    table.add_column("Savings Rate", justify="right")
+    table.add_column("Top Category")
+    table.add_column("Health", justify="right")
+
+    for i, month_year in enumerate(history["months"]):
+        row = history["by_category"][i]
+        top = history["categories"][int(row.argmax())] if row.size and row.max() > 0 else "-"
+        savings = int(history["savings"][i])
+        color = "green" if savings >= 0 else "red"
+        table.add_row(
+            month_year,
+            f"Rs {history['income'][i]/100:,.2f}",
+            f"Rs {history['expense'][i]/100:,.2f}",
+            f"[{color}]Rs {savings/100:,.2f}[/{color}]",
+            f"{history['savings_rate'][i]:.1f}%",
+            top,
+            f"{scores[i][0]}/100"
+        )
+    console.print(table)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m features.financial_analytics.engine",
+        description="Month-by-month income, expenses, savings and health score."
+    )
+    parser.add_argument("--from", dest="start_month", metavar="YYYY-MM")
+    parser.add_argument("--to", dest="end_month", metavar="YYYY-MM")
+    args = parser.parse_args(argv)
+    show_history(args.start_month, args.end_month)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
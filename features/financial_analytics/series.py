@@ -0,0 +1,142 @@
+"""
+Daily spending time series.
+
+Expenses per day and category are kept by the rollup index as transactions
+are saved (see features/transactions/rollups.py), so a series costs one
+entry per day in its window rather than a pass over the ledger. Rolling
+7- and 30-day figures come from prefix sums, one subtraction per window,
+and the exponentially weighted moving average (EWMA) of daily spend drives
+the month-end projection.
+
+    python -m features.financial_analytics.series
+    python -m features.financial_analytics.series --days 30 --category Food
+"""
+import argparse
+import calendar
+from datetime import date, timedelta
+
+from features.transactions.rollups import daily_expenses
+from features.profiling.profiler import profiled
+
+WINDOWS = (7, 30)
+# Days; the EWMA's weight halves roughly every span / 2.9 days
+EWMA_SPAN = 7
+# Days of history before a window so its first rolling values are complete
+WARMUP_DAYS = 30
+
+def _code(day):
+    return day.year * 10000 + day.month * 100 + day.day
+
+def daily_series(start, end, category=None):
+    """
+    Expenses (paisa) for every calendar day in [start, end] (datetime.date),
+    zero for days without any, as (days, values). `category` restricts it to
+    one expense category.
+    """
+    by_day = daily_expenses(_code(start), _code(end))
+    days, values = [], []
+    day = start
+    while day <= end:
+        categories = by_day.get(_code(day), {})
+        values.append(categories.get(category, 0) if category else sum(categories.values()))
+        days.append(day)
+        day += timedelta(days=1)
+    return days, values
+
+def prefix_sums(values):
+    sums = [0]
+    for value in values:
+        sums.append(sums[-1] + value)
+    return sums
+
+def window_sum(sums, i, window):
+    """Sum of the `window` values ending at index i (fewer near the start), from prefix_sums()."""
+    return sums[i + 1] - sums[max(i + 1 - window, 0)]
+
+def rolling_means(values, window, sums=None):
+    sums = sums or prefix_sums(values)
+    return [window_sum(sums, i, window) / min(window, i + 1) for i in range(len(values))]
+
+def ewma(values, span=EWMA_SPAN):
+    alpha = 2 / (span + 1)
+    smoothed = []
+    level = None
+    for value in values:
+        level = value if level is None else alpha * value + (1 - alpha) * level
+        smoothed.append(level)
+    return smoothed
+
+@profiled("aggregate.spending_trend")
+def spending_trend(days=90, category=None, today=None):
+    """
+    The last `days` days up to `today`: {'days', 'spent', 'avg_7', 'avg_30',
+    'ewma'}, one list entry per day, amounts in paisa.
+    """
+    today = today or date.today()
+    start = today - timedelta(days=days - 1)
+    all_days, values = daily_series(start - timedelta(days=WARMUP_DAYS), today, category)
+    sums = prefix_sums(values)
+    trend = {"days": all_days, "spent": values, "ewma": ewma(values)}
+    for window in WINDOWS:
+        trend[f"avg_{window}"] = rolling_means(values, window, sums)
+    return {key: series[WARMUP_DAYS:] for key, series in trend.items()}
+
+@profiled("aggregate.spending_pace")
+def spending_pace(today=None, category=None):
+    """
+    How this month's spending is going, amounts in paisa: spent_month,
+    last_7 and last_30 (totals), avg_7, avg_30 and ewma (daily rates),
+    days_left in the month and projected, the month-end total if the
+    remaining days go at the EWMA rate.
+    """
+    today = today or date.today()
+    month_start = today.replace(day=1)
+    start = min(month_start, today - timedelta(days=WARMUP_DAYS + max(WINDOWS)))
+    _, values = daily_series(start, today, category)
+    sums = prefix_sums(values)
+    i = len(values) - 1
+
+    spent_month = sums[-1] - sums[(month_start - start).days]
+    # Today isn't over yet, so the rate is taken from the days before it
+    rate = ewma(values[:-1])[-1] if i else 0
+    days_left = calendar.monthrange(today.year, today.month)[1] - today.day
+    pace = {
+        "spent_month": spent_month,
+        "ewma": rate,
+        "days_left": days_left,
+        "projected": spent_month + round(rate * days_left),
+    }
+    for window in WINDOWS:
+        pace[f"last_{window}"] = window_sum(sums, i, window)
+        pace[f"avg_{window}"] = pace[f"last_{window}"] / window
+    return pace
+
+def main(argv=None):
+    from rich.table import Table
+    from features.console import console
+
+    parser = argparse.ArgumentParser(
+        prog="python -m features.financial_analytics.series",
+        description="Daily spending with rolling averages, EWMA and a month-end projection."
+    )
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--category")
+    args = parser.parse_args(argv)
+
+    trend = spending_trend(args.days, args.category)
+    table = Table(title=f"Daily Spending{f' - {args.category}' if args.category else ''}")
+    for column in ("Date", "Spent", "7-day avg", "30-day avg", "EWMA"):
+        table.add_column(column, justify="left" if column == "Date" else "right")
+    for i, day in enumerate(trend["days"]):
+        table.add_row(day.isoformat(), *(f"Rs {trend[key][i] / 100:,.2f}" for key in ("spent", "avg_7", "avg_30", "ewma")))
+    console.print(table)
+
+    pace = spending_pace(category=args.category)
+    console.print(
+        f"This month: Rs {pace['spent_month'] / 100:,.2f} spent, "
+        f"projected Rs {pace['projected'] / 100:,.2f} by month-end ({pace['days_left']} days left)"
+    )
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
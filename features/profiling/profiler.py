@@ -0,0 +1,212 @@
+"""
+Opt-in instrumentation, switched on with PFT_PROFILE=1.
+
+Storage reads and writes, aggregations and the views are wrapped in named
+timing spans that record calls, wall time, rows scanned and bytes read.
+When the process exits (or from the app's sidebar) a per-session summary
+is printed and written to PFT_PROFILE_DIR (default: profiles/):
+
+- session-<time>.json    per-span totals
+- session-<time>.folded  collapsed stacks of self time, for flamegraph.pl
+                         or speedscope
+- session-<time>.prof    cProfile stats of the main thread (only with
+                         PFT_PROFILE=cprofile), for pstats / snakeviz
+
+With PFT_PROFILE unset, @profiled returns the function unchanged and
+span() / record_scan() return immediately, so the overhead is a flag check.
+"""
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+MODE = os.environ.get("PFT_PROFILE", "").strip().lower()
+ENABLED = MODE not in ("", "0", "false", "no", "off")
+OUTPUT_DIR = os.environ.get("PFT_PROFILE_DIR", "profiles")
+
+# name -> [calls, seconds, max_seconds, rows, bytes]
+_stats = {}
+# "outer;inner" -> self time in microseconds
+_folded = {}
+_lock = threading.Lock()
+_local = threading.local()
+_cprofile = None
+
+class _Span:
+    __slots__ = ("name", "start", "children", "rows", "bytes", "path")
+
+    def __init__(self, name):
+        self.name = name
+        self.children = 0.0
+        self.rows = 0
+        self.bytes = 0
+
+    def __enter__(self):
+        stack = _stack()
+        self.path = f"{stack[-1].path};{self.name}" if stack else self.name
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = _stack()
+        # Drop spans left open below this one (e.g. by an exception in a generator)
+        while stack and stack.pop() is not self:
+            pass
+        if stack:
+            stack[-1].children += elapsed
+        _record(self, elapsed)
+        return False
+
+    def add(self, rows=0, bytes=0):
+        self.rows += rows
+        self.bytes += bytes
+
+    def stop(self):
+        self.__exit__(None, None, None)
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, rows=0, bytes=0):
+        pass
+
+    def stop(self):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def _record(span, elapsed):
+    with _lock:
+        entry = _stats.get(span.name)
+        if entry is None:
+            entry = _stats[span.name] = [0, 0.0, 0.0, 0, 0]
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+        entry[3] += span.rows
+        entry[4] += span.bytes
+        self_us = max(0, int((elapsed - span.children) * 1_000_000))
+        _folded[span.path] = _folded.get(span.path, 0) + self_us
+
+def span(name):
+    """Context manager timing a block: `with span("parse") as s: ...; s.add(rows=n)`."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+def start(name):
+    """
+    Begins a top-level span for this thread and returns it; call .stop() at
+    the end. Spans left open by an aborted run (e.g. Streamlit's st.rerun)
+    are discarded first.
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    _stack().clear()
+    return _Span(name).__enter__()
+
+def record_scan(rows=0, bytes=0):
+    """Adds rows scanned / bytes read to the innermost open span."""
+    if not ENABLED:
+        return
+    stack = getattr(_local, "stack", None)
+    if stack:
+        stack[-1].add(rows, bytes)
+
+def profiled(name=None):
+    """Decorator wrapping a function in a span (named after the function by default)."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def summary():
+    """Per-span totals, slowest first: [{'name', 'calls', 'seconds', 'max_seconds', 'rows', 'bytes'}]."""
+    with _lock:
+        spans = [
+            {"name": name, "calls": calls, "seconds": seconds, "max_seconds": max_seconds, "rows": rows, "bytes": nbytes}
+            for name, (calls, seconds, max_seconds, rows, nbytes) in _stats.items()
+        ]
+    return sorted(spans, key=lambda r: r["seconds"], reverse=True)
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _folded.clear()
+
+def _stderr_console():
+    from rich.console import Console
+    return Console(stderr=True)
+
+def print_summary():
+    from rich.table import Table
+
+    table = Table(title="Profile (PFT_PROFILE)")
+    table.add_column("Span", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total ms", justify="right")
+    table.add_column("Max ms", justify="right")
+    table.add_column("Rows", justify="right")
+    table.add_column("MB read", justify="right")
+    for r in summary():
+        table.add_row(
+            r["name"], str(r["calls"]), f"{r['seconds'] * 1000:,.1f}", f"{r['max_seconds'] * 1000:,.1f}",
+            f"{r['rows']:,}" if r["rows"] else "", f"{r['bytes'] / (1024 * 1024):,.2f}" if r["bytes"] else ""
+        )
+    _stderr_console().print(table)
+
+def dump(directory=OUTPUT_DIR):
+    """Writes the session summary, folded stacks and (if enabled) cProfile stats; returns the base path."""
+    import json
+
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"session-{datetime.now().strftime('%Y-%m-%d_%H%M%S')}-{os.getpid()}")
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump({"argv": sys.argv, "spans": summary()}, f, indent=2)
+    with _lock:
+        folded = sorted(_folded.items())
+    with open(base + ".folded", "w", encoding="utf-8") as f:
+        f.writelines(f"{path} {us}\n" for path, us in folded if us)
+    if _cprofile is not None:
+        # dump_stats() stops the profiler; carry on collecting afterwards
+        _cprofile.dump_stats(base + ".prof")
+        _cprofile.enable()
+    return base
+
+def _finish():
+    if not _stats:
+        return
+    print_summary()
+    base = dump()
+    _stderr_console().print(f"[dim]Profile written to {base}.*[/dim]")
+
+if ENABLED:
+    if MODE == "cprofile":
+        import cProfile
+        _cprofile = cProfile.Profile()
+        _cprofile.enable()
+    atexit.register(_finish)
@@ -0,0 +1,269 @@
+"""
+Budget alerts raised as transactions and budgets are saved.
+
+save_transaction(s) report the expenses they wrote and the budget writers
+report the budgets they changed; for each (month, category) touched, the
+month-to-date spend comes from the rollup index (kept up to date by the
+same write), so an evaluation costs a dict lookup per category rather than
+a pass over the ledger. Reading the pending alerts re-checks the current
+month's budgets too, so spending that never went through a save (an
+existing ledger, a hand-edited file) still raises its alerts. Each crossing of THRESHOLDS (70%, 85% and 100% of a
+budget) and each expense over LARGE_SPEND_PAISA becomes one alert in
+ALERTS_PATH, an upsert log keyed on the alert id; the daily check and the
+Streamlit assistant just read the pending ones.
+
+The highest threshold already raised per (month, category) is kept in
+ALERT_STATE_PATH, so a crossing is reported once: a spend that jumps past
+several thresholds raises only the highest, and a threshold is re-armed
+when spending falls back below it (a deleted expense, a raised limit).
+Alerts are raised for the current month on; writes to earlier months only
+update the levels.
+
+    python -m features.smart_assistant.alerts
+    python -m features.smart_assistant.alerts dismiss
+"""
+import argparse
+import os
+import pickle
+import threading
+import uuid
+from datetime import datetime
+
+from features.storage.keyed import KeyedLog
+from features.storage import cache
+from features.storage.locks import atomic_write, locked
+from features.profiling.profiler import profiled
+
+ALERTS_PATH = os.path.join("database", "alerts.txt")
+ALERT_STATE_PATH = os.path.join("database", ".alert_state")
+ALERT_STATE_VERSION = 1
+# Percent of a budget used
+THRESHOLDS = (70, 85, 100)
+LARGE_SPEND_PAISA = 500000
+
+BUDGET = "budget"
+LARGE_SPEND = "large_spend"
+PENDING = "pending"
+DISMISSED = "dismissed"
+
+_lock = threading.Lock()
+
+def parse_alert_line(line):
+    parts = line.split("|")
+    if len(parts) != 10:
+        return None
+    return {
+        "id": parts[0],
+        "created": parts[1],
+        "kind": parts[2],
+        "month_year": parts[3],
+        "category": parts[4],
+        "threshold": int(parts[5]),
+        "amount_paisa": int(parts[6]),
+        "limit_paisa": int(parts[7]),
+        "transaction_id": parts[8],
+        "status": parts[9]
+    }
+
+def format_alert_line(a):
+    return (
+        f"{a['id']}|{a['created']}|{a['kind']}|{a['month_year']}|{a['category']}|{a['threshold']}|"
+        f"{a['amount_paisa']}|{a['limit_paisa']}|{a['transaction_id']}|{a['status']}"
+    )
+
+# alerts.txt as an upsert log keyed on the alert id (dismissing appends the new status)
+_log = KeyedLog(ALERTS_PATH, lambda a: a['id'], parse_alert_line, format_alert_line)
+cache.on_reset(_log.forget)
+
+def alert_message(a):
+    if a['kind'] == LARGE_SPEND:
+        return f"💸 Large transaction: Rs {a['amount_paisa']/100:.0f} ({a['category']})"
+    icon = "🚨" if a['threshold'] >= 100 else "⚠️ "
+    return (
+        f"{icon} {a['category']} budget {a['threshold']}% used ({a['month_year']}): "
+        f"Rs {a['amount_paisa']/100:.0f} of Rs {a['limit_paisa']/100:.0f}"
+    )
+
+def _read_state():
+    try:
+        with open(ALERT_STATE_PATH, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") == ALERT_STATE_VERSION:
+            return state
+    except Exception:
+        pass
+    return None
+
+def _write_state(state):
+    try:
+        atomic_write(ALERT_STATE_PATH, lambda f: pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL), binary=True)
+    except OSError:
+        pass
+
+def _level(spent, limit):
+    if limit <= 0:
+        return 0
+    return max((t for t in THRESHOLDS if spent * 100 >= t * limit), default=0)
+
+def _new_alert(kind, month_year, category, threshold, amount, limit, transaction_id=""):
+    return {
+        "id": str(uuid.uuid4())[:8],
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "kind": kind,
+        "month_year": month_year,
+        "category": category,
+        "threshold": threshold,
+        "amount_paisa": amount,
+        "limit_paisa": limit,
+        "transaction_id": transaction_id,
+        "status": PENDING
+    }
+
+def _check(state, budget, raised, current_month):
+    from features.transactions.rollups import month_rollup
+    key = (budget['month_year'], budget['category'])
+    spent = month_rollup(budget['month_year']).get(("Expense", budget['category']), 0)
+    level = _level(spent, budget['limit_paisa'])
+    fired = state["levels"].get(key, 0)
+    if level > fired and budget['month_year'] >= current_month:
+        raised.append(_new_alert(BUDGET, key[0], key[1], level, spent, budget['limit_paisa']))
+    if level:
+        state["levels"][key] = level
+    else:
+        state["levels"].pop(key, None)
+
+def _new_state(budgets, current_month):
+    # First run (or a lost state file): raise what the current month warrants
+    # beyond what the log already holds, and take earlier months' levels as they stand
+    state = {"version": ALERT_STATE_VERSION, "levels": {}}
+    for a in _log.records():
+        if a['kind'] == BUDGET:
+            key = (a['month_year'], a['category'])
+            state["levels"][key] = max(state["levels"].get(key, 0), a['threshold'])
+    raised = []
+    for b in budgets:
+        _check(state, b, raised, current_month)
+    return state, raised
+
+def _evaluate(budgets_to_check, large=()):
+    """
+    Checks the budgets `budgets_to_check(state)` returns and the large
+    expenses under the engine lock, and logs the alerts they raise.
+    """
+    from features.budgets.budgets import load_budgets
+    current_month = datetime.now().strftime("%Y-%m")
+    with _lock, locked(ALERT_STATE_PATH):
+        # Another process may have moved the levels on since this one last looked
+        state = _read_state()
+        if state is None:
+            before = None
+            state, raised = _new_state(load_budgets(), current_month)
+        else:
+            before = dict(state["levels"])
+            raised = []
+            for b in budgets_to_check(state):
+                _check(state, b, raised, current_month)
+        for t in large:
+            raised.append(_new_alert(LARGE_SPEND, t['date'][:7], t['category'], 0, t['amount_paisa'], 0, t['id']))
+        for alert in raised:
+            _log.upsert(alert)
+        if state["levels"] != before:
+            _write_state(state)
+    return raised
+
+def watch(transactions, touched):
+    """
+    Passes `transactions` through, noting in `touched` ({'months': set,
+    'large': list}) the (month, category) of each expense and the large ones.
+    """
+    months, large = touched.setdefault("months", set()), touched.setdefault("large", [])
+    current_month = datetime.now().strftime("%Y-%m")
+    for t in transactions:
+        if t['type'] == "Expense":
+            months.add((t['date'][:7], t['category']))
+            if t['amount_paisa'] > LARGE_SPEND_PAISA and t['date'][:7] >= current_month:
+                large.append({k: t[k] for k in ("id", "date", "category", "amount_paisa")})
+        yield t
+
+def touched_by(transactions):
+    touched = {}
+    for _ in watch(transactions, touched):
+        pass
+    return touched
+
+@profiled("aggregate.alerts_on_spending")
+def on_spending(touched):
+    """Called after expenses were saved, with what watch() noted. Returns the alerts raised."""
+    if not touched.get("months"):
+        return []
+    from features.budgets.budgets import get_budget
+
+    def budgets_to_check(state):
+        budgets = (get_budget(category, month_year) for month_year, category in touched["months"])
+        return [b for b in budgets if b is not None]
+    return _evaluate(budgets_to_check, touched["large"])
+
+@profiled("aggregate.alerts_on_budgets")
+def on_budgets(keys=None):
+    """
+    Called after budgets were saved: re-checks the (category, month_year)
+    budgets in `keys`, or every budget when None. Returns the alerts raised.
+    """
+    from features.budgets.budgets import get_budget, load_budgets
+
+    def budgets_to_check(state):
+        if keys is not None:
+            return [b for b in (get_budget(*key) for key in keys) if b is not None]
+        budgets = load_budgets()
+        # Levels of budgets that are gone go too
+        live = {(b['month_year'], b['category']) for b in budgets}
+        for key in [k for k in state["levels"] if k not in live]:
+            del state["levels"][key]
+        return budgets
+    return _evaluate(budgets_to_check)
+
+def _catch_up():
+    # A ledger written before alerts existed, or by hand, never went through
+    # the save hooks: re-check the current month's budgets (a lost state file
+    # is rebuilt by _evaluate) so what they warrant is raised before reading
+    from features.budgets.budgets import load_budgets
+    current_month = datetime.now().strftime("%Y-%m")
+    _evaluate(lambda state: [b for b in load_budgets() if b['month_year'] == current_month])
+
+def pending_alerts():
+    """Alerts not yet dismissed, newest first. Current month's budgets are re-checked first."""
+    _catch_up()
+    alerts = [a for a in _log.records() if a['status'] == PENDING]
+    # Later in the log first among alerts raised in the same second
+    return sorted(reversed(alerts), key=lambda a: a['created'], reverse=True)
+
+def dismiss_alerts(ids=None):
+    """Marks these alerts (default: every pending one) as dismissed. Returns how many were."""
+    count = 0
+    for a in pending_alerts():
+        if ids is None or a['id'] in ids:
+            a['status'] = DISMISSED
+            _log.upsert(a)
+            count += 1
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m features.smart_assistant.alerts",
+        description="List or dismiss pending budget alerts."
+    )
+    parser.add_argument("command", nargs="?", choices=["list", "dismiss"], default="list")
+    args = parser.parse_args(argv)
+
+    if args.command == "dismiss":
+        print(f"Dismissed {dismiss_alerts()} alerts.")
+        return 0
+    alerts = pending_alerts()
+    for a in alerts:
+        print(f"{a['created']}  {alert_message(a)}")
+    if not alerts:
+        print("No pending alerts.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
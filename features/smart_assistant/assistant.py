@@ -1,40 +1,79 @@
 import os
-import questionary
 from datetime import datetime, timedelta
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
-from rich.progress import Progress, BarColumn, TextColumn
 
-from features.transactions.transactions import load_transactions, EXPENSE_CATEGORIES, validate_amount
+from features.transactions.transactions import load_transactions_between, EXPENSE_CATEGORIES, validate_amount
+from features.transactions.rollups import month_totals, month_category_totals
+from features.smart_assistant.alerts import pending_alerts, dismiss_alerts, alert_message
 from features.budgets.budgets import load_budgets
+from features.storage.backend import use_sqlite
+from features.storage import cache
+from features.storage.keyed import KeyedLog
+from features.profiling.profiler import profiled
+from features.console import console
 
-console = Console()
 GOALS_PATH = os.path.join("database", "goals.txt")
 
+@profiled("storage.load_goals")
 def load_goals():
-    goals = []
-    if not os.path.exists(GOALS_PATH):
-        return goals
-    with open(GOALS_PATH, "r") as f:
-        for line in f:
-            if line.strip():
-                parts = line.strip().split("|")
-                if len(parts) == 4:
-                    goals.append({
-                        "name": parts[0],
-                        "target_paisa": int(parts[1]),
-                        "saved_paisa": int(parts[2]),
-                        "deadline": parts[3]
-                    })
-    return goals
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.load_goals()
+    return load_text_goals()
 
+def parse_goal_line(line):
+    parts = line.split("|")
+    if len(parts) != 4:
+        return None
+    return {
+        "name": parts[0],
+        "target_paisa": int(parts[1]),
+        "saved_paisa": int(parts[2]),
+        "deadline": parts[3]
+    }
+
+def format_goal_line(g):
+    return f"{g['name']}|{g['target_paisa']}|{g['saved_paisa']}|{g['deadline']}"
+
+# goals.txt as an upsert log keyed on the goal name
+_log = KeyedLog(GOALS_PATH, lambda g: g['name'], parse_goal_line, format_goal_line)
+cache.on_reset(_log.forget)
+
+def load_text_goals():
+    return _log.records()
+
+@profiled("storage.save_goals")
 def save_goals(goals):
-    with open(GOALS_PATH, "w") as f:
-        for g in goals:
-            f.write(f"{g['name']}|{g['target_paisa']}|{g['saved_paisa']}|{g['deadline']}\n")
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        sqlite_backend.save_goals(goals)
+        cache.invalidate(cache.GOALS)
+        return
+    _log.replace_all(goals)
+    cache.invalidate(cache.GOALS)
+
+def get_goal(name):
+    """The goal with this name, or None."""
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.get_goal(name)
+    return _log.get(name)
+
+@profiled("storage.save_goal")
+def save_goal(goal):
+    """Adds a goal or replaces the one with the same name. Returns True if one was replaced."""
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        replaced = sqlite_backend.save_goal(goal)
+    else:
+        replaced = _log.upsert(goal)
+    cache.invalidate(cache.GOALS)
+    return replaced
 
 def manage_goals():
+    import questionary
+
     while True:
         action = questionary.select(
             "Manage Goals:",
@@ -53,14 +92,12 @@ def manage_goals():
             
             deadline = questionary.text("Deadline (YYYY-MM-DD):", default=(datetime.now() + timedelta(days=365)).strftime("%Y-%m-%d")).ask()
             
-            goals = load_goals()
-            goals.append({
+            save_goal({
                 "name": name,
                 "target_paisa": int(float(target_str) * 100),
                 "saved_paisa": 0,
                 "deadline": deadline
             })
-            save_goals(goals)
             console.print("[green]Goal added![/green]")
 
         elif action == "Update Progress":
@@ -76,7 +113,7 @@ def manage_goals():
             
             if not goal_name: continue
             
-            goal = next(g for g in goals if g['name'] == goal_name)
+            goal = get_goal(goal_name)
             current_saved = goal['saved_paisa'] / 100
             
             amount_str = questionary.text(
@@ -86,7 +123,7 @@ def manage_goals():
             
             if amount_str:
                 goal['saved_paisa'] = int(float(amount_str) * 100)
-                save_goals(goals)
+                save_goal(goal)
                 console.print("[green]Progress updated![/green]")
 
         elif action == "View Goals":
@@ -117,17 +154,17 @@ def manage_goals():
                 console.print(table)
 
 
+@profiled("view.daily_check")
 def daily_check():
     today = datetime.now()
     today_str = today.strftime("%Y-%m-%d")
     current_month_str = today.strftime("%Y-%m")
     
-    transactions = load_transactions()
+    today_txns = load_transactions_between(today_str, today_str)
     budgets = load_budgets()
     
     # 1. Daily Spending
-    today_txns = [t for t in transactions if t['date'] == today_str and t['type'] == 'Expense']
-    today_spent = sum(t['amount_paisa'] for t in today_txns)
+    _, today_spent = today_txns.totals()
     
     # 2. Daily Budget Calculation
     month_budgets = [b for b in budgets if b['month_year'] == current_month_str]
@@ -150,24 +187,8 @@ def daily_check():
             status_icon = "⚠️"
             remaining_display = f"-Rs {(today_spent - daily_budget)/100:.2f} (Over)"
 
-    # 3. Alerts
-    alerts = []
-    
-    # Budget Alerts
-    category_spent = {}
-    for t in transactions:
-        if t['type'] == 'Expense' and t['date'].startswith(current_month_str):
-            category_spent[t['category']] = category_spent.get(t['category'], 0) + t['amount_paisa']
-            
-            # Large Transaction Check (> Rs 5000)
-            if t['date'] == today_str and t['amount_paisa'] > 500000:
-                alerts.append(f"💸 Large transaction today: Rs {t['amount_paisa']/100:.0f} ({t['category']})")
-
-    for b in month_budgets:
-        spent = category_spent.get(b['category'], 0)
-        pct = (spent / b['limit_paisa']) * 100
-        if pct >= 85:
-            alerts.append(f"⚠️  {b['category']} budget critical: {pct:.1f}% used")
+    # 3. Alerts, raised as transactions and budgets were saved
+    alerts = [alert_message(a) for a in pending_alerts()]
     
     # 4. Tip
     if not alerts and today_spent == 0:
@@ -188,18 +209,18 @@ def daily_check():
         subtitle="Smart Assistant"
     ))
 
+@profiled("view.smart_recommendations")
 def smart_recommendations():
-    transactions = load_transactions()
+    now = datetime.now()
     budgets = load_budgets()
     goals = load_goals()
     
-    current_month_str = datetime.now().strftime("%Y-%m")
+    current_month_str = now.strftime("%Y-%m")
     
     recs = []
     
     # Analyze Income vs Expense
-    income = sum(t['amount_paisa'] for t in transactions if t['type'] == 'Income' and t['date'].startswith(current_month_str))
-    expenses = sum(t['amount_paisa'] for t in transactions if t['type'] == 'Expense' and t['date'].startswith(current_month_str))
+    income, expenses = month_totals(now.year, now.month)
     
     if income > 0:
         savings_rate = (income - expenses) / income * 100
@@ -209,10 +230,7 @@ def smart_recommendations():
             recs.append("🚀 **Invest More**: High savings rate! Consider moving excess cash to investments.")
     
     # Analyze Categories
-    category_spent = {}
-    for t in transactions:
-        if t['type'] == 'Expense' and t['date'].startswith(current_month_str):
-            category_spent[t['category']] = category_spent.get(t['category'], 0) + t['amount_paisa']
+    category_spent = month_category_totals('Expense', now.year, now.month)
             
     sorted_cats = sorted(category_spent.items(), key=lambda x: x[1], reverse=True)
     if sorted_cats:
@@ -240,6 +258,8 @@ def smart_recommendations():
     ))
 
 def assistant_menu():
+    import questionary
+
     while True:
         choice = questionary.select(
             "Smart Assistant:",
@@ -253,6 +273,8 @@ def assistant_menu():
         
         if choice == "Daily Financial Check":
             daily_check()
+            if pending_alerts() and questionary.confirm("Mark these alerts as read?", default=False).ask():
+                dismiss_alerts()
         elif choice == "Smart Recommendations":
             smart_recommendations()
         elif choice == "Manage Goals":
@@ -0,0 +1,17 @@
+import os
+
+TEXT = "text"
+SQLITE = "sqlite"
+
+def storage_backend():
+    """
+    Storage engine selected by the PFT_STORAGE env var: 'text' (the
+    pipe-delimited files in database/, the default) or 'sqlite'.
+    """
+    backend = os.environ.get("PFT_STORAGE", TEXT).strip().lower()
+    if backend not in (TEXT, SQLITE):
+        raise ValueError(f"Unknown PFT_STORAGE backend: {backend!r} (expected 'text' or 'sqlite')")
+    return backend
+
+def use_sqlite():
+    return storage_backend() == SQLITE
@@ -0,0 +1,134 @@
+"""
+Data-version-aware cache shared by the Streamlit apps.
+
+Streamlit re-runs the whole page script on every widget interaction. The
+getters here return the last loaded transactions, budgets, goals and the
+derived transactions DataFrame for as long as the data is unchanged, so a
+rerun costs a few stat() calls instead of a re-read and re-parse.
+
+Each entry is keyed on (generation, data version):
+- the generation is a per-dataset counter bumped by invalidate(), which
+  every write path (save_transaction(s), save_all_budgets, save_goals) calls;
+- the data version is the inode/size/mtime of the backing files (or
+  SQLite's data_version), which catches writes from other processes such
+  as the CLI.
+
+Modules that keep their own in-memory copy of the data (parsed stores,
+indexes, keyed logs, connections) register a reset() with on_reset();
+reset_all() drops all of it, for a process that moves on to another
+ledger directory.
+"""
+import os
+import threading
+
+TRANSACTIONS = "transactions"
+BUDGETS = "budgets"
+GOALS = "goals"
+
+_generations = {TRANSACTIONS: 0, BUDGETS: 0, GOALS: 0}
+_entries = {}
+_lock = threading.Lock()
+_resets = []
+
+def on_reset(reset):
+    """Registers a module's reset() with reset_all(). Use as a decorator."""
+    _resets.append(reset)
+    return reset
+
+def reset_all():
+    """Drops every in-memory copy of the data, here and in each registered module; the next reads come from disk."""
+    for reset in list(_resets):
+        reset()
+    with _lock:
+        for dataset in _generations:
+            _generations[dataset] += 1
+        _entries.clear()
+
+def invalidate(dataset):
+    """Drops everything cached for a dataset. Call after writing it."""
+    with _lock:
+        _generations[dataset] += 1
+        for key in [k for k in _entries if k[0] == dataset]:
+            del _entries[key]
+
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+def data_version(dataset):
+    from features.storage.backend import use_sqlite
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        conn = sqlite_backend.connect()
+        # data_version moves when another connection commits; total_changes
+        # covers writes made through this one
+        return ("sqlite", conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+
+    if dataset == TRANSACTIONS:
+        from features.transactions.partitions import is_partitioned, list_partitions, partition_path, PARTITION_DIR
+        from features.transactions.transactions import DB_PATH
+        if is_partitioned():
+            return (_file_version(PARTITION_DIR),) + tuple(
+                (m, _file_version(partition_path(m))) for m in list_partitions()
+            )
+        return _file_version(DB_PATH)
+    if dataset == BUDGETS:
+        from features.budgets.budgets import DB_PATH
+        return _file_version(DB_PATH)
+    from features.smart_assistant.assistant import GOALS_PATH
+    return _file_version(GOALS_PATH)
+
+def cached(dataset, name, loader):
+    """Returns loader()'s result, reusing the cached value while the dataset is unchanged."""
+    key = (dataset, name)
+    with _lock:
+        generation = _generations[dataset]
+    version = (generation, data_version(dataset))
+    entry = _entries.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    value = loader()
+    with _lock:
+        # Don't store a value that a concurrent invalidate() has already made stale
+        if _generations[dataset] == generation:
+            _entries[key] = (version, value)
+    return value
+
+def get_transactions():
+    """TransactionStore of all transactions (read-only)."""
+    from features.transactions.transactions import load_transactions
+    return cached(TRANSACTIONS, "store", load_transactions)
+
+def get_budgets():
+    """List of budget dicts; a fresh copy, so callers may modify it."""
+    from features.budgets.budgets import load_budgets
+    return [dict(b) for b in cached(BUDGETS, "list", load_budgets)]
+
+def get_goals():
+    """List of goal dicts; a fresh copy, so callers may modify it."""
+    from features.smart_assistant.assistant import load_goals
+    return [dict(g) for g in cached(GOALS, "list", load_goals)]
+
+def _build_transactions_frame():
+    from features.data_management import columnar
+    if columnar.available():
+        # Built from the typed columns in Arrow, no per-row Python
+        return columnar.transactions_frame(get_transactions())
+
+    import pandas as pd
+    df = pd.DataFrame(get_transactions().to_columns())
+    df['date_dt'] = pd.to_datetime(df['date'])
+    df['amount_rs'] = df['amount_paisa'] / 100
+    return df
+
+def get_transactions_frame():
+    """
+    DataFrame of all transactions with the raw columns plus parsed 'date_dt'
+    and 'amount_rs'. A shallow copy is returned, so adding columns to it
+    doesn't touch the cached frame; don't modify existing values in place.
+    """
+    return cached(TRANSACTIONS, "frame", _build_transactions_frame).copy(deep=False)
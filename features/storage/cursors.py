@@ -0,0 +1,69 @@
+"""
+Append cursors for the text files.
+
+The ledger files, budgets.txt and goals.txt only grow by appended lines,
+so whoever keeps something derived from one (the parse checkpoint, the
+rollup and recency indexes, the keyed logs) keeps a cursor: how far it has
+read, and enough about the file to tell an append from a rewrite. Reading
+then costs only the bytes appended since.
+"""
+# Bytes sampled from the start of the file and just before the parse offset.
+# If either sample changes the file was rewritten rather than appended to.
+FINGERPRINT_BYTES = 256
+
+def new_cursor(stat):
+    """
+    Position in an append-only ledger file: byte offset of the last complete
+    line consumed, the size/mtime/inode seen then, and samples of the head of
+    the file and the bytes just before the offset.
+    """
+    return {
+        "ino": stat.st_ino,
+        "offset": 0,
+        "size": 0,
+        "mtime_ns": 0,
+        "head": b"",
+        "tail": b""
+    }
+
+def is_append_of(cursor, stat, f):
+    """True if the open file `f` is the file `cursor` was taken from, only appended to since."""
+    if cursor is None:
+        return False
+    if stat.st_ino != cursor["ino"] or stat.st_size < cursor["offset"]:
+        return False
+    if stat.st_size == cursor["size"]:
+        # Appends always grow the file, so a same-size change is a rewrite
+        return stat.st_mtime_ns == cursor["mtime_ns"]
+
+    f.seek(0)
+    head = f.read(len(cursor["head"]))
+    f.seek(cursor["offset"] - len(cursor["tail"]))
+    tail = f.read(len(cursor["tail"]))
+    return head == cursor["head"] and tail == cursor["tail"]
+
+def read_appended(f, stat, cursor):
+    """
+    Reads what was appended to `f` since `cursor` (check is_append_of first)
+    and advances the cursor in place. Returns (complete_lines, pending): only
+    complete lines advance the cursor; an unterminated last line comes back
+    as `pending` on every call until its newline arrives.
+    """
+    if stat.st_size == cursor["size"] and stat.st_mtime_ns == cursor["mtime_ns"]:
+        return b"", b""
+
+    f.seek(cursor["offset"])
+    data = f.read(stat.st_size - cursor["offset"])
+    end = data.rfind(b"\n") + 1
+
+    offset = cursor["offset"] + end
+    if end:
+        if cursor["offset"] < FINGERPRINT_BYTES:
+            f.seek(0)
+            cursor["head"] = f.read(min(offset, FINGERPRINT_BYTES))
+        f.seek(max(0, offset - FINGERPRINT_BYTES))
+        cursor["tail"] = f.read(offset - max(0, offset - FINGERPRINT_BYTES))
+    cursor["offset"] = offset
+    cursor["size"] = offset
+    cursor["mtime_ns"] = stat.st_mtime_ns if end == len(data) else 0
+    return data[:end], data[end:]
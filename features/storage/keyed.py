@@ -0,0 +1,126 @@
+"""
+Keyed record files (budgets.txt, goals.txt) kept as append-only upsert logs.
+
+Each line is a whole pipe-delimited record. Setting a record appends one
+line; when loading, a later line for the same key replaces the earlier one
+(budgets are keyed on (category, month_year), goals on name). The parsed
+records are kept in memory with an append cursor, so after the first load
+an upsert or a reload only reads the bytes appended since, whoever wrote
+them.
+
+Once superseded lines outnumber live records COMPACT_RATIO to one, the file
+is rewritten with just the live records. Writes from other processes are
+serialized with the file's writer lock and rewrites are atomic (see
+locks.py), so readers need no lock.
+"""
+import os
+import threading
+
+from features.storage.cursors import is_append_of, new_cursor, read_appended
+from features.storage.locks import atomic_write, locked
+
+# Compact when the file has this many times more lines than live records...
+COMPACT_RATIO = 2
+# ...and at least this many lines
+COMPACT_MIN_LINES = 64
+
+class KeyedLog:
+    def __init__(self, path, key, parse, format):
+        """
+        `key(record)` gives a record's key, `parse(line)` a record dict (or
+        None for a malformed line) and `format(record)` its line, without
+        the newline.
+        """
+        self.path = path
+        self.key = key
+        self.parse = parse
+        self.format = format
+        self._lock = threading.Lock()
+        self._cursor = None
+        self._records = {}
+        self._lines = 0
+
+    def _apply(self, data, records):
+        lines = 0
+        for line in data.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            lines += 1
+            record = self.parse(line.strip())
+            if record is not None:
+                records[self.key(record)] = record
+        return lines
+
+    def _sync(self):
+        """Folds anything appended since the last call into the records. Returns the unterminated tail, if any."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            self._cursor, self._records, self._lines = None, {}, 0
+            return b""
+        with f:
+            stat = os.fstat(f.fileno())
+            if not is_append_of(self._cursor, stat, f):
+                self._cursor, self._records, self._lines = new_cursor(stat), {}, 0
+            complete, pending = read_appended(f, stat, self._cursor)
+        if complete:
+            self._lines += self._apply(complete, self._records)
+        return pending
+
+    def _current(self):
+        pending = self._sync()
+        if not pending.strip():
+            return self._records, pending
+        # A hand-edited file may lack its final newline
+        records = dict(self._records)
+        self._apply(pending, records)
+        return records, pending
+
+    def records(self):
+        """Live records in first-written order (as new dicts, safe to modify)."""
+        with self._lock:
+            return [dict(r) for r in self._current()[0].values()]
+
+    def get(self, key):
+        with self._lock:
+            record = self._current()[0].get(key)
+            return dict(record) if record is not None else None
+
+    def upsert(self, record):
+        """Appends one record, replacing any earlier one with the same key. Returns True if one was replaced."""
+        with self._lock, locked(self.path):
+            records, pending = self._current()
+            replaced = self.key(record) in records
+            line = self.format(record) + "\n"
+            with open(self.path, "ab") as f:
+                f.write((("\n" if pending else "") + line).encode("utf-8"))
+            self._sync()
+            if self._lines >= COMPACT_MIN_LINES and self._lines > COMPACT_RATIO * len(self._records):
+                self._rewrite(self._records.values())
+            return replaced
+
+    def replace_all(self, records):
+        """Rewrites the file with exactly these records (later duplicates win)."""
+        with self._lock, locked(self.path):
+            by_key = {}
+            for record in records:
+                by_key[self.key(record)] = record
+            self._rewrite(by_key.values())
+
+    def compact(self):
+        """Drops superseded lines. Returns (lines before, lines after)."""
+        with self._lock, locked(self.path):
+            self._sync()
+            before = self._lines
+            self._rewrite(self._records.values())
+            return before, self._lines
+
+    def forget(self):
+        """Drops the in-memory records; the next access re-reads the file."""
+        with self._lock:
+            self._cursor, self._records, self._lines = None, {}, 0
+
+    def _rewrite(self, records):
+        atomic_write(self.path, lambda f: f.writelines(self.format(r) + "\n" for r in records))
+        self._cursor = None
+        self._sync()
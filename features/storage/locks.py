@@ -0,0 +1,88 @@
+"""
+Cross-process safety for the text files.
+
+Writers (the Streamlit sessions, the CLI, the scripting CLI) take an
+exclusive advisory lock with fcntl.flock on a sidecar `.<name>.lock` next
+to the data file (`.transactions.txt.lock`). The lock is not taken on the data file itself because
+full rewrites swap that file for a new inode.
+
+Readers never lock. Full rewrites go through atomic_write(): a temp file in
+the same directory, fsynced, then os.replace(). A reader therefore opens
+either the old file or the new one, never a truncated or half-written one.
+Appends only ever add whole lines, and the readers already ignore an
+unterminated last line.
+
+Where fcntl doesn't exist (Windows), locked() only serializes the threads of
+one process.
+"""
+import contextlib
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+NEW_FILE_MODE = 0o644
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+def lock_path(path):
+    directory, name = os.path.split(path)
+    # The whole name, so budgets.txt and budgets.bak don't share a lock, and
+    # one leading dot, so .alert_state locks on .alert_state.lock
+    return os.path.join(directory, f".{name.lstrip('.')}.lock")
+
+def _thread_lock(path):
+    key = os.path.abspath(path)
+    with _thread_locks_guard:
+        lock = _thread_locks.get(key)
+        if lock is None:
+            lock = _thread_locks[key] = threading.Lock()
+        return lock
+
+@contextlib.contextmanager
+def locked(path):
+    """Holds the exclusive writer lock for `path` (not reentrant)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with _thread_lock(path):
+        with open(lock_path(path), "ab") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def atomic_write(path, write, binary=False):
+    """
+    Replaces `path` as a whole: `write(f)` fills a temp file next to it,
+    which is fsynced and then renamed over `path`. On any error the old file
+    is left untouched.
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f".{name}.", suffix=".tmp")
+    try:
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, "wb" if binary else "w", encoding=None if binary else "utf-8") as f:
+            fd = None
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if fd is not None:
+            os.close(fd)
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
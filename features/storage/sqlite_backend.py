@@ -0,0 +1,354 @@
+"""
+SQLite storage engine for transactions, budgets and goals.
+
+Selected with PFT_STORAGE=sqlite (see backend.py). The database runs in WAL
+mode so Streamlit readers don't block the CLI writer, and transactions are
+indexed on (date), (type, date) and (category, date) so month and day
+queries are answered from the index instead of a full read.
+
+Copy the existing text files into the database with:
+
+    python -m features.storage.sqlite_backend import-text
+"""
+import argparse
+import os
+import sqlite3
+import threading
+
+from features.transactions.store import TransactionStore, date_code, format_date_code
+from features.storage import cache
+from features.profiling.profiler import profiled, record_scan
+
+DB_PATH = os.environ.get("PFT_SQLITE_PATH", os.path.join("database", "finance.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount_paisa INTEGER NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_type_date ON transactions (type, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_category_date ON transactions (category, date);
+
+-- month x type x category totals, kept in step with transactions by triggers
+CREATE TABLE IF NOT EXISTS monthly_rollups (
+    month_year TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount_paisa INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    PRIMARY KEY (month_year, type, category)
+);
+CREATE TRIGGER IF NOT EXISTS trg_rollups_insert AFTER INSERT ON transactions BEGIN
+    INSERT INTO monthly_rollups VALUES (substr(NEW.date, 1, 7), NEW.type, NEW.category, NEW.amount_paisa, 1)
+    ON CONFLICT (month_year, type, category) DO UPDATE
+    SET amount_paisa = amount_paisa + excluded.amount_paisa, rows = rows + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollups_delete AFTER DELETE ON transactions BEGIN
+    UPDATE monthly_rollups SET amount_paisa = amount_paisa - OLD.amount_paisa, rows = rows - 1
+    WHERE month_year = substr(OLD.date, 1, 7) AND type = OLD.type AND category = OLD.category;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollups_update AFTER UPDATE OF date, type, category, amount_paisa ON transactions BEGIN
+    UPDATE monthly_rollups SET amount_paisa = amount_paisa - OLD.amount_paisa, rows = rows - 1
+    WHERE month_year = substr(OLD.date, 1, 7) AND type = OLD.type AND category = OLD.category;
+    INSERT INTO monthly_rollups VALUES (substr(NEW.date, 1, 7), NEW.type, NEW.category, NEW.amount_paisa, 1)
+    ON CONFLICT (month_year, type, category) DO UPDATE
+    SET amount_paisa = amount_paisa + excluded.amount_paisa, rows = rows + 1;
+END;
+
+CREATE TABLE IF NOT EXISTS budgets (
+    category TEXT NOT NULL,
+    month_year TEXT NOT NULL,
+    limit_paisa INTEGER NOT NULL,
+    PRIMARY KEY (category, month_year)
+);
+
+CREATE TABLE IF NOT EXISTS goals (
+    seq INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    target_paisa INTEGER NOT NULL,
+    saved_paisa INTEGER NOT NULL,
+    deadline TEXT NOT NULL
+);
+"""
+
+TRANSACTION_COLUMNS = "id, date, type, category, amount_paisa, description"
+# Bumped when a schema change needs existing data migrated (PRAGMA user_version)
+SCHEMA_VERSION = 1
+
+# sqlite3 connections can't be shared across threads, and Streamlit runs
+# each session in its own thread, so keep one connection per thread.
+_local = threading.local()
+
+def connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != DB_PATH:
+        os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Databases created before the rollup triggers need their totals backfilled
+            rebuild_rollups(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        _local.conn = conn
+        _local.path = DB_PATH
+    return conn
+
+@cache.on_reset
+def reset():
+    """Closes this thread's connection; the next connect() opens DB_PATH afresh (it may be relative)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+    _local.conn = None
+
+def _store_from(rows):
+    store = TransactionStore()
+    for row in rows:
+        store.append_fields(*row)
+    record_scan(rows=len(store))
+    return store
+
+# --- Transactions ---
+@profiled("sqlite.load_transactions")
+def load_transactions():
+    return _store_from(connect().execute(f"SELECT {TRANSACTION_COLUMNS} FROM transactions ORDER BY seq"))
+
+def iter_transactions():
+    """Yields transaction dicts in insertion order, streamed from the cursor."""
+    for id, date, type, category, amount_paisa, description in connect().execute(
+        f"SELECT {TRANSACTION_COLUMNS} FROM transactions ORDER BY seq"
+    ):
+        yield {"id": id, "date": date, "type": type, "category": category,
+               "amount_paisa": amount_paisa, "description": description}
+
+def recent_transactions(n):
+    """The `n` latest-dated transactions as dicts, newest first (later inserts first within a day), via the date index."""
+    return [
+        {"id": id, "date": date, "type": type, "category": category,
+         "amount_paisa": amount_paisa, "description": description}
+        for id, date, type, category, amount_paisa, description in connect().execute(
+            f"SELECT {TRANSACTION_COLUMNS} FROM transactions ORDER BY date DESC, seq DESC LIMIT ?", (n,)
+        )
+    ]
+
+@profiled("sqlite.load_transactions_between")
+def load_transactions_between(start_date, end_date):
+    """Transactions dated within [start_date, end_date] ('YYYY-MM-DD'), via the date index."""
+    return _store_from(connect().execute(
+        f"SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE date BETWEEN ? AND ? ORDER BY seq",
+        (start_date, end_date)
+    ))
+
+@profiled("sqlite.transactions_between")
+def transactions_between(start_date, end_date):
+    """Transactions dated within [start_date, end_date], oldest first, via the date index."""
+    return _store_from(connect().execute(
+        f"SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE date BETWEEN ? AND ? ORDER BY date, seq",
+        (start_date, end_date)
+    ))
+
+def totals_between(start_date, end_date):
+    """(income_paisa, expense_paisa) within [start_date, end_date], summed in SQL."""
+    sums = dict(connect().execute(
+        "SELECT type, SUM(amount_paisa) FROM transactions WHERE date BETWEEN ? AND ? GROUP BY type",
+        (start_date, end_date)
+    ).fetchall())
+    return sums.get("Income", 0), sums.get("Expense", 0)
+
+def category_totals_between(type, start_date, end_date):
+    """{category: paisa} for one type within [start_date, end_date], summed in SQL."""
+    return dict(connect().execute(
+        "SELECT category, SUM(amount_paisa) FROM transactions "
+        "WHERE type = ? AND date BETWEEN ? AND ? GROUP BY category",
+        (type, start_date, end_date)
+    ).fetchall())
+
+def rebuild_rollups(conn=None):
+    conn = conn or connect()
+    with conn:
+        conn.execute("DELETE FROM monthly_rollups")
+        conn.execute(
+            "INSERT INTO monthly_rollups "
+            "SELECT substr(date, 1, 7), type, category, SUM(amount_paisa), COUNT(*) FROM transactions GROUP BY 1, 2, 3"
+        )
+
+def month_rollup(month_year):
+    """{(type, category): paisa} for one month, read from the trigger-maintained rollup table."""
+    return {
+        (type, category): amount
+        for type, category, amount in connect().execute(
+            "SELECT type, category, amount_paisa FROM monthly_rollups WHERE month_year = ? AND rows > 0",
+            (month_year,)
+        )
+    }
+
+def daily_expenses(start, end):
+    """{date code: {category: paisa}} of expenses per day within [start, end] (date codes), grouped in SQL."""
+    days = {}
+    for date, category, amount in connect().execute(
+        "SELECT date, category, SUM(amount_paisa) FROM transactions "
+        "WHERE type = 'Expense' AND date BETWEEN ? AND ? GROUP BY date, category",
+        (format_date_code(start), format_date_code(end))
+    ):
+        days.setdefault(date_code(date), {})[category] = amount
+    return days
+
+def all_rollups():
+    """{month_year: {(type, category): paisa}} for every month."""
+    months = {}
+    for month_year, type, category, amount in connect().execute(
+        "SELECT month_year, type, category, amount_paisa FROM monthly_rollups WHERE rows > 0"
+    ):
+        months.setdefault(month_year, {})[(type, category)] = amount
+    return months
+
+def save_transaction(t):
+    save_transactions([t])
+
+@profiled("sqlite.save_transactions")
+def save_transactions(transactions):
+    """Inserts an iterable of transactions in a single SQL transaction; returns the count."""
+    conn = connect()
+    with conn:
+        return _insert_transactions(conn, transactions)
+
+def _insert_transactions(conn, transactions):
+    return conn.executemany(
+        f"INSERT INTO transactions ({TRANSACTION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+        ((t['id'], t['date'], t['type'], t['category'], t['amount_paisa'], t['description']) for t in transactions)
+    ).rowcount
+
+# --- Budgets ---
+def load_budgets():
+    return [
+        {"category": category, "limit_paisa": limit_paisa, "month_year": month_year}
+        for category, limit_paisa, month_year in connect().execute(
+            "SELECT category, limit_paisa, month_year FROM budgets ORDER BY rowid"
+        )
+    ]
+
+def save_all_budgets(budgets):
+    conn = connect()
+    with conn:
+        _replace_budgets(conn, budgets)
+
+def _replace_budgets(conn, budgets):
+    conn.execute("DELETE FROM budgets")
+    conn.executemany(
+        "INSERT OR REPLACE INTO budgets (category, limit_paisa, month_year) VALUES (?, ?, ?)",
+        ((b['category'], b['limit_paisa'], b['month_year']) for b in budgets)
+    )
+
+def get_budget(category, month_year):
+    row = connect().execute(
+        "SELECT limit_paisa FROM budgets WHERE category = ? AND month_year = ?", (category, month_year)
+    ).fetchone()
+    if row is None:
+        return None
+    return {"category": category, "limit_paisa": row[0], "month_year": month_year}
+
+def upsert_budget(budget):
+    """Inserts or replaces one budget; returns True if one was replaced."""
+    conn = connect()
+    with conn:
+        replaced = conn.execute(
+            "UPDATE budgets SET limit_paisa = ? WHERE category = ? AND month_year = ?",
+            (budget['limit_paisa'], budget['category'], budget['month_year'])
+        ).rowcount > 0
+        if not replaced:
+            conn.execute(
+                "INSERT INTO budgets (category, limit_paisa, month_year) VALUES (?, ?, ?)",
+                (budget['category'], budget['limit_paisa'], budget['month_year'])
+            )
+    return replaced
+
+# --- Goals ---
+def load_goals():
+    return [
+        {"name": name, "target_paisa": target, "saved_paisa": saved, "deadline": deadline}
+        for name, target, saved, deadline in connect().execute(
+            "SELECT name, target_paisa, saved_paisa, deadline FROM goals ORDER BY seq"
+        )
+    ]
+
+def save_goals(goals):
+    conn = connect()
+    with conn:
+        _replace_goals(conn, goals)
+
+def _replace_goals(conn, goals):
+    conn.execute("DELETE FROM goals")
+    conn.executemany(
+        "INSERT INTO goals (name, target_paisa, saved_paisa, deadline) VALUES (?, ?, ?, ?)",
+        ((g['name'], g['target_paisa'], g['saved_paisa'], g['deadline']) for g in goals)
+    )
+
+def get_goal(name):
+    row = connect().execute(
+        "SELECT target_paisa, saved_paisa, deadline FROM goals WHERE name = ? ORDER BY seq DESC LIMIT 1", (name,)
+    ).fetchone()
+    if row is None:
+        return None
+    return {"name": name, "target_paisa": row[0], "saved_paisa": row[1], "deadline": row[2]}
+
+def save_goal(goal):
+    """Inserts or replaces the goal with this name; returns True if one was replaced."""
+    conn = connect()
+    with conn:
+        replaced = conn.execute(
+            "UPDATE goals SET target_paisa = ?, saved_paisa = ?, deadline = ? WHERE name = ?",
+            (goal['target_paisa'], goal['saved_paisa'], goal['deadline'], goal['name'])
+        ).rowcount > 0
+        if not replaced:
+            conn.execute(
+                "INSERT INTO goals (name, target_paisa, saved_paisa, deadline) VALUES (?, ?, ?, ?)",
+                (goal['name'], goal['target_paisa'], goal['saved_paisa'], goal['deadline'])
+            )
+    return replaced
+
+# --- Migration from the text files ---
+def import_text():
+    """
+    Copies the text-file data into the database, replacing what's there, in
+    one SQL transaction: if any step fails the database is left as it was.
+    """
+    # Read through the text loaders explicitly, whatever PFT_STORAGE says
+    from features.transactions import transactions as text_transactions
+    from features.budgets import budgets as text_budgets
+    from features.smart_assistant import assistant as text_assistant
+
+    store = text_transactions.load_text_transactions()
+    budgets = text_budgets.load_text_budgets()
+    goals = text_assistant.load_text_goals()
+
+    conn = connect()
+    with conn:
+        conn.execute("DELETE FROM transactions")
+        _insert_transactions(conn, store)
+        _replace_budgets(conn, budgets)
+        _replace_goals(conn, goals)
+    return {"transactions": len(store), "budgets": len(budgets), "goals": len(goals)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m features.storage.sqlite_backend",
+        description="Manage the SQLite storage engine (enable it with PFT_STORAGE=sqlite)."
+    )
+    parser.add_argument("command", choices=["import-text"])
+    parser.parse_args(argv)
+
+    counts = import_text()
+    print(f"Imported {counts['transactions']} transactions, {counts['budgets']} budgets "
+          f"and {counts['goals']} goals into {DB_PATH}.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
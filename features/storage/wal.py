@@ -0,0 +1,182 @@
+"""
+Group commit for appends to the ledger files.
+
+The ledger is already an append-only log, so it is the write-ahead log
+itself: a record is committed once its line is on disk. Writers queue
+their lines and block; whichever writer finds no commit in progress
+becomes the leader, takes everything queued so far and writes it with one
+os.write() and one fsync() per file, then wakes the others. Concurrent
+Streamlit sessions and bulk entry share fsyncs instead of paying for one
+each, and save_transaction() only returns once its line is durable.
+
+Every commit gets a sequence number (increasing in commit order within the
+process). Before the first append to a file, its tail is checked: a last
+line without a newline is what a crash in the middle of a write leaves. If
+it still parses it is terminated and kept (e.g. a hand-edited file),
+otherwise it is cut off and saved next to the ledger as .<name>.torn, so
+the next append can't be glued onto it.
+
+    python -m features.storage.wal            # check/repair every ledger file
+"""
+import argparse
+import os
+import threading
+
+from features.storage.locks import locked
+
+TAIL_READ_BYTES = 64 * 1024
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+def _torn_path(path):
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{os.path.splitext(name)[0]}.torn")
+
+def repair_tail(path, is_valid=None):
+    """
+    Makes sure `path` ends with a complete line. Returns None if it already
+    did, 'terminated' if the unterminated last line passed `is_valid(line)`
+    and got its newline, or 'truncated' if it was moved to the .torn file.
+    """
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return None
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return None
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return None
+
+        # Walk back to the start of the last line
+        start = size
+        while start > 0:
+            step = min(TAIL_READ_BYTES, start)
+            f.seek(start - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                start = start - step + newline + 1
+                break
+            start -= step
+        f.seek(start)
+        tail = f.read(size - start)
+
+        if is_valid is not None and is_valid(tail.decode("utf-8", "replace")):
+            f.seek(size)
+            f.write(b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            return "terminated"
+
+        with open(_torn_path(path), "ab") as torn:
+            torn.write(tail + b"\n")
+            torn.flush()
+            os.fsync(torn.fileno())
+        f.truncate(start)
+        f.flush()
+        os.fsync(f.fileno())
+        return "truncated"
+
+class GroupCommitLog:
+    def __init__(self, is_valid=None):
+        """`is_valid(line)` decides whether an unterminated last line found at startup is kept."""
+        self.is_valid = is_valid
+        self._cond = threading.Condition()
+        self._queue = []
+        self._leader = False
+        self._next_seq = 1
+        self._committed_seq = 0
+        self._checked = set()
+        self.batches = 0
+
+    def commit(self, writes):
+        """
+        Appends `writes`, a list of (path, bytes) with whole lines, and blocks
+        until they are written and fsynced. Returns the commit's sequence number.
+        """
+        ticket = {"writes": writes, "done": False, "error": None}
+        with self._cond:
+            ticket["seq"] = self._next_seq
+            self._next_seq += 1
+            self._queue.append(ticket)
+            while not ticket["done"]:
+                if self._leader:
+                    self._cond.wait()
+                    continue
+                self._leader = True
+                batch, self._queue = self._queue, []
+                self._cond.release()
+                # Anything that stops the write short fails the whole batch
+                error = RuntimeError("commit interrupted")
+                try:
+                    self._write(batch)
+                    error = None
+                except Exception as e:
+                    error = e
+                finally:
+                    self._cond.acquire()
+                    self._leader = False
+                    for t in batch:
+                        t["done"] = True
+                        t["error"] = error
+                    if error is None:
+                        self._committed_seq = batch[-1]["seq"]
+                    self._cond.notify_all()
+        if ticket["error"] is not None:
+            raise ticket["error"]
+        return ticket["seq"]
+
+    def committed_seq(self):
+        """Sequence number of the last commit that reached the disk."""
+        with self._cond:
+            return self._committed_seq
+
+    def _write(self, batch):
+        by_path = {}
+        for ticket in batch:
+            for path, data in ticket["writes"]:
+                by_path.setdefault(path, []).append(data)
+        for path, chunks in by_path.items():
+            # Other processes append to (and repair) the same files
+            with locked(path):
+                key = os.path.abspath(path)
+                if key not in self._checked:
+                    repair_tail(path, self.is_valid)
+                    self._checked.add(key)
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    _write_all(fd, b"".join(chunks))
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        self.batches += 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m features.storage.wal",
+        description="Check ledger files for a torn last line (left by a crash mid-write) and repair it."
+    )
+    parser.add_argument("paths", nargs="*", help="default: every ledger file")
+    args = parser.parse_args(argv)
+
+    from features.transactions.transactions import is_complete_line, ledger_paths
+    for path in args.paths or ledger_paths():
+        with locked(path):
+            result = repair_tail(path, is_complete_line)
+        if result == "truncated":
+            print(f"{path}: torn last line moved to {_torn_path(path)}")
+        elif result == "terminated":
+            print(f"{path}: last line had no newline; terminated it")
+        else:
+            print(f"{path}: ok")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,310 @@
+"""
+Consolidated view over several ledgers (one per person or cost centre).
+
+Each ledger is a directory with its own database/, the layout the apps
+create in their working directory. Nothing is copied or concatenated:
+every ledger is read as a stream in date order and the streams are merged
+lazily with a heap (heapq.merge). Memory stays bounded by one month
+partition, or by a flat ledger's backdated rows, whatever the total size.
+A ledger kept in SQLite (database/finance.db with no text ledger beside
+it, or any finance.db under PFT_STORAGE=sqlite) is streamed from the
+database in date order through its date index.
+Every merged row carries the name of the ledger it came from, and the
+aggregations below keep per-ledger figures next to the combined ones.
+
+Ledgers are given as NAME=DIR (or just DIR, named after the directory),
+with --ledger or comma-separated in PFT_LEDGERS:
+
+    PFT_LEDGERS="asha=~/ledgers/asha,ravi=~/ledgers/ravi" python -m features.transactions.ledgers balance
+    python -m features.transactions.ledgers --ledger shop=/srv/shop --ledger home=. budgets --month 2025-01
+    python -m features.transactions.ledgers history --from 2024-01 --to 2024-12
+"""
+import argparse
+import heapq
+import os
+from datetime import datetime
+
+from features.transactions.store import date_code
+from features.transactions.partitions import list_partitions
+from features.profiling.profiler import profiled, record_scan
+
+LEDGERS_ENV = "PFT_LEDGERS"
+
+def parse_ledgers(specs):
+    """[(name, directory)] from 'NAME=DIR' or 'DIR' specs. Raises ValueError for a duplicate name or a missing directory."""
+    ledgers = []
+    for spec in specs:
+        spec = spec.strip()
+        if not spec:
+            continue
+        name, sep, directory = spec.partition("=")
+        if not sep:
+            directory = name
+            name = os.path.basename(os.path.normpath(os.path.abspath(os.path.expanduser(directory))))
+        directory = os.path.expanduser(directory.strip())
+        name = name.strip()
+        if not os.path.isdir(os.path.join(directory, "database")):
+            raise ValueError(f"ledger {name!r}: no database/ directory in {directory}")
+        if any(name == existing for existing, _ in ledgers):
+            raise ValueError(f"ledger name {name!r} used twice")
+        ledgers.append((name, directory))
+    return ledgers
+
+def configured_ledgers():
+    return parse_ledgers(os.environ.get(LEDGERS_ENV, "").split(","))
+
+def _read_rows(path):
+    """Yields (date code, position, transaction) for each well-formed line of a ledger file."""
+    from features.transactions.transactions import parse_transaction_line
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        for position, line in enumerate(f):
+            t = parse_transaction_line(line)
+            if t is None:
+                continue
+            try:
+                yield date_code(t['date']), position, t
+            except ValueError:
+                continue
+
+def _flat_in_date_order(path):
+    # First pass: rows dated before something earlier in the file (backdated
+    # entries) are the only ones out of order, and the only ones held in memory
+    backdated = []
+    running = 0
+    for row in _read_rows(path):
+        if row[0] < running:
+            backdated.append(row)
+        else:
+            running = row[0]
+    backdated.sort(key=lambda row: (row[0], row[1]))
+    skip = {row[1] for row in backdated}
+
+    in_order = (row for row in _read_rows(path) if row[1] not in skip)
+    return heapq.merge(in_order, backdated, key=lambda row: (row[0], row[1]))
+
+def _sqlite_path(directory):
+    """The ledger's finance.db if it's the ledger to read, else None."""
+    from features.storage.backend import use_sqlite
+    path = os.path.join(directory, "database", "finance.db")
+    if not os.path.exists(path):
+        return None
+    has_text = (
+        os.path.exists(os.path.join(directory, "database", "transactions.txt"))
+        or os.path.isdir(os.path.join(directory, "database", "transactions"))
+    )
+    return path if use_sqlite() or not has_text else None
+
+def _query(path, sql, params=()):
+    import sqlite3
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        yield from conn.execute(sql, params)
+    finally:
+        conn.close()
+
+def _sqlite_rows(path):
+    # Already in date order, so no sort keys
+    from features.storage.sqlite_backend import TRANSACTION_COLUMNS
+    for id, date, type, category, amount_paisa, description in _query(
+        path, f"SELECT {TRANSACTION_COLUMNS} FROM transactions ORDER BY date, seq"
+    ):
+        yield None, None, {"id": id, "date": date, "type": type, "category": category,
+                           "amount_paisa": amount_paisa, "description": description}
+
+def iter_ledger(directory, name=None):
+    """Yields a ledger's transactions oldest first (same-date rows in ledger order), each with 'ledger' set to `name`."""
+    partition_dir = os.path.join(directory, "database", "transactions")
+    sqlite_path = _sqlite_path(directory)
+    if sqlite_path:
+        rows = _sqlite_rows(sqlite_path)
+    elif os.path.isdir(partition_dir):
+        # One month in memory at a time
+        rows = (
+            row
+            for month in list_partitions(partition_dir)
+            for row in sorted(_read_rows(os.path.join(partition_dir, f"{month}.txt")), key=lambda row: (row[0], row[1]))
+        )
+    else:
+        rows = _flat_in_date_order(os.path.join(directory, "database", "transactions.txt"))
+    count = 0
+    for _, _, t in rows:
+        t['ledger'] = name
+        count += 1
+        yield t
+    record_scan(rows=count)
+
+def merge_ledgers(ledgers, start_date=None, end_date=None):
+    """
+    Lazily merges the ledgers' streams by date: yields transaction dicts
+    (with 'ledger') oldest first, only those within [start_date, end_date]
+    ('YYYY-MM-DD', optional). Same-date rows follow the order of `ledgers`.
+    """
+    streams = [iter_ledger(directory, name) for name, directory in ledgers]
+    for t in heapq.merge(*streams, key=lambda t: t['date']):
+        if start_date and t['date'] < start_date:
+            continue
+        if end_date and t['date'] > end_date:
+            # Everything after is later still
+            break
+        yield t
+
+def _month_dates(month_year):
+    # Inclusive bounds for string comparison, like month_bounds()
+    return f"{month_year}-01", f"{month_year}-31"
+
+def _load_budgets(directory, month_year):
+    from features.budgets.budgets import budget_key, format_budget_line, parse_budget_line
+    from features.storage.keyed import KeyedLog
+
+    sqlite_path = _sqlite_path(directory)
+    if sqlite_path:
+        return [
+            {"category": category, "limit_paisa": limit_paisa, "month_year": month_year}
+            for category, limit_paisa in _query(
+                sqlite_path, "SELECT category, limit_paisa FROM budgets WHERE month_year = ? ORDER BY rowid", (month_year,)
+            )
+        ]
+    log = KeyedLog(os.path.join(directory, "database", "budgets.txt"), budget_key, parse_budget_line, format_budget_line)
+    return [b for b in log.records() if b['month_year'] == month_year]
+
+@profiled("aggregate.consolidated_balance")
+def consolidated_balance(ledgers, month_year=None):
+    """
+    Income, expense and balance (paisa) per ledger and in total, for one
+    month ('YYYY-MM') or all time: {'ledgers': {name: {...}}, 'total': {...}}.
+    """
+    start, end = _month_dates(month_year) if month_year else (None, None)
+    per_ledger = {name: {"income_paisa": 0, "expense_paisa": 0} for name, _ in ledgers}
+    for t in merge_ledgers(ledgers, start, end):
+        key = "income_paisa" if t['type'] == "Income" else "expense_paisa" if t['type'] == "Expense" else None
+        if key:
+            per_ledger[t['ledger']][key] += t['amount_paisa']
+    total = {"income_paisa": 0, "expense_paisa": 0}
+    for figures in per_ledger.values():
+        figures["balance_paisa"] = figures["income_paisa"] - figures["expense_paisa"]
+        total["income_paisa"] += figures["income_paisa"]
+        total["expense_paisa"] += figures["expense_paisa"]
+    total["balance_paisa"] = total["income_paisa"] - total["expense_paisa"]
+    return {"month": month_year, "ledgers": per_ledger, "total": total}
+
+@profiled("aggregate.consolidated_budgets")
+def consolidated_budgets(ledgers, month_year):
+    """
+    Each ledger's budgets for a month against its own spending, and the
+    combined budget per category against everyone's spending (rows as in
+    budget_status): {'ledgers': {name: [rows]}, 'total': [rows]}.
+    """
+    from features.budgets.budgets import budget_status
+
+    spending = {name: {} for name, _ in ledgers}
+    for t in merge_ledgers(ledgers, *_month_dates(month_year)):
+        if t['type'] == "Expense":
+            by_category = spending[t['ledger']]
+            by_category[t['category']] = by_category.get(t['category'], 0) + t['amount_paisa']
+
+    per_ledger = {}
+    combined_limits, combined_spending = {}, {}
+    for name, directory in ledgers:
+        budgets = _load_budgets(directory, month_year)
+        per_ledger[name] = budget_status(month_year, budgets, spending[name])
+        for b in budgets:
+            combined_limits[b['category']] = combined_limits.get(b['category'], 0) + b['limit_paisa']
+        for category, amount in spending[name].items():
+            combined_spending[category] = combined_spending.get(category, 0) + amount
+    combined = [{"category": c, "limit_paisa": limit, "month_year": month_year} for c, limit in combined_limits.items()]
+    return {"month": month_year, "ledgers": per_ledger, "total": budget_status(month_year, combined, combined_spending)}
+
+@profiled("aggregate.consolidated_history")
+def consolidated_history(ledgers, start_month=None, end_month=None):
+    """
+    Month-by-month income and expense per ledger, in one pass over the
+    merged stream: [{'month', 'ledgers': {name: {'income_paisa', 'expense_paisa'}}, 'income_paisa', 'expense_paisa'}].
+    """
+    start = _month_dates(start_month)[0] if start_month else None
+    end = _month_dates(end_month)[1] if end_month else None
+    months = []
+    current = None
+    for t in merge_ledgers(ledgers, start, end):
+        month_year = t['date'][:7]
+        if current is None or current["month"] != month_year:
+            # The stream is in date order, so a month is finished once the next begins
+            current = {
+                "month": month_year,
+                "ledgers": {name: {"income_paisa": 0, "expense_paisa": 0} for name, _ in ledgers},
+                "income_paisa": 0,
+                "expense_paisa": 0,
+            }
+            months.append(current)
+        key = "income_paisa" if t['type'] == "Income" else "expense_paisa" if t['type'] == "Expense" else None
+        if key:
+            current["ledgers"][t['ledger']][key] += t['amount_paisa']
+            current[key] += t['amount_paisa']
+    return months
+
+def main(argv=None):
+    from rich.table import Table
+    from features.console import console
+    from features.budgets.budgets import STATUS_COLORS
+
+    parser = argparse.ArgumentParser(
+        prog="python -m features.transactions.ledgers",
+        description="Balance, budgets and history across several ledgers, merged by date."
+    )
+    parser.add_argument("--ledger", action="append", default=[], metavar="NAME=DIR",
+                        help=f"repeatable; default: the comma-separated {LEDGERS_ENV}")
+    commands = parser.add_subparsers(dest="command", required=True)
+    balance = commands.add_parser("balance")
+    balance.add_argument("--month", help="YYYY-MM (default: all time)")
+    budgets = commands.add_parser("budgets")
+    budgets.add_argument("--month", default=datetime.now().strftime("%Y-%m"), help="YYYY-MM (default: this month)")
+    history = commands.add_parser("history")
+    history.add_argument("--from", dest="start", help="first month, YYYY-MM")
+    history.add_argument("--to", dest="end", help="last month, YYYY-MM")
+    args = parser.parse_args(argv)
+
+    try:
+        ledgers = parse_ledgers(args.ledger) if args.ledger else configured_ledgers()
+    except ValueError as e:
+        parser.error(str(e))
+    if not ledgers:
+        parser.error(f"no ledgers: pass --ledger NAME=DIR or set {LEDGERS_ENV}")
+    names = [name for name, _ in ledgers]
+
+    if args.command == "balance":
+        result = consolidated_balance(ledgers, args.month)
+        table = Table(title=f"Balance - {args.month or 'all time'}")
+        for column in ("Ledger", "Income", "Expenses", "Balance"):
+            table.add_column(column, justify="left" if column == "Ledger" else "right")
+        for name, figures in list(result["ledgers"].items()) + [("Total", result["total"])]:
+            table.add_row(name, *(f"Rs {figures[k] / 100:,.2f}" for k in ("income_paisa", "expense_paisa", "balance_paisa")))
+        console.print(table)
+    elif args.command == "budgets":
+        result = consolidated_budgets(ledgers, args.month)
+        table = Table(title=f"Budgets - {args.month}")
+        for column in ("Ledger", "Category", "Limit", "Spent", "Used", "Status"):
+            table.add_column(column, justify="right" if column in ("Limit", "Spent", "Used") else "left")
+        for name, rows in list(result["ledgers"].items()) + [("Total", result["total"])]:
+            for row in rows:
+                color = STATUS_COLORS[row["status"]]
+                table.add_row(name, row["category"], f"Rs {row['limit_paisa'] / 100:,.2f}",
+                              f"Rs {row['spent_paisa'] / 100:,.2f}", f"{row['utilization']:.1f}%",
+                              f"[{color}]{row['status']}[/{color}]")
+        console.print(table)
+    else:
+        table = Table(title="Monthly History (expenses)")
+        table.add_column("Month")
+        for name in names:
+            table.add_column(name, justify="right")
+        table.add_column("Total", justify="right")
+        for month in consolidated_history(ledgers, args.start, args.end):
+            table.add_row(month["month"], *(f"Rs {month['ledgers'][n]['expense_paisa'] / 100:,.2f}" for n in names),
+                          f"Rs {month['expense_paisa'] / 100:,.2f}")
+        console.print(table)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,243 @@
+"""
+Month-partitioned ledger layout.
+
+Instead of one flat database/transactions.txt, each month lives in its own
+file (database/transactions/2025-12.txt) with the same pipe-delimited lines.
+The layout is active whenever PARTITION_DIR exists, so month-scoped queries
+only read the partitions they need.
+
+Convert an existing ledger (and back) with:
+
+    python -m features.transactions.partitions migrate
+    python -m features.transactions.partitions verify
+    python -m features.transactions.partitions revert
+"""
+import argparse
+import hashlib
+import os
+import re
+import shutil
+
+from features.transactions.store import date_code
+
+FLAT_PATH = os.path.join("database", "transactions.txt")
+PARTITION_DIR = os.path.join("database", "transactions")
+# Lines that can't be placed in a month (bad field count or date) are kept here
+REJECTED_NAME = "rejected.txt"
+BACKUP_SUFFIX = ".bak"
+
+_PARTITION_RE = re.compile(r"^(\d{4}-\d{2})\.txt$")
+
+def is_partitioned():
+    return os.path.isdir(PARTITION_DIR)
+
+def partition_path(month_year, directory=PARTITION_DIR):
+    return os.path.join(directory, f"{month_year}.txt")
+
+def list_partitions(directory=PARTITION_DIR):
+    """Sorted month_year keys ('2025-12') of the partitions that exist."""
+    if not os.path.isdir(directory):
+        return []
+    months = []
+    for name in os.listdir(directory):
+        match = _PARTITION_RE.match(name)
+        if match:
+            months.append(match.group(1))
+    return sorted(months)
+
+def partition_key(line):
+    """month_year a ledger line belongs in, or None if it can't be placed (a line the loaders skip)."""
+    parts = line.strip().split("|")
+    if len(parts) != 6:
+        return None
+    try:
+        date_code(parts[1])
+        int(parts[4])
+    except ValueError:
+        return None
+    return parts[1][:7]
+
+# --- Verification digests ---
+def _new_digest():
+    return {"rows": 0, "amount_paisa": 0, "hash": 0}
+
+def _add_line(digests, key, line):
+    # Order-independent digest: row count, amount sum and a sum of line hashes
+    d = digests.setdefault(key, _new_digest())
+    d["rows"] += 1
+    d["amount_paisa"] += int(line.split("|")[4])
+    d["hash"] = (d["hash"] + int.from_bytes(hashlib.sha256(line.encode("utf-8")).digest()[:16], "big")) % (1 << 128)
+
+def flat_digests(path=FLAT_PATH):
+    digests = {}
+    rejected = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            key = partition_key(line)
+            if key is None:
+                rejected += 1
+            else:
+                _add_line(digests, key, line)
+    return digests, rejected
+
+def partition_digests(directory=PARTITION_DIR):
+    digests = {}
+    for month_year in list_partitions(directory):
+        with open(partition_path(month_year, directory), "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    key = partition_key(line)
+                    if key is None:
+                        # Skipped by the loaders too
+                        continue
+                    if key != month_year:
+                        raise ValueError(f"{month_year}.txt holds a line from another month: {line!r}")
+                    _add_line(digests, month_year, line)
+    return digests
+
+def _rejected_lines(directory):
+    path = os.path.join(directory, REJECTED_NAME)
+    if not os.path.exists(path):
+        return 0
+    with open(path, "r", encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+def verify(flat_path=FLAT_PATH, directory=PARTITION_DIR):
+    """
+    Compares a flat ledger with a partition directory month by month.
+    Returns a list of mismatch descriptions (empty when they agree).
+    """
+    flat, rejected = flat_digests(flat_path)
+    parts = partition_digests(directory)
+    problems = []
+    for month_year in sorted(set(flat) | set(parts)):
+        a = flat.get(month_year, _new_digest())
+        b = parts.get(month_year, _new_digest())
+        if a != b:
+            problems.append(
+                f"{month_year}: flat has {a['rows']} rows / {a['amount_paisa']} paisa, "
+                f"partition has {b['rows']} rows / {b['amount_paisa']} paisa"
+                + (" (same totals, different lines)" if a["rows"] == b["rows"] and a["amount_paisa"] == b["amount_paisa"] else "")
+            )
+    kept = _rejected_lines(directory)
+    if kept != rejected:
+        problems.append(f"{REJECTED_NAME}: flat has {rejected} unplaceable lines, partitions kept {kept}")
+    return problems
+
+def migrate(flat_path=FLAT_PATH, directory=PARTITION_DIR):
+    """
+    Splits the flat ledger into month partitions.
+
+    Partitions are written to a staging directory and verified before it is
+    renamed into place; the flat file is then kept as flat_path + '.bak'.
+    Returns a summary dict.
+    """
+    if os.path.isdir(directory):
+        raise FileExistsError(f"{directory} already exists; the ledger is already partitioned")
+    staging = directory + ".staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    handles = {}
+    rows = rejected = 0
+    try:
+        if os.path.exists(flat_path):
+            with open(flat_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    key = partition_key(line)
+                    name = REJECTED_NAME if key is None else f"{key}.txt"
+                    out = handles.get(name)
+                    if out is None:
+                        out = handles[name] = open(os.path.join(staging, name), "a", encoding="utf-8")
+                    out.write(line + "\n")
+                    if key is None:
+                        rejected += 1
+                    else:
+                        rows += 1
+        else:
+            open(flat_path, "a").close()
+    finally:
+        for out in handles.values():
+            out.close()
+
+    problems = verify(flat_path, staging)
+    if problems:
+        raise ValueError("Partition verification failed:\n" + "\n".join(problems))
+
+    os.replace(staging, directory)
+    os.replace(flat_path, flat_path + BACKUP_SUFFIX)
+    return {"rows": rows, "rejected": rejected, "partitions": len(list_partitions(directory))}
+
+def revert(flat_path=FLAT_PATH, directory=PARTITION_DIR):
+    """
+    Concatenates the partitions (oldest month first) back into a flat ledger,
+    verifies it, and removes the partition directory. Returns a summary dict.
+    """
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"{directory} does not exist; the ledger is not partitioned")
+    if os.path.exists(flat_path):
+        raise FileExistsError(f"{flat_path} already exists; move it aside before reverting")
+    staging = flat_path + ".staging"
+    rows = 0
+    with open(staging, "w", encoding="utf-8") as out:
+        for month_year in list_partitions(directory):
+            with open(partition_path(month_year, directory), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        out.write(line.strip() + "\n")
+                        rows += 1
+        rejected_path = os.path.join(directory, REJECTED_NAME)
+        if os.path.exists(rejected_path):
+            with open(rejected_path, "r", encoding="utf-8") as f:
+                shutil.copyfileobj(f, out)
+
+    problems = verify(staging, directory)
+    if problems:
+        os.remove(staging)
+        raise ValueError("Flat ledger verification failed:\n" + "\n".join(problems))
+
+    os.replace(staging, flat_path)
+    shutil.rmtree(directory)
+    return {"rows": rows, "rejected": _count_lines(flat_path) - rows}
+
+def _count_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m features.transactions.partitions",
+        description="Convert the transaction ledger between the flat and month-partitioned layouts."
+    )
+    parser.add_argument("command", choices=["migrate", "verify", "revert"])
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        summary = migrate()
+        print(f"Migrated {summary['rows']} rows into {summary['partitions']} monthly partitions "
+              f"({summary['rejected']} unplaceable lines kept in {REJECTED_NAME}).")
+        print(f"The flat ledger was kept as {FLAT_PATH}{BACKUP_SUFFIX}.")
+    elif args.command == "revert":
+        summary = revert()
+        print(f"Restored {summary['rows']} rows to {FLAT_PATH}.")
+    else:
+        flat = FLAT_PATH if os.path.exists(FLAT_PATH) else FLAT_PATH + BACKUP_SUFFIX
+        if not os.path.exists(flat) or not is_partitioned():
+            print("Nothing to verify: need both a flat ledger (or its .bak) and a partition directory.")
+            return 1
+        problems = verify(flat, PARTITION_DIR)
+        if problems:
+            print("\n".join(problems))
+            return 1
+        print(f"{flat} and {PARTITION_DIR} agree.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,194 @@
+"""
+The most recent transactions without loading the ledger.
+
+Ledger lines are mostly appended in date order, so the newest rows sit at
+the end of the file and recent_transactions() reads it backwards in
+TAIL_BLOCK_BYTES blocks. Backdated entries (a receipt from last week typed
+in today) are why it can't just take the last N lines: a small recency
+index keeps, per ledger file, the offsets where the running maximum date
+goes up. From it, the greatest date anywhere before a given offset is one
+bisect away, and the backwards read stops as soon as nothing earlier in
+the file can outrank the N rows it already has. That is typically N rows
+plus the rest of the oldest day among them, whatever the ledger's size.
+
+Newest first means by date, then by position in the ledger (the later
+entry first). The index lives in RECENCY_PATH with a cursor per ledger file
+and, like the rollups, only reads the bytes appended since its last use;
+a rewritten file gets its index rebuilt.
+"""
+import bisect
+import heapq
+import os
+import pickle
+import threading
+from array import array
+
+from features.storage.backend import use_sqlite
+from features.storage import cache
+from features.transactions.store import date_code, format_date_code
+from features.storage.locks import atomic_write
+from features.storage.cursors import new_cursor, is_append_of, read_appended
+from features.profiling.profiler import profiled, record_scan
+
+RECENCY_PATH = os.path.join("database", ".recency")
+RECENCY_VERSION = 1
+TAIL_BLOCK_BYTES = 16 * 1024
+
+_state = None
+_lock = threading.Lock()
+
+@cache.on_reset
+def reset():
+    global _state
+    with _lock:
+        _state = None
+
+def _new_entry(stat):
+    # Running-max change points: step_dates[i] is the greatest date from step_offsets[i] on
+    return {"cursor": new_cursor(stat), "step_offsets": array("q"), "step_dates": array("l")}
+
+def _read_state():
+    try:
+        with open(RECENCY_PATH, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") == RECENCY_VERSION:
+            return state
+    except Exception:
+        pass
+    return None
+
+def _write_state(state):
+    try:
+        atomic_write(RECENCY_PATH, lambda f: pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL), binary=True)
+    except OSError:
+        # Only an accelerator: the next process rebuilds from the ledger
+        pass
+
+def _line_date(line):
+    """Date code of a well-formed ledger line (bytes or str), else None."""
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", "replace")
+    parts = line.strip().split("|")
+    if len(parts) != 6:
+        return None
+    try:
+        int(parts[4])
+        return date_code(parts[1])
+    except ValueError:
+        return None
+
+def _apply_lines(entry, data, offset):
+    """Folds complete lines `data`, starting at byte `offset` of the file, into the change points."""
+    offsets, dates = entry["step_offsets"], entry["step_dates"]
+    running = dates[-1] if dates else 0
+    # 'YYYY-MM-DD' bytes sort like the dates, so only a later-looking line is parsed
+    running_text = format_date_code(running).encode() if running else b""
+    for line in data.split(b"\n")[:-1]:
+        parts = line.split(b"|", 2)
+        if len(parts) == 3 and parts[1] > running_text:
+            d = _line_date(line)
+            if d is not None:
+                running, running_text = d, parts[1]
+                offsets.append(offset)
+                dates.append(d)
+        offset += len(line) + 1
+
+def _catch_up(state, paths):
+    files = state["files"]
+    for path in set(files) - set(paths):
+        del files[path]
+    for path in paths:
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            files.pop(path, None)
+            continue
+        with f:
+            stat = os.fstat(f.fileno())
+            entry = files.get(path)
+            if entry is None or not is_append_of(entry["cursor"], stat, f):
+                entry = files[path] = _new_entry(stat)
+            start = entry["cursor"]["offset"]
+            complete, _ = read_appended(f, stat, entry["cursor"])
+            record_scan(bytes=len(complete))
+            _apply_lines(entry, complete, start)
+
+def _fingerprint(state):
+    return {path: (e["cursor"]["offset"], e["cursor"]["mtime_ns"]) for path, e in state["files"].items()}
+
+def refresh():
+    """Brings the recency index up to date with every ledger file and returns {path: entry}."""
+    from features.transactions.transactions import ledger_paths
+    global _state
+    with _lock:
+        state = _state or _read_state() or {"version": RECENCY_VERSION, "files": {}}
+        before = _fingerprint(state)
+        _catch_up(state, ledger_paths())
+        if _fingerprint(state) != before:
+            _write_state(state)
+        _state = state
+        return state["files"]
+
+def _max_date_through(entry, offset):
+    """Greatest date of any line starting at or before `offset`."""
+    i = bisect.bisect_right(entry["step_offsets"], offset)
+    return entry["step_dates"][i - 1] if i else 0
+
+def iter_lines_reversed(path, block_size=TAIL_BLOCK_BYTES):
+    """Yields (offset, line) for every line of `path` as bytes, last line first, reading backwards in blocks."""
+    with open(path, "rb") as f:
+        pos = os.fstat(f.fileno()).st_size
+        # Unyielded bytes from `pos` on, always ending in a newline
+        buffer = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            if not buffer and not chunk.endswith(b"\n"):
+                # Unterminated last line (a hand-edited file)
+                chunk += b"\n"
+            buffer = chunk + buffer
+            record_scan(bytes=step)
+            lines = buffer[:-1].split(b"\n")
+            # The first piece may continue in the previous block
+            first = 0 if pos == 0 else 1
+            offset = pos + len(buffer)
+            for line in reversed(lines[first:]):
+                offset -= len(line) + 1
+                yield offset, line
+            buffer = lines[0] + b"\n" if first else b""
+
+@profiled("storage.recent_transactions")
+def recent_transactions(n=10):
+    """The `n` most recent transactions as dicts, newest first."""
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.recent_transactions(n)
+    from features.transactions.transactions import parse_transaction_line
+
+    if n <= 0:
+        return []
+    files = refresh()
+    # Min-heap of the best n so far: (date, file rank, offset, line)
+    best = []
+    # Files with the latest dates first (with partitions: the newest month first)
+    ordered = sorted(files.items(), key=lambda item: _max_date_through(item[1], item[1]["cursor"]["offset"]), reverse=True)
+    for rank, (path, entry) in zip(range(len(ordered), 0, -1), ordered):
+        indexed_end = entry["cursor"]["offset"]
+        if len(best) == n and best[0][0] >= _max_date_through(entry, indexed_end):
+            break
+        for offset, line in iter_lines_reversed(path):
+            # Lines past the index (appended since refresh) are always read
+            if offset < indexed_end and len(best) == n and best[0][0] >= _max_date_through(entry, offset):
+                # Neither this line nor any before it can make the cut
+                break
+            d = _line_date(line)
+            if d is None:
+                continue
+            key = (d, rank, offset, line)
+            if len(best) < n:
+                heapq.heappush(best, key)
+            elif key > best[0]:
+                heapq.heapreplace(best, key)
+    return [parse_transaction_line(line.decode("utf-8")) for *_, line in sorted(best, reverse=True)]
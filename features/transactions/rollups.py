@@ -0,0 +1,260 @@
+"""
+Persistent month x type x category totals, plus expenses per day and category.
+
+Every month view (balance, budgets, analytics, the assistant and both
+Streamlit apps) needs the same per-month income, expense and per-category
+sums. Instead of re-aggregating raw rows, they read them from this index,
+so a month summary costs the same however much history there is.
+
+With the text ledger the index lives in ROLLUP_PATH together with a cursor
+per ledger file; refresh() folds in only the lines appended since, which is
+O(1) per saved transaction. The file is rewritten once ROLLUP_PERSIST_BYTES
+of ledger have been folded in since it was last written (and at exit), not
+on every save, since a rewrite grows with the history; a reader of an
+older copy just folds in the lines after its cursors. A rewritten ledger
+file (edit/delete, layout migration) triggers a rebuild. With SQLite the totals are kept by triggers
+in the monthly_rollups table instead, and the daily expenses are grouped
+in SQL on the (type, date) index.
+
+The daily expenses feed the spending time series (see
+features/financial_analytics/series.py).
+
+    python -m features.transactions.rollups rebuild
+    python -m features.transactions.rollups verify
+"""
+import argparse
+import atexit
+import os
+import pickle
+import threading
+
+from features.storage.backend import use_sqlite
+from features.storage import cache
+from features.transactions.store import date_code
+from features.storage.locks import atomic_write
+from features.storage.cursors import new_cursor, is_append_of, read_appended
+from features.profiling.profiler import profiled, record_scan
+
+ROLLUP_PATH = os.path.join("database", ".monthly_rollups")
+ROLLUP_VERSION = 2
+# Ledger bytes folded in before the index file is rewritten
+ROLLUP_PERSIST_BYTES = 1024 * 1024
+
+_state = None
+# Absolute, so the exit flush finds the right file whatever the working directory by then
+_state_path = None
+_lock = threading.Lock()
+
+def _new_state(layout):
+    return {"version": ROLLUP_VERSION, "layout": layout, "cursors": {}, "months": {}, "days": {}, "unpersisted": 0}
+
+def _read_state():
+    try:
+        with open(ROLLUP_PATH, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") == ROLLUP_VERSION:
+            return state
+    except Exception:
+        pass
+    return None
+
+def _write_state(state, path=ROLLUP_PATH):
+    previous = state.get("unpersisted", 0)
+    state["unpersisted"] = 0
+    try:
+        atomic_write(path, lambda f: pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL), binary=True)
+    except OSError:
+        # Only an accelerator: the next process rebuilds from the ledger
+        state["unpersisted"] = previous
+
+def _apply_lines(state, data):
+    months, days = state["months"], state["days"]
+    for line in data.decode("utf-8").splitlines():
+        parts = line.strip().split("|")
+        if len(parts) != 6:
+            continue
+        try:
+            day = date_code(parts[1])
+            amount = int(parts[4])
+        except ValueError:
+            continue
+        month = months.setdefault(parts[1][:7], {})
+        key = (parts[2], parts[3])
+        month[key] = month.get(key, 0) + amount
+        if parts[2] == "Expense":
+            categories = days.setdefault(day, {})
+            categories[parts[3]] = categories.get(parts[3], 0) + amount
+
+def _ledger_files():
+    from features.transactions.partitions import is_partitioned, list_partitions, partition_path
+    from features.transactions.transactions import DB_PATH
+    if is_partitioned():
+        return "partitioned", [partition_path(m) for m in list_partitions()]
+    return "flat", [DB_PATH] if os.path.exists(DB_PATH) else []
+
+def _catch_up(state, layout, paths):
+    """Folds newly appended lines into `state`. Returns False if a rebuild is needed."""
+    if state["layout"] != layout or set(state["cursors"]) - set(paths):
+        return False
+    for path in paths:
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            cursor = state["cursors"].get(path)
+            if cursor is None:
+                cursor = state["cursors"][path] = new_cursor(stat)
+            elif not is_append_of(cursor, stat, f):
+                return False
+            complete, _ = read_appended(f, stat, cursor)
+            record_scan(bytes=len(complete))
+            _apply_lines(state, complete)
+            state["unpersisted"] = state.get("unpersisted", 0) + len(complete)
+    return True
+
+@profiled("aggregate.rollups_refresh")
+def refresh():
+    """Brings the text-ledger index up to date and returns its {month: {(type, category): paisa}}."""
+    with _lock:
+        return _refresh_locked()["months"]
+
+def _refresh_locked():
+    global _state, _state_path
+    layout, paths = _ledger_files()
+    state = _state or _read_state()
+    rebuilt = state is None
+    if rebuilt or not _catch_up(state, layout, paths):
+        state = _new_state(layout)
+        _catch_up(state, layout, paths)
+        rebuilt = True
+    if rebuilt or state.get("unpersisted", 0) >= ROLLUP_PERSIST_BYTES:
+        _write_state(state)
+    _state, _state_path = state, os.path.abspath(ROLLUP_PATH)
+    return state
+
+def flush():
+    """Writes out what the in-memory index has folded in since the file was last written."""
+    with _lock:
+        if _state is not None and _state.get("unpersisted"):
+            _write_state(_state, _state_path)
+
+atexit.register(flush)
+
+@cache.on_reset
+def reset():
+    """Writes out and forgets the in-memory index."""
+    global _state, _state_path
+    flush()
+    with _lock:
+        _state = _state_path = None
+
+@profiled("aggregate.rollups_rebuild")
+def rebuild():
+    """Discards the index and recomputes it from the whole ledger."""
+    global _state
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        sqlite_backend.rebuild_rollups()
+        return
+    with _lock:
+        _state = None
+        if os.path.exists(ROLLUP_PATH):
+            os.remove(ROLLUP_PATH)
+    refresh()
+
+def all_months():
+    """{month_year: {(type, category): paisa}} for every month in the ledger."""
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.all_rollups()
+    return refresh()
+
+@profiled("aggregate.month_rollup")
+def month_rollup(month_year):
+    """{(type, category): paisa} for one 'YYYY-MM' month."""
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.month_rollup(month_year)
+    return dict(refresh().get(month_year, {}))
+
+def month_totals(year, month):
+    """(income_paisa, expense_paisa) for a month."""
+    rollup = month_rollup(f"{year}-{month:02d}")
+    income = sum(amount for (type, _), amount in rollup.items() if type == "Income")
+    expense = sum(amount for (type, _), amount in rollup.items() if type == "Expense")
+    return income, expense
+
+def month_category_totals(type, year, month):
+    """{category: paisa} for one type in a month."""
+    rollup = month_rollup(f"{year}-{month:02d}")
+    return {category: amount for (t, category), amount in rollup.items() if t == type and amount}
+
+@profiled("aggregate.daily_expenses")
+def daily_expenses(start=None, end=None):
+    """{date code: {category: paisa}} of expenses on each day with any, within [start, end] (inclusive date codes, optional)."""
+    lo = start if start is not None else 0
+    hi = end if end is not None else 99999999
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.daily_expenses(lo, hi)
+    with _lock:
+        days = _refresh_locked()["days"]
+        return {day: dict(categories) for day, categories in days.items() if lo <= day <= hi}
+
+@profiled("aggregate.range_rollup")
+def range_rollup(start_month=None, end_month=None):
+    """{(type, category): paisa} summed over the months in [start_month, end_month] (both optional, 'YYYY-MM')."""
+    totals = {}
+    for month_year, rollup in all_months().items():
+        if (start_month and month_year < start_month) or (end_month and month_year > end_month):
+            continue
+        for key, amount in rollup.items():
+            totals[key] = totals.get(key, 0) + amount
+    return totals
+
+def verify():
+    """
+    Recomputes the totals from a full read of the ledger and compares them
+    with the index. Returns a list of mismatch descriptions (empty if they agree).
+    """
+    from features.transactions.transactions import load_transactions
+    from features.transactions.store import format_date_code
+
+    store = load_transactions()
+    expected = {}
+    for d, tc, cc, amount in zip(store.dates, store.type_codes, store.category_codes, store.amounts):
+        month = expected.setdefault(format_date_code(d)[:7], {})
+        key = (store.types[tc], store.categories[cc])
+        month[key] = month.get(key, 0) + amount
+
+    actual = all_months()
+    problems = []
+    for month_year in sorted(set(expected) | set(actual)):
+        want = {k: v for k, v in expected.get(month_year, {}).items() if v}
+        have = {k: v for k, v in actual.get(month_year, {}).items() if v}
+        for key in sorted(set(want) | set(have)):
+            if want.get(key, 0) != have.get(key, 0):
+                problems.append(
+                    f"{month_year} {key[0]}/{key[1]}: ledger {want.get(key, 0)} paisa, index {have.get(key, 0)} paisa"
+                )
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m features.transactions.rollups",
+        description="Rebuild or verify the monthly rollup index."
+    )
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        rebuild()
+        print("Monthly rollup index rebuilt.")
+        return 0
+    problems = verify()
+    if problems:
+        print("\n".join(problems))
+        return 1
+    print("Monthly rollup index matches the ledger.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,213 @@
+"""
+Inverted index for searching transactions by description and category.
+
+Rows are grouped by their distinct (description, category) pair and each
+token points at the groups that contain it, so every distinct description
+is tokenized once and a lookup only touches the matching groups. The index
+is kept in memory and catches up with appended rows on the next query, so
+saving a transaction costs nothing here and a query after it indexes just
+the new rows. That holds when the next load returns a new store too (a
+partition grew, or a SQLite read): as long as it begins with the rows
+already indexed, only the rest is added. Queries without an explicit store
+go through cache.get_transactions(), so with SQLite the table is re-read
+only when its data_version moves, not on every query.
+
+Terms are lower-cased words and must all match. A term also matches as a
+prefix ("biry" finds "biryani"), and with fuzzy=True it may be one typo
+away (an insertion, deletion, substitution or swap of neighbours), found
+through an index of one-character deletions rather than a vocabulary scan.
+
+    python -m features.transactions.search biryani
+    python -m features.transactions.search lunh --fuzzy
+"""
+import argparse
+import bisect
+import re
+import threading
+import time
+from array import array
+from itertools import chain
+
+from features.storage import cache
+from features.profiling.profiler import profiled, record_scan
+
+TOKEN_RE = re.compile(r"\w+")
+# Shorter terms are too ambiguous for typo matching
+MIN_FUZZY_LENGTH = 4
+
+_state = None
+_lock = threading.Lock()
+
+@cache.on_reset
+def reset():
+    global _state
+    with _lock:
+        _state = None
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+def _deletions(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+def _one_edit(a, b):
+    """True if a and b differ by exactly one insertion, deletion, substitution or adjacent swap."""
+    if a == b or abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:] or (a[i + 2:] == b[i + 2:] and a[i:i + 2] == b[i:i + 2][::-1])
+    return a[i:] == b[i + 1:]
+
+def _new_state(store):
+    return {
+        "store": store,
+        "rows": 0,
+        # (description, category code) -> group; group -> array of row indices
+        "groups": {},
+        "group_rows": [],
+        # token -> groups, sorted tokens (for prefixes), deletion variant -> tokens
+        "postings": {},
+        "vocabulary": [],
+        "deletions": {},
+    }
+
+def _add_token(state, token, group):
+    postings = state["postings"].get(token)
+    if postings is None:
+        postings = state["postings"][token] = []
+        bisect.insort(state["vocabulary"], token)
+        for variant in _deletions(token):
+            state["deletions"].setdefault(variant, []).append(token)
+    postings.append(group)
+
+def _catch_up(state):
+    store = state["store"]
+    groups, group_rows = state["groups"], state["group_rows"]
+    descriptions, category_codes, categories = store.descriptions, store.category_codes, store.categories
+    start = state["rows"]
+    for i in range(start, len(store)):
+        key = (descriptions[i], category_codes[i])
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = len(group_rows)
+            group_rows.append(array("L"))
+            for token in set(tokenize(key[0])) | set(tokenize(categories[key[1]])):
+                _add_token(state, token, group)
+        group_rows[group].append(i)
+    state["rows"] = len(store)
+    record_scan(rows=len(store) - start)
+
+def _extends(state, transactions):
+    """True if `transactions` begins with the rows the index was built from."""
+    old, rows = state["store"], state["rows"]
+    if transactions is old:
+        return rows <= len(transactions)
+    if rows > len(transactions) or transactions.categories[:len(old.categories)] != old.categories:
+        return False
+    # The index only depends on each row's description and category, so
+    # comparing those over the whole prefix (a few ms per 100k rows, far less
+    # than re-tokenizing) catches any row inserted, removed or edited before the end
+    def prefix(column):
+        return column if len(column) == rows else column[:rows]
+    return (
+        prefix(transactions.category_codes) == prefix(old.category_codes)
+        and prefix(transactions.descriptions) == prefix(old.descriptions)
+    )
+
+def _index_for(transactions):
+    global _state
+    if _state is None or not _extends(_state, transactions):
+        _state = _new_state(transactions)
+    _state["store"] = transactions
+    if _state["rows"] < len(transactions):
+        _catch_up(_state)
+    return _state
+
+def _matching_tokens(state, term, fuzzy):
+    postings = state["postings"]
+    tokens = set()
+    vocabulary = state["vocabulary"]
+    i = bisect.bisect_left(vocabulary, term)
+    while i < len(vocabulary) and vocabulary[i].startswith(term):
+        tokens.add(vocabulary[i])
+        i += 1
+    if fuzzy and len(term) >= MIN_FUZZY_LENGTH:
+        deletions = state["deletions"]
+        candidates = set(deletions.get(term, ()))
+        for variant in _deletions(term):
+            if variant in postings:
+                candidates.add(variant)
+            candidates.update(deletions.get(variant, ()))
+        tokens.update(c for c in candidates if _one_edit(term, c))
+    return tokens
+
+@profiled("aggregate.search")
+def search(query, transactions=None, fuzzy=False):
+    """
+    Row indices (ascending, an array('L')) of the transactions matching every
+    term of `query` in their description or category. `transactions`
+    defaults to cache.get_transactions(), which only reloads when the data
+    version moves; indices are positions in that store.
+    """
+    if transactions is None:
+        transactions = cache.get_transactions()
+    terms = tokenize(query)
+    if not terms:
+        return array("L")
+
+    with _lock:
+        state = _index_for(transactions)
+        groups = None
+        for term in terms:
+            postings = state["postings"]
+            matched = set(chain.from_iterable(postings[t] for t in _matching_tokens(state, term, fuzzy)))
+            groups = matched if groups is None else groups & matched
+            if not groups:
+                return array("L")
+        group_rows = state["group_rows"]
+        if len(groups) == 1:
+            return array("L", group_rows[groups.pop()])
+        return array("L", sorted(chain.from_iterable(group_rows[g] for g in groups)))
+
+def search_transactions(query, limit=None, fuzzy=False, transactions=None):
+    """Matching transactions as dicts, newest first (later entries first within a day, as in the transaction list)."""
+    if transactions is None:
+        transactions = cache.get_transactions()
+    rows = search(query, transactions, fuzzy)
+    if limit is None:
+        # Stable, so feeding the rows backwards puts later entries first on ties
+        rows = sorted(reversed(rows), key=transactions.dates.__getitem__, reverse=True)
+    else:
+        from features.transactions.transactions import newest_first_page
+        rows = newest_first_page(transactions, rows, 0, limit)
+    return [transactions[i].copy() for i in rows]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m features.transactions.search",
+        description="Search transaction descriptions and categories."
+    )
+    parser.add_argument("query")
+    parser.add_argument("--fuzzy", action="store_true", help="allow one typo per term")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    from features.transactions.transactions import load_transactions
+    transactions = load_transactions()
+    start = time.perf_counter()
+    search(args.query, transactions, args.fuzzy)
+    built = time.perf_counter()
+    rows = search(args.query, transactions, args.fuzzy)
+    done = time.perf_counter()
+    for t in search_transactions(args.query, args.limit, args.fuzzy, transactions):
+        print(f"{t['date']}  {t['type']:<7}  {t['category']:<13}  Rs {t['amount_paisa'] / 100:>12,.2f}  {t['description']}")
+    print(f"{len(rows):,} matches; index built in {(built - start) * 1000:.1f} ms, query took {(done - built) * 1000:.3f} ms")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
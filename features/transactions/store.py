@@ -0,0 +1,288 @@
+import bisect
+import threading
+from array import array
+from collections.abc import Mapping, Sequence
+
+FIELDS = ("id", "date", "type", "category", "amount_paisa", "description")
+
+# Stores are shared between Streamlit sessions; the date index is built lazily
+_date_index_lock = threading.Lock()
+
+def date_code(date_str):
+    """'2025-12-31' -> 20251231. Raises ValueError for anything else."""
+    if len(date_str) != 10 or date_str[4] != "-" or date_str[7] != "-":
+        raise ValueError(f"Bad date: {date_str!r}")
+    return int(date_str[:4]) * 10000 + int(date_str[5:7]) * 100 + int(date_str[8:])
+
+def format_date_code(code):
+    return f"{code // 10000:04d}-{code // 100 % 100:02d}-{code % 100:02d}"
+
+def month_range(year, month):
+    """Inclusive (start, end) date codes covering a whole month."""
+    base = (year * 100 + month) * 100
+    return base + 1, base + 31
+
+def month_range_str(month_year):
+    year, month = month_year.split("-")
+    return month_range(int(year), int(month))
+
+class TransactionRow(Mapping):
+    """Read-only dict-like view of one row in a TransactionStore."""
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key):
+        s, i = self._store, self._index
+        if key == "amount_paisa":
+            return s.amounts[i]
+        if key == "date":
+            return format_date_code(s.dates[i])
+        if key == "type":
+            return s.types[s.type_codes[i]]
+        if key == "category":
+            return s.categories[s.category_codes[i]]
+        if key == "id":
+            return s.ids[i]
+        if key == "description":
+            return s.descriptions[i]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class TransactionStore(Sequence):
+    """
+    Append-only columnar container for transactions.
+
+    Amounts live in an array('q') of paisa, dates in an array('l') of
+    YYYYMMDD codes, and type/category are interned to small integer codes
+    (look them up in `types` / `categories`). Indexing or iterating yields
+    TransactionRow views, so code written against the old list of dicts
+    keeps working; aggregation code should use the columns directly.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.dates = array("l")
+        self.type_codes = array("B")
+        self.category_codes = array("H")
+        self.amounts = array("q")
+        self.descriptions = []
+        self.types = []
+        self.categories = []
+        self._type_index = {}
+        self._category_index = {}
+        # Date index: row indices ordered by (date, row), their dates, rows covered
+        self._date_order = array("L")
+        self._sorted_dates = array("l")
+        self._date_indexed = 0
+
+    # --- Interning ---
+    def type_code(self, name):
+        """Code for a type name, or None if no row has used it."""
+        return self._type_index.get(name)
+
+    def category_code(self, name):
+        return self._category_index.get(name)
+
+    def _intern_type(self, name):
+        code = self._type_index.get(name)
+        if code is None:
+            code = self._type_index[name] = len(self.types)
+            self.types.append(name)
+        return code
+
+    def _intern_category(self, name):
+        code = self._category_index.get(name)
+        if code is None:
+            code = self._category_index[name] = len(self.categories)
+            self.categories.append(name)
+        return code
+
+    # --- Building ---
+    def append_fields(self, id, date, type, category, amount_paisa, description):
+        code = date_code(date)
+        self.ids.append(id)
+        self.dates.append(code)
+        self.type_codes.append(self._intern_type(type))
+        self.category_codes.append(self._intern_category(category))
+        self.amounts.append(amount_paisa)
+        self.descriptions.append(description)
+
+    def append(self, t):
+        self.append_fields(t['id'], t['date'], t['type'], t['category'], t['amount_paisa'], t['description'])
+
+    def extend(self, transactions):
+        for t in transactions:
+            self.append(t)
+
+    def extend_store(self, other):
+        """Appends every row of another store, column by column."""
+        type_map = [self._intern_type(name) for name in other.types]
+        category_map = [self._intern_category(name) for name in other.categories]
+        self.ids.extend(other.ids)
+        self.dates.extend(other.dates)
+        if type_map == list(range(len(type_map))):
+            self.type_codes.extend(other.type_codes)
+        else:
+            self.type_codes.extend(type_map[c] for c in other.type_codes)
+        if category_map == list(range(len(category_map))):
+            self.category_codes.extend(other.category_codes)
+        else:
+            self.category_codes.extend(category_map[c] for c in other.category_codes)
+        self.amounts.extend(other.amounts)
+        self.descriptions.extend(other.descriptions)
+
+    def copy(self):
+        return self.take(range(len(self)))
+
+    def take(self, indices):
+        """New store holding the given rows, in the given order."""
+        out = TransactionStore()
+        out.types = list(self.types)
+        out.categories = list(self.categories)
+        out._type_index = dict(self._type_index)
+        out._category_index = dict(self._category_index)
+        for i in indices:
+            out.ids.append(self.ids[i])
+            out.dates.append(self.dates[i])
+            out.type_codes.append(self.type_codes[i])
+            out.category_codes.append(self.category_codes[i])
+            out.amounts.append(self.amounts[i])
+            out.descriptions.append(self.descriptions[i])
+        return out
+
+    # --- Sequence protocol ---
+    def __len__(self):
+        return len(self.amounts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction index out of range")
+        return TransactionRow(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield TransactionRow(self, i)
+
+    # --- Date index ---
+    def _update_date_index(self):
+        n = len(self.dates)
+        start = self._date_indexed
+        if start == n:
+            return
+        order, sorted_dates, dates = self._date_order, self._sorted_dates, self.dates
+        if start == 0:
+            rows = sorted(range(n), key=dates.__getitem__)
+            order.extend(rows)
+            sorted_dates.extend(dates[i] for i in rows)
+        else:
+            for i in range(start, n):
+                d = dates[i]
+                if d >= sorted_dates[-1]:
+                    order.append(i)
+                    sorted_dates.append(d)
+                else:
+                    # Backdated row: after the rows of its date already indexed
+                    pos = bisect.bisect_right(sorted_dates, d)
+                    order.insert(pos, i)
+                    sorted_dates.insert(pos, d)
+        self._date_indexed = n
+
+    def rows_between(self, start=None, end=None):
+        """
+        Row indices dated within [start, end] (inclusive date codes, either
+        optional), oldest first and same-date rows in store order. Two
+        bisects over the date index, which is built on first use and then
+        extended as rows are appended.
+        """
+        with _date_index_lock:
+            self._update_date_index()
+        lo = 0 if start is None else bisect.bisect_left(self._sorted_dates, start)
+        hi = len(self._sorted_dates) if end is None else bisect.bisect_right(self._sorted_dates, end)
+        return self._date_order[lo:hi]
+
+    # --- Column queries ---
+    def indices(self, type=None, category=None, start=None, end=None):
+        """Row indices matching every given filter; start/end are inclusive date codes."""
+        type_code = category_code = None
+        if type is not None:
+            type_code = self.type_code(type)
+            if type_code is None:
+                return []
+        if category is not None:
+            category_code = self.category_code(category)
+            if category_code is None:
+                return []
+        lo = start if start is not None else 0
+        hi = end if end is not None else 99999999
+
+        dates, types, cats = self.dates, self.type_codes, self.category_codes
+        return [
+            i for i in range(len(dates))
+            if lo <= dates[i] <= hi
+            and (type_code is None or types[i] == type_code)
+            and (category_code is None or cats[i] == category_code)
+        ]
+
+    def filter(self, **filters):
+        return self.take(self.indices(**filters))
+
+    def month(self, year, month):
+        start, end = month_range(year, month)
+        return self.filter(start=start, end=end)
+
+    def totals(self, start=None, end=None):
+        """(income_paisa, expense_paisa) for rows dated within [start, end]."""
+        income_code = self.type_code("Income")
+        expense_code = self.type_code("Expense")
+        lo = start if start is not None else 0
+        hi = end if end is not None else 99999999
+        income = expense = 0
+        for d, tc, amt in zip(self.dates, self.type_codes, self.amounts):
+            if lo <= d <= hi:
+                if tc == income_code:
+                    income += amt
+                elif tc == expense_code:
+                    expense += amt
+        return income, expense
+
+    def category_totals(self, type="Expense", start=None, end=None):
+        """{category: paisa} for rows of one type dated within [start, end]."""
+        code = self.type_code(type)
+        if code is None:
+            return {}
+        lo = start if start is not None else 0
+        hi = end if end is not None else 99999999
+        sums = [0] * len(self.categories)
+        for d, tc, cc, amt in zip(self.dates, self.type_codes, self.category_codes, self.amounts):
+            if tc == code and lo <= d <= hi:
+                sums[cc] += amt
+        return {self.categories[c]: total for c, total in enumerate(sums) if total}
+
+    def to_columns(self):
+        """Plain dict of lists, e.g. for pd.DataFrame(store.to_columns())."""
+        return {
+            "id": list(self.ids),
+            "date": [format_date_code(d) for d in self.dates],
+            "type": [self.types[c] for c in self.type_codes],
+            "category": [self.categories[c] for c in self.category_codes],
+            "amount_paisa": list(self.amounts),
+            "description": list(self.descriptions)
+        }
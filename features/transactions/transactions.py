@@ -1,47 +1,391 @@
+import heapq
+import math
 import os
+import pickle
+import threading
 import uuid
-from datetime import datetime
-import questionary
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
+from datetime import datetime, timedelta
+
+from features.transactions.store import TransactionStore, date_code
+from features.transactions.partitions import is_partitioned, list_partitions, partition_path
+from features.transactions import rollups
+from features.storage.backend import use_sqlite
+from features.storage import cache
+from features.storage.wal import GroupCommitLog
+from features.storage.cursors import new_cursor, is_append_of, read_appended
+from features.storage.locks import atomic_write
+from features.profiling.profiler import profiled, record_scan
+from features.console import console
 
-console = Console()
 DB_PATH = os.path.join("database", "transactions.txt")
 
 EXPENSE_CATEGORIES = ["Food", "Transport", "Shopping", "Bills", "Entertainment", "Health", "Other"]
 INCOME_CATEGORIES = ["Salary", "Freelance", "Business", "Investment", "Gift", "Other"]
 
+# Only re-persist the checkpoint once this many unpersisted bytes have piled up,
+# so a single appended row doesn't cost a rewrite of the whole snapshot.
+CHECKPOINT_PERSIST_BYTES = 1024 * 1024
+CHECKPOINT_VERSION = 4
+# Bulk writes (save_transactions) are committed in batches of this many rows
+WRITE_BATCH_SIZE = 5000
+# Rows per page in the transaction views
+PAGE_SIZE = 25
+# Amounts are stored as signed 64-bit paisa
+MAX_AMOUNT_PAISA = 2 ** 63 - 1
+
+# Parse checkpoints by ledger file path
+_checkpoints = {}
+# (partition identities, combined store) for the partitioned layout
+_combined = None
+# Streamlit serves sessions from threads that share this module
+_checkpoint_lock = threading.Lock()
+
+def parse_transaction_line(line):
+    parts = line.strip().split("|")
+    if len(parts) == 6:
+        return {
+            "id": parts[0],
+            "date": parts[1],
+            "type": parts[2],
+            "category": parts[3],
+            "amount_paisa": int(parts[4]),
+            "description": parts[5]
+        }
+    return None
+
+def is_complete_line(line):
+    """True if `line` is a whole, well-formed ledger record (used to judge a torn last line)."""
+    parts = line.strip().split("|")
+    if len(parts) != 6:
+        return False
+    try:
+        date_code(parts[1])
+        int(parts[4])
+    except ValueError:
+        return False
+    return True
+
+# Every text-ledger append goes through here (see storage/wal.py)
+_wal = GroupCommitLog(is_complete_line)
+
+def _parse_chunk(data, store):
+    for line in data.decode("utf-8").splitlines():
+        parts = line.strip().split("|")
+        if len(parts) == 6:
+            try:
+                store.append_fields(parts[0], parts[1], parts[2], parts[3], int(parts[4]), parts[5])
+            except ValueError:
+                # Malformed date or amount: skip the row like a malformed line
+                continue
+
+def _checkpoint_path(path):
+    # database/transactions.txt -> database/.transactions.checkpoint
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{os.path.splitext(name)[0]}.checkpoint")
+
+def _read_checkpoint(path):
+    try:
+        with open(_checkpoint_path(path), "rb") as f:
+            checkpoint = pickle.load(f)
+        if checkpoint.get("version") == CHECKPOINT_VERSION:
+            return checkpoint
+    except Exception:
+        pass
+    return None
+
+def _write_checkpoint(path, checkpoint):
+    previous = checkpoint["persisted_offset"]
+    checkpoint["persisted_offset"] = checkpoint["offset"]
+    try:
+        atomic_write(_checkpoint_path(path), lambda f: pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL), binary=True)
+    except OSError:
+        # The checkpoint is only an accelerator; the ledger stays the source of truth
+        checkpoint["persisted_offset"] = previous
+
+def _new_checkpoint(stat):
+    checkpoint = new_cursor(stat)
+    checkpoint.update({
+        "version": CHECKPOINT_VERSION,
+        "persisted_offset": 0,
+        "transactions": TransactionStore()
+    })
+    return checkpoint
+
+@profiled("storage.load_transactions")
 def load_transactions():
-    transactions = []
-    if not os.path.exists(DB_PATH):
-        return transactions
-    
-    with open(DB_PATH, "r") as f:
-        for line in f:
-            if line.strip():
-                parts = line.strip().split("|")
-                if len(parts) == 6:
-                    transactions.append({
-                        "id": parts[0],
-                        "date": parts[1],
-                        "type": parts[2],
-                        "category": parts[3],
-                        "amount_paisa": int(parts[4]),
-                        "description": parts[5]
-                    })
+    """
+    Returns a TransactionStore of all transactions from the configured
+    storage backend (see features/storage/backend.py).
+
+    The returned store may be shared with later calls; treat it as read-only.
+    """
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.load_transactions()
+    return load_text_transactions()
+
+def load_text_transactions():
+    """
+    Returns a TransactionStore of all transactions in the text ledger.
+
+    Rows come in file order for the flat ledger, or oldest month first when
+    the ledger is month-partitioned (see partitions.py).
+
+    Parsing is incremental: the byte offset, size and mtime of the last parse
+    are kept per ledger file (in memory and in a .checkpoint file beside it)
+    alongside the parsed rows, so when a file has only been appended to just
+    the new tail is read. A rewritten file falls back to a full parse.
+
+    The returned store is shared with later calls, which only ever append
+    to it; treat it as read-only.
+    """
+    with _checkpoint_lock:
+        if not is_partitioned():
+            return _load_file(DB_PATH)
+        return _combine([_load_file(partition_path(m)) for m in list_partitions()])
+
+def iter_transactions():
+    """
+    Yields every transaction as a dict straight from storage, in the same
+    order as load_transactions(), without building a TransactionStore.
+    Memory stays flat however large the ledger is (used by the exporters).
+    """
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        yield from sqlite_backend.iter_transactions()
+        return
+    paths = [partition_path(m) for m in list_partitions()] if is_partitioned() else [DB_PATH]
+    valid_dates = set()
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    t = parse_transaction_line(line)
+                    if t is None:
+                        continue
+                    # Skip bad dates like load_transactions() does, checking each date once
+                    if t['date'] not in valid_dates:
+                        date_code(t['date'])
+                        valid_dates.add(t['date'])
+                except ValueError:
+                    continue
+                yield t
+
+def month_bounds(year, month):
+    """('YYYY-MM-01', 'YYYY-MM-31'): inclusive date bounds for a month, fine for string or code comparison."""
+    return f"{year}-{month:02d}-01", f"{year}-{month:02d}-31"
+
+def _text_scope(start_date, end_date):
+    # Smallest already-parsed store that covers [start_date, end_date]
+    if not is_partitioned():
+        return load_text_transactions()
+    wanted = [m for m in list_partitions() if start_date[:7] <= m <= end_date[:7]]
+    with _checkpoint_lock:
+        if len(wanted) == 1:
+            return _load_file(partition_path(wanted[0]))
+        combined = TransactionStore()
+        for m in wanted:
+            combined.extend_store(_load_file(partition_path(m)))
+        return combined
+
+def _rows_between(start_date, end_date):
+    # (store, row indices) pairs covering [start_date, end_date], oldest first, from each store's date index
+    lo, hi = date_code(start_date), date_code(end_date)
+    if not is_partitioned():
+        store = load_text_transactions()
+        return [(store, store.rows_between(lo, hi))]
+    wanted = [m for m in list_partitions() if start_date[:7] <= m <= end_date[:7]]
+    with _checkpoint_lock:
+        stores = [_load_file(partition_path(m)) for m in wanted]
+    return [(store, store.rows_between(lo, hi)) for store in stores]
+
+@profiled("storage.load_transactions_between")
+def load_transactions_between(start_date, end_date):
+    """
+    TransactionStore of rows dated within [start_date, end_date] ('YYYY-MM-DD'),
+    in ledger order. Only the needed month partitions are read, the rows are
+    found by binary search on the date index, and with SQLite the filter runs
+    in SQL on the date index.
+    """
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.load_transactions_between(start_date, end_date)
+    out = TransactionStore()
+    for store, rows in _rows_between(start_date, end_date):
+        out.extend_store(store.take(sorted(rows)))
+    return out
+
+@profiled("storage.transactions_between")
+def transactions_between(start_date, end_date):
+    """
+    TransactionStore of rows dated within [start_date, end_date] ('YYYY-MM-DD'),
+    oldest first (same-date rows in ledger order). The cost depends on the
+    number of rows in the range, not on the size of the ledger.
+    """
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.transactions_between(start_date, end_date)
+    out = TransactionStore()
+    for store, rows in _rows_between(start_date, end_date):
+        out.extend_store(store.take(rows))
+    return out
+
+def load_month_transactions(year, month):
+    return load_transactions_between(*month_bounds(year, month))
+
+@profiled("aggregate.totals_between")
+def totals_between(start_date, end_date):
+    """(income_paisa, expense_paisa) for rows dated within [start_date, end_date]."""
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.totals_between(start_date, end_date)
+    return _text_scope(start_date, end_date).totals(date_code(start_date), date_code(end_date))
+
+@profiled("aggregate.category_totals_between")
+def category_totals_between(type, start_date, end_date):
+    """{category: paisa} for rows of one type dated within [start_date, end_date]."""
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        return sqlite_backend.category_totals_between(type, start_date, end_date)
+    return _text_scope(start_date, end_date).category_totals(type, date_code(start_date), date_code(end_date))
+
+@cache.on_reset
+def reset():
+    """Forgets the parsed ledger files (the checkpoint files stay)."""
+    global _combined
+    with _checkpoint_lock:
+        _checkpoints.clear()
+        _combined = None
+
+def _combine(stores):
+    global _combined
+    key = tuple((id(s), len(s)) for s in stores)
+    if _combined is None or _combined[0] != key:
+        combined = TransactionStore()
+        for s in stores:
+            combined.extend_store(s)
+        _combined = (key, combined)
+    return _combined[1]
+
+@profiled("storage.read_ledger_file")
+def _load_file(path):
+    if not os.path.exists(path):
+        _checkpoints.pop(path, None)
+        return TransactionStore()
+
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        checkpoint = _checkpoints.get(path)
+        if not is_append_of(checkpoint, stat, f):
+            checkpoint = _read_checkpoint(path)
+            if not is_append_of(checkpoint, stat, f):
+                checkpoint = _new_checkpoint(stat)
+
+        complete, pending = read_appended(f, stat, checkpoint)
+        if complete:
+            before = len(checkpoint["transactions"])
+            _parse_chunk(complete, checkpoint["transactions"])
+            record_scan(rows=len(checkpoint["transactions"]) - before, bytes=len(complete))
+            offset = checkpoint["offset"]
+            if offset - checkpoint["persisted_offset"] >= CHECKPOINT_PERSIST_BYTES or checkpoint["persisted_offset"] == 0:
+                _write_checkpoint(path, checkpoint)
+
+    _checkpoints[path] = checkpoint
+    transactions = checkpoint["transactions"]
+    if pending:
+        transactions = transactions.copy()
+        _parse_chunk(pending, transactions)
     return transactions
 
+def ledger_paths():
+    """Every ledger file under the current layout."""
+    if is_partitioned():
+        return [partition_path(m) for m in list_partitions()]
+    return [DB_PATH]
+
+def ledger_path_for(t):
+    """File a transaction is appended to under the current layout."""
+    if is_partitioned():
+        return partition_path(t['date'][:7])
+    return DB_PATH
+
+def format_transaction_line(t):
+    return f"{t['id']}|{t['date']}|{t['type']}|{t['category']}|{t['amount_paisa']}|{t['description']}\n"
+
+@profiled("storage.save_transaction")
 def save_transaction(t):
-    with open(DB_PATH, "a") as f:
-        line = f"{t['id']}|{t['date']}|{t['type']}|{t['category']}|{t['amount_paisa']}|{t['description']}\n"
-        f.write(line)
+    from features.smart_assistant import alerts
+    touched = alerts.touched_by([t])
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        sqlite_backend.save_transaction(t)
+        cache.invalidate(cache.TRANSACTIONS)
+        alerts.on_spending(touched)
+        return
+    seq = _wal.commit([(ledger_path_for(t), format_transaction_line(t).encode("utf-8"))])
+    _after_text_write()
+    alerts.on_spending(touched)
+    return seq
+
+def _after_text_write():
+    # Fold the new lines into the derived indexes (SQLite keeps its own via triggers)
+    rollups.refresh()
+    cache.invalidate(cache.TRANSACTIONS)
+
+@profiled("storage.save_transactions")
+def save_transactions(transactions, batch_size=WRITE_BATCH_SIZE):
+    """
+    Appends many transactions in one go and returns how many were written.
+
+    `transactions` may be any iterable (it is consumed lazily, so a generator
+    keeps memory flat). Rows are committed through the group-commit log in
+    batches of `batch_size`: one write and one fsync per ledger file per batch.
+    """
+    from features.smart_assistant import alerts
+    touched = {}
+    transactions = alerts.watch(transactions, touched)
+    if use_sqlite():
+        from features.storage import sqlite_backend
+        count = sqlite_backend.save_transactions(transactions)
+        cache.invalidate(cache.TRANSACTIONS)
+        alerts.on_spending(touched)
+        return count
+
+    partitioned = is_partitioned()
+    pending = {}
+    buffered = 0
+    count = 0
+    for t in transactions:
+        path = partition_path(t['date'][:7]) if partitioned else DB_PATH
+        pending.setdefault(path, []).append(format_transaction_line(t))
+        count += 1
+        buffered += 1
+        if buffered >= batch_size:
+            _commit_batch(pending)
+            buffered = 0
+    _commit_batch(pending)
+    record_scan(rows=count)
+    _after_text_write()
+    alerts.on_spending(touched)
+    return count
+
+def _commit_batch(pending):
+    writes = [(path, "".join(lines).encode("utf-8")) for path, lines in pending.items() if lines]
+    if writes:
+        _wal.commit(writes)
+    pending.clear()
 
 def validate_amount(text):
     try:
         val = float(text)
+        if not math.isfinite(val):
+            return "Please enter a valid number"
         if val <= 0:
             return "Amount must be positive"
+        if val * 100 > MAX_AMOUNT_PAISA:
+            return "Amount is too large"
         return True
     except ValueError:
         return "Please enter a valid number"
@@ -54,6 +398,8 @@ def validate_date(text):
         return "Format must be YYYY-MM-DD"
 
 def add_transaction():
+    import questionary
+
     type = questionary.select(
         "Select transaction type:",
         choices=["Expense", "Income"]
@@ -98,7 +444,33 @@ def add_transaction():
     save_transaction(transaction)
     console.print(f"[bold green]Successfully added {type}![/bold green]")
 
+@profiled("aggregate.newest_first_page")
+def newest_first_page(transactions, indices, page, page_size=PAGE_SIZE, date_ordered=False):
+    """
+    Row indices for page `page` (from 0) of `indices` ordered newest first,
+    the latest entry first among rows of the same date. Indices already in
+    date order (date_ordered, e.g. from rows_between) are sliced from the
+    end; otherwise only the rows up to the end of the page are selected (a
+    heap of (page + 1) * page_size), not all of them sorted.
+    """
+    end = (page + 1) * page_size
+    if date_ordered:
+        stop = max(len(indices) - page * page_size, 0)
+        return list(reversed(indices[max(stop - page_size, 0):stop]))
+    key = transactions.dates.__getitem__
+    # Both are stable, so feeding the rows backwards puts later entries first on ties
+    if end * 4 >= len(indices):
+        # Near the end a full sort is cheaper than the heap
+        ordered = sorted(reversed(indices), key=key, reverse=True)
+    else:
+        ordered = heapq.nlargest(end, reversed(indices), key=key)
+    return ordered[page * page_size:end]
+
+@profiled("view.transactions")
 def view_transactions():
+    import questionary
+    from rich.table import Table
+
     transactions = load_transactions()
     if not transactions:
         console.print("[yellow]No transactions found.[/yellow]")
@@ -106,53 +478,89 @@ def view_transactions():
 
     filter_choice = questionary.select(
         "Filter transactions?",
-        choices=["Show All", "Last 7 Days", "Expenses Only", "Income Only", "Back"]
+        choices=["Show All", "Last 7 Days", "Date Range", "Expenses Only", "Income Only", "Search", "Back"]
     ).ask()
 
     if filter_choice == "Back" or not filter_choice:
         return
 
-    filtered = transactions
-    if filter_choice == "Last 7 Days":
-        today = datetime.now()
-        filtered = [
-            t for t in transactions 
-            if (today - datetime.strptime(t['date'], "%Y-%m-%d")).days <= 7
-        ]
+    # Rows from the date index come oldest first already
+    date_ordered = filter_choice in ("Show All", "Last 7 Days", "Date Range")
+    indices = transactions.rows_between()
+    if filter_choice == "Date Range":
+        start = questionary.text("From (YYYY-MM-DD):", validate=validate_date).ask()
+        end = start and questionary.text("To (YYYY-MM-DD):", default=datetime.now().strftime("%Y-%m-%d"), validate=validate_date).ask()
+        if not end:
+            return
+        indices = transactions.rows_between(date_code(start), date_code(end))
+        filter_choice = f"{start} to {end}"
+    elif filter_choice == "Search":
+        from features.transactions.search import search
+
+        query = questionary.text("Search descriptions and categories:").ask()
+        if not query:
+            return
+        indices = search(query, transactions)
+        if not indices:
+            # Nothing exact, retry allowing a typo per word
+            indices = search(query, transactions, fuzzy=True)
+        filter_choice = f"matching '{query}'"
+    elif filter_choice == "Last 7 Days":
+        week_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+        indices = transactions.rows_between(start=date_code(week_ago))
     elif filter_choice == "Expenses Only":
-        filtered = [t for t in transactions if t['type'] == "Expense"]
+        indices = transactions.indices(type="Expense")
     elif filter_choice == "Income Only":
-        filtered = [t for t in transactions if t['type'] == "Income"]
+        indices = transactions.indices(type="Income")
 
-    # Sort by date newest first
-    filtered.sort(key=lambda x: x['date'], reverse=True)
+    pages = max((len(indices) + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+    page = 0
+    while True:
+        table = Table(title=f"Transactions ({filter_choice}) - page {page + 1} of {pages}, {len(indices)} rows")
+        table.add_column("Date", style="cyan")
+        table.add_column("Type")
+        table.add_column("Category", style="magenta")
+        table.add_column("Description")
+        table.add_column("Amount", justify="right")
 
-    table = Table(title=f"Transactions ({filter_choice})")
-    table.add_column("Date", style="cyan")
-    table.add_column("Type")
-    table.add_column("Category", style="magenta")
-    table.add_column("Description")
-    table.add_column("Amount", justify="right")
+        # Newest first; only this page's rows are fetched and formatted
+        for i in newest_first_page(transactions, indices, page, date_ordered=date_ordered):
+            t = transactions[i]
+            amount_display = f"Rs {t['amount_paisa'] / 100:.2f}"
+            color = "red" if t['type'] == "Expense" else "green"
+            table.add_row(
+                t['date'],
+                f"[{color}]{t['type']}[/{color}]",
+                t['category'],
+                t['description'],
+                f"[{color}]{amount_display}[/{color}]"
+            )
 
-    for t in filtered:
-        amount_display = f"Rs {t['amount_paisa'] / 100:.2f}"
-        color = "red" if t['type'] == "Expense" else "green"
-        table.add_row(
-            t['date'],
-            f"[{color}]{t['type']}[/{color}]",
-            t['category'],
-            t['description'],
-            f"[{color}]{amount_display}[/{color}]"
-        )
+        console.print(table)
+        if pages == 1:
+            return
 
-    console.print(table)
+        choices = []
+        if page + 1 < pages:
+            choices.append("Next Page")
+        if page > 0:
+            choices.append("Previous Page")
+        choices.append("Back")
+        action = questionary.select("Navigate", choices=choices).ask()
+        if action == "Next Page":
+            page += 1
+        elif action == "Previous Page":
+            page -= 1
+        else:
+            return
 
+@profiled("view.balance")
 def show_balance():
-    transactions = load_transactions()
-    current_month = datetime.now().strftime("%Y-%m")
+    from rich.table import Table
+
+    now = datetime.now()
     
-    total_income = sum(t['amount_paisa'] for t in transactions if t['type'] == "Income" and t['date'].startswith(current_month))
-    total_expense = sum(t['amount_paisa'] for t in transactions if t['type'] == "Expense" and t['date'].startswith(current_month))
+    total_income, total_expense = rollups.month_totals(now.year, now.month)
     balance = total_income - total_expense
 
     table = Table(title=f"Financial Summary - {datetime.now().strftime('%B %Y')}")
@@ -1,16 +1,13 @@
-import questionary
-from rich.console import Console
 from rich.panel import Panel
-from features.transactions import transactions
-from features.budgets import budgets
-from features.financial_analytics import analytics
-from features.smart_assistant import assistant
-from features.data_management import manager
+from features.console import console
 
-console = Console()
+# Feature modules (and questionary) are imported on first use, so the
+# banner shows up before the heavy imports; benchmarks/startup.py keeps
+# this honest.
 
 def main():
     console.print(Panel.fit("[bold green]Personal Finance Tracker CLI[/bold green]", subtitle="Welcome"))
+    import questionary
 
     while True:
         choice = questionary.select(
@@ -26,6 +23,7 @@ def main():
         ).ask()
 
         if choice == "Manage Transactions":
+            from features.transactions import transactions
             action = questionary.select(
                 "Transaction Options:",
                 choices=["Add Transaction", "View Transactions", "View Balance", "Back"]
@@ -38,6 +36,7 @@ def main():
                 transactions.show_balance()
         
         elif choice == "Manage Budgets":
+            from features.budgets import budgets
             action = questionary.select(
                 "Budget Options:",
                 choices=["Set Budget", "View Budget", "Back"]
@@ -48,12 +47,15 @@ def main():
                 budgets.view_budget()
 
         elif choice == "View Analytics":
+            from features.financial_analytics import analytics
             analytics.show_analytics()
 
         elif choice == "Smart Assistant":
+            from features.smart_assistant import assistant
             assistant.assistant_menu()
 
         elif choice == "Data Management":
+            from features.data_management import manager
             manager.menu()
 
         elif choice == "Exit":